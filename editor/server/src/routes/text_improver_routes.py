@@ -50,7 +50,26 @@ async def improve_text(request: TextImprovementRequest):
         )
         return result
     except Exception as e:
+        # game/src is on sys.path once text_improver has been imported
+        from llm.scheduler import LLMQueueFullError
+        if isinstance(e, LLMQueueFullError):
+            raise HTTPException(
+                status_code=429,
+                detail=f"Text improvement rejected: {str(e)}",
+                headers={"Retry-After": str(max(1, int(e.retry_after)))}
+            )
         raise HTTPException(
             status_code=500,
             detail=f"Text improvement failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/metrics")
+async def text_improvement_metrics():
+    """
+    LLM admission-control metrics of the editor process
+    (queue depth, wait time, rejected requests).
+    """
+    get_text_improver()
+    from metrics import metrics
+    return metrics.snapshot()
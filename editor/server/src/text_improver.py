@@ -12,6 +12,7 @@ sys.path.insert(0, str(game_src_path))
 
 from llm.llm_factory import LLMFactory
 from llm.base_provider import BaseLLMProvider, LLMMessage, LLMResponse
+from llm.scheduler import Priority
 
 
 class TextImprover:
@@ -66,6 +67,10 @@ WICHTIG: Sei extrem vorsichtig! Ein einziger Fehler bei Jinja-Tags zerstört die
         """Get or create LLM provider instance."""
         if self.provider is None:
             self.provider = self.llm_factory.create_provider()
+            # Editor jobs queue behind interactive player turns
+            self.provider.priority = Priority.EDITOR
+            # The same text with the same instruction sent twice at once gets one answer
+            self.provider.coalesce = True
         return self.provider
     
     def improve_text(
@@ -104,8 +109,8 @@ Verbessere den Text gemäß der Anforderung. BEHALTE ALLE Jinja-Tags exakt bei!"
             LLMMessage(role="user", content=user_message)
         ]
         
-        # Call LLM (using call_chat directly, no function calling needed)
-        response: LLMResponse = provider.call_chat(messages, functions=None)
+        # Call LLM (plain chat, no function calling needed)
+        response: LLMResponse = provider.chat(messages)
         
         improved_text = response.content.strip()
         
@@ -162,5 +167,5 @@ Erkläre in 2-3 Sätzen die wichtigsten Änderungen. Sei konkret und hilfreich."
             LLMMessage(role="user", content=comment_prompt)
         ]
         
-        response: LLMResponse = provider.call_chat(messages, functions=None)
+        response: LLMResponse = provider.chat(messages)
         return response.content.strip()
\ No newline at end of file
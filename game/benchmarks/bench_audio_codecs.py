@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the WebSocket speech codecs: bandwidth, CPU and quality per stream.
+
+Encodes a real speech sample (voices/pirate.wav, resampled to 24 kHz mono)
+in the same 1024-sample chunks the TTS pipeline writes, and reports for
+every available codec:
+
+    - bandwidth in KB/s per speaking player
+    - encoder CPU time per second of audio (and streams per core)
+    - SNR of the decoded signal (reference decoders, where available)
+
+Run with: python benchmarks/bench_audio_codecs.py [path/to/file.wav]
+"""
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+GAME_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(GAME_DIR / "src"))
+
+from audio.codecs import SAMPLE_RATE, adpcm_decode, available_codecs, create_encoder, mulaw_decode
+
+CHUNK_SAMPLES = 1024
+
+
+def load_speech(path: Path) -> np.ndarray:
+    """Load a WAV file as 24 kHz mono int16."""
+    with wave.open(str(path)) as wav:
+        rate = wav.getframerate()
+        channels = wav.getnchannels()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+    audio = samples.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        # Linear resampling is good enough for a benchmark signal
+        positions = np.arange(0, len(audio), rate / SAMPLE_RATE)
+        audio = np.interp(positions, np.arange(len(audio)), audio)
+    return audio.astype(np.int16)
+
+
+def snr_db(reference: np.ndarray, decoded: np.ndarray) -> float:
+    """Signal-to-noise ratio of decoded audio in dB."""
+    length = min(len(reference), len(decoded))
+    ref = reference[:length].astype(np.float64)
+    noise = ref - decoded[:length].astype(np.float64)
+    return 10 * np.log10(np.sum(ref ** 2) / max(np.sum(noise ** 2), 1e-9))
+
+
+def decode(codec: str, data: bytes):
+    """Decode with the reference decoder (None if there is none)."""
+    if codec == "pcm":
+        return np.frombuffer(data, dtype=np.int16)
+    if codec == "mulaw":
+        return mulaw_decode(np.frombuffer(data, dtype=np.uint8))
+    if codec == "ima_adpcm":
+        return adpcm_decode(data)
+    return None
+
+
+def bench_codec(codec: str, audio: np.ndarray) -> dict:
+    """Encode audio chunk by chunk and measure bandwidth, CPU and quality."""
+    encoder = create_encoder(codec)
+    chunks = [audio[i:i + CHUNK_SAMPLES].tobytes() for i in range(0, len(audio), CHUNK_SAMPLES)]
+
+    cpu_start = time.process_time()
+    encoded = b"".join(encoder.encode(chunk) for chunk in chunks) + encoder.flush()
+    cpu_seconds = time.process_time() - cpu_start
+
+    duration = len(audio) / SAMPLE_RATE
+    decoded = decode(codec, encoded)
+    return {
+        "codec": codec,
+        "kbps": len(encoded) / duration / 1024,
+        "ratio": len(audio) * 2 / max(len(encoded), 1),
+        "cpu_ms_per_s": cpu_seconds / duration * 1000,
+        "streams_per_core": duration / cpu_seconds if cpu_seconds else float("inf"),
+        "snr_db": snr_db(audio, decoded) if decoded is not None else None,
+    }
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else GAME_DIR / "voices" / "pirate.wav"
+    audio = load_speech(path)
+
+    print("=" * 80)
+    print(f"AUDIO CODEC BENCHMARK ({path.name}, {len(audio) / SAMPLE_RATE:.1f}s @ {SAMPLE_RATE} Hz)")
+    print("=" * 80)
+    print(f"{'codec':<12}{'KB/s':>10}{'ratio':>10}{'CPU ms/s':>12}{'streams/core':>15}{'SNR dB':>10}")
+    print("-" * 80)
+
+    for codec in available_codecs():
+        result = bench_codec(codec, audio)
+        snr = f"{result['snr_db']:.1f}" if result['snr_db'] is not None else "-"
+        print(f"{result['codec']:<12}{result['kbps']:>10.1f}{result['ratio']:>10.2f}"
+              f"{result['cpu_ms_per_s']:>12.2f}{result['streams_per_core']:>15.0f}{snr:>10}")
+
+    if "opus" not in available_codecs():
+        print("\n(opus skipped: opuslib not installed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Prompt tokens of the function catalog per provider prompt format.
+
+Builds the system prompt of every state of a map (default:
+maps/TheTipsyQuest) with each provider's build_prompt and compares the
+compact catalog (llm/catalog.py) with the previous encoding (every function
+with its full parameter schema, json.dumps(indent=2)). Native tool-calling
+providers (Gemini, Gemma) send the catalog as API tools instead of prompt
+text; their tools payload is listed for reference.
+
+Lua conditions are ignored, so every action of a state counts as available.
+Tokens are counted with tiktoken (o200k_base) if available, otherwise
+estimated as characters / 4 (see tokens.py).
+
+Run with: python benchmarks/bench_function_catalog.py [map_dir]
+"""
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+GAME_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(GAME_DIR / "src"))
+
+from bench_function_shortlist import load_states
+from game_controller import GameController
+from llm import DeepSeekProvider, GeminiProvider, GemmaProvider, LLMMessage, OllamaProvider, OpenAIProvider
+from llm.catalog import function_catalog
+from tokens import TOKENIZER, count_tokens
+
+PROMPT_FORMATS = [
+    ("openai (generic JSON)", OpenAIProvider("sk-bench", "gpt-4o-mini"), True),
+    ("deepseek (generic JSON)", DeepSeekProvider("-", "deepseek-chat"), True),
+    ("ollama qwen", OllamaProvider("-", "qwen2.5:7b"), True),
+    ("ollama llama", OllamaProvider("-", "llama3.1:8b"), True),
+    ("ollama hermes", OllamaProvider("-", "hermes3:8b"), False),
+]
+NATIVE_FORMATS = [
+    ("gemini (native tools)", GeminiProvider("-", "gemini-2.0-flash")),
+    ("gemma (native tools)", GemmaProvider("-", "gemma3:12b")),
+]
+
+
+def legacy_catalog(functions, include_parameters: bool) -> str:
+    """The catalog encoding before llm/catalog.py."""
+    entries = [
+        {"name": f.name, "description": f.description, **({"parameters": f.parameters or {}} if include_parameters else {})}
+        for f in functions
+    ]
+    return json.dumps(entries, ensure_ascii=False, indent=2)
+
+
+def main() -> None:
+    map_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else GAME_DIR.parent / "maps" / "TheTipsyQuest"
+    game_data, states = load_states(map_dir)
+    history = [LLMMessage(role="user", content="-")]
+
+    prompts = []
+    for description, actions in states.values():
+        base_prompt = f"{game_data['personality']}\n\n{game_data['behaviour']}\n\nAKTUELLER RAUM:\n{description}\n"
+        functions = [GameController.action_function(action) for action in actions]
+        functions.append(GameController.no_action_function())
+        prompts.append((base_prompt, functions))
+
+    print(f"Map: {map_dir.name} ({len(prompts)} states)   tokenizer: {TOKENIZER}")
+    print()
+    print(f"{'prompt format':<26} {'before':>8} {'after':>8} {'saved':>7}   (system prompt tokens per turn)")
+    for name, provider, include_parameters in PROMPT_FORMATS:
+        before = after = 0
+        for base_prompt, functions in prompts:
+            system_prompt = provider.build_prompt(base_prompt, functions, history)[0].content
+            compact = function_catalog(functions, include_parameters=include_parameters)
+            after += count_tokens(system_prompt)
+            before += count_tokens(system_prompt.replace(compact, legacy_catalog(functions, include_parameters)))
+        print(f"{name:<26} {before / len(prompts):>8.0f} {after / len(prompts):>8.0f} {1 - after / before:>7.0%}")
+
+    for name, provider in NATIVE_FORMATS:
+        tools = 0
+        for base_prompt, functions in prompts:
+            params = provider._build_api_params(provider.build_prompt(base_prompt, functions, history), functions)
+            tools += count_tokens(json.dumps(params.get("tools", []), ensure_ascii=False))
+        print(f"{name:<26} {'tools payload':>17} {tools / len(prompts):>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
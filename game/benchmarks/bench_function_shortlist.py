@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the function shortlist: prompt tokens, latency and recall.
+
+Loads a map (default: maps/TheTipsyQuest) and, for every state, builds the
+system prompt of the generic JSON function-calling format once with all
+actions and once with the shortlist for a set of player inputs:
+
+    - the action name as a phrase ("gehe zum briefkasten")
+    - the first sentence of the action description ("Du gehst zum Briefkasten.")
+    - chat-like input that shares no word with any action ("wer bist du?")
+
+and reports prompt tokens, the shortlisting overhead, the prefill time saved
+(at --prefill-tps tokens per second) and the recall of the intended action.
+Lua conditions are ignored, so every action of a state counts as available
+(upper bound of the catalog size).
+
+Tokens are counted with tiktoken (o200k_base) if available, otherwise
+estimated as characters / 4 (see tokens.py).
+
+Run with: python benchmarks/bench_function_shortlist.py [map_dir] [--top-k 6] [--prefill-tps 1000]
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+GAME_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(GAME_DIR / "src"))
+
+from function_index import FunctionShortlist
+from game_controller import GameController
+from game_engine import GameEngine
+from llm import LLMMessage
+from llm.base_provider import BaseLLMProvider
+from state_engine import StateEngine
+from tokens import TOKENIZER, count_tokens
+
+CHAT_INPUTS = ["hallo", "wer bist du?", "du bist doof", "erzähl mir einen witz"]
+
+
+class PromptFormat(BaseLLMProvider):
+    """Generic JSON function-calling prompt (BaseLLMProvider.build_prompt) without an API client."""
+
+    def call_chat(self, messages, functions=None):
+        raise NotImplementedError
+
+    def _validate_config(self) -> None:
+        pass
+
+
+def load_states(map_dir: Path):
+    """Map state name -> (room description, list of actions)."""
+    engine = GameEngine.__new__(GameEngine)
+    game_data = engine._convert_overlay_format(map_dir)
+    state_engine = StateEngine(None, game_data['states'], game_data['actions'], game_data['initial_state'])
+    states = {}
+    for name, state in state_engine.states.items():
+        actions = [
+            action for action in state_engine.actions
+            if getattr(action, 'state', None) == name or getattr(action, 'state_before', None) == name
+        ]
+        states[name] = (state.get_raw_description(), actions)
+    return game_data, states
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("map_dir", nargs="?", default=str(GAME_DIR.parent / "maps" / "TheTipsyQuest"))
+    parser.add_argument("--top-k", type=int, default=6)
+    parser.add_argument("--min-functions", type=int, default=8)
+    parser.add_argument("--prefill-tps", type=float, default=1000.0, help="prompt tokens per second of the model")
+    args = parser.parse_args()
+
+    game_data, states = load_states(Path(args.map_dir))
+    prompt_format = PromptFormat(api_key="-", model="bench")
+    shortlist = FunctionShortlist(top_k=args.top_k, min_functions=args.min_functions)
+    history = [LLMMessage(role="user", content="-")]
+
+    print(f"Map: {Path(args.map_dir).name}   tokenizer: {TOKENIZER}   top_k={args.top_k}")
+    print()
+    print(f"{'state':<22} {'actions':>7} {'full':>7} {'short':>7} {'saved':>6} {'recall':>7} {'select':>9}")
+
+    total_full = total_short = hits = expected = turns = 0
+    select_seconds = 0.0
+    for name, (description, actions) in states.items():
+        base_prompt = f"{game_data['personality']}\n\n{game_data['behaviour']}\n\nAKTUELLER RAUM:\n{description}\n"
+        functions = [GameController.action_function(action) for action in actions]
+        functions.append(GameController.no_action_function())
+        full_tokens = count_tokens(prompt_format.build_prompt(base_prompt, functions, history)[0].content)
+
+        queries = []
+        for action in actions:
+            queries.append((action.name.replace("_", " "), action.name))
+            first_sentence = re.split(r"(?<=[.!?])\s", action.description.strip())[0]
+            if first_sentence:
+                queries.append((first_sentence, action.name))
+        queries += [(text, None) for text in CHAT_INPUTS]
+
+        state_full = state_short = state_hits = state_expected = 0
+        state_seconds = 0.0
+        for text, intended in queries:
+            started = time.perf_counter()
+            selected = shortlist.select(functions, text)
+            state_seconds += time.perf_counter() - started
+            offered = selected or functions
+            short_tokens = count_tokens(prompt_format.build_prompt(base_prompt, offered, history)[0].content)
+            state_full += full_tokens
+            state_short += short_tokens
+            if intended:
+                state_expected += 1
+                state_hits += any(f.name == intended for f in offered)
+
+        turns += len(queries)
+        select_seconds += state_seconds
+        total_full += state_full
+        total_short += state_short
+        hits += state_hits
+        expected += state_expected
+        recall = state_hits / state_expected if state_expected else 1.0
+        print(f"{name[:22]:<22} {len(actions):>7} {state_full / len(queries):>7.0f} {state_short / len(queries):>7.0f} "
+              f"{1 - state_short / state_full:>6.0%} {recall:>7.0%} {state_seconds / len(queries) * 1e3:>7.3f}ms")
+
+    saved_tokens = (total_full - total_short) / turns
+    print()
+    print(f"Prompt tokens per turn: {total_full / turns:.0f} -> {total_short / turns:.0f} "
+          f"({1 - total_short / total_full:.0%} less)")
+    print(f"Recall of the intended action: {hits / expected:.1%}")
+    print(f"Shortlisting overhead: {select_seconds / turns * 1e3:.3f} ms per turn")
+    print(f"Prefill time saved at {args.prefill_tps:.0f} tokens/s: {saved_tokens / args.prefill_tps * 1e3:.0f} ms per turn")
+
+
+if __name__ == "__main__":
+    main()
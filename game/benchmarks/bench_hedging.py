@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tail latency of LLM turns with and without hedging (llm/resilient_provider.py).
+
+Two simulated backends answer with a log-normal latency (median --median
+seconds); a fraction of the calls (--stall-rate) stalls for --stall
+seconds. The same turns are sent through a ResilientProvider once without
+and once with hedging (hedge to the backup after the p95 of the primary)
+and p50/p95/p99 latency, the share of hedged turns and the deadline
+misses are reported. Times are scaled by --scale to keep the run short.
+
+Run with: python benchmarks/bench_hedging.py [--turns 400] [--stall-rate 0.03]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+GAME_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(GAME_DIR / "src"))
+
+from llm import LLMFunction, LLMMessage, LLMResponse, LLMUnavailableError
+from llm.base_provider import BaseLLMProvider
+from llm.resilient_provider import ResilientProvider
+from metrics import metrics
+
+
+class SimulatedBackend(BaseLLMProvider):
+    """Backend with log-normal latency and occasional stalls."""
+
+    def __init__(self, name: str, median: float, stall_rate: float, stall: float, seed: int) -> None:
+        self.median: float = median
+        self.stall_rate: float = stall_rate
+        self.stall: float = stall
+        self.random: random.Random = random.Random(seed)
+        super().__init__(api_key="-", model=name)
+
+    def call_chat(self, messages, functions=None):
+        stalled = self.random.random() < self.stall_rate
+        time.sleep(self.stall if stalled else self.median * self.random.lognormvariate(0, 0.35))
+        return LLMResponse(content='{"response": "Du gehst nach Norden.", "function": "gehe_nach_norden"}', model=self.model)
+
+    def _validate_config(self) -> None:
+        pass
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))]
+
+
+def run(turns: int, hedge: bool, args) -> dict:
+    """Send the turns one after another and collect the turn latencies."""
+    scale = args.scale
+    primary = SimulatedBackend("primary", args.median * scale, args.stall_rate, args.stall * scale, seed=1)
+    backup = SimulatedBackend("backup", args.median * scale, args.stall_rate, args.stall * scale, seed=2)
+    provider = ResilientProvider(primary, backup, {
+        "deadline_seconds": args.deadline * scale,
+        "retries": 1,
+        "backoff_seconds": 0.0,
+        "circuit_breaker": {"failures": 1000},
+        "hedge": {
+            "enabled": hedge,
+            "percentile": 95,
+            "initial_delay_seconds": args.median * 2 * scale,
+            "min_delay_seconds": 0.2 * scale
+        }
+    })
+    functions = [LLMFunction("gehe_nach_norden", "Du gehst nach Norden."), LLMFunction("keine_aktion", "-")]
+    messages = [LLMMessage("user", "geh nach norden")]
+    hedges_before = metrics.counter("llm_hedges_total").value(backend=ResilientProvider.backend_name(backup))
+
+    latencies, misses = [], 0
+    for _ in range(turns):
+        started = time.perf_counter()
+        try:
+            provider.chat_with_functions(messages, functions, "Du bist der Erzähler.")
+        except LLMUnavailableError:
+            misses += 1
+        latencies.append((time.perf_counter() - started) / scale)
+
+    hedges = metrics.counter("llm_hedges_total").value(backend=ResilientProvider.backend_name(backup)) - hedges_before
+    return {
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "hedged": hedges / turns,
+        "misses": misses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=400)
+    parser.add_argument("--median", type=float, default=1.0, help="median latency in seconds")
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--stall", type=float, default=10.0, help="latency of a stalled call in seconds")
+    parser.add_argument("--deadline", type=float, default=20.0, help="turn deadline in seconds")
+    parser.add_argument("--scale", type=float, default=0.01, help="time scale of the simulation")
+    args = parser.parse_args()
+
+    print(f"{args.turns} turns, median {args.median:.1f}s, {args.stall_rate:.0%} stalls of {args.stall:.0f}s "
+          f"(simulated at {args.scale}x)")
+    print()
+    print(f"{'hedging':<8} {'p50':>7} {'p95':>7} {'p99':>7} {'hedged':>7} {'misses':>7}")
+    for hedge in (False, True):
+        result = run(args.turns, hedge, args)
+        print(f"{'on' if hedge else 'off':<8} {result['p50']:>6.2f}s {result['p95']:>6.2f}s {result['p99']:>6.2f}s "
+              f"{result['hedged']:>7.1%} {result['misses']:>7}")
+
+
+if __name__ == "__main__":
+    main()
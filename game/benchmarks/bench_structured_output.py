@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Prompt tokens and parse failures with and without schema-constrained answers.
+
+Builds the system prompt of every state of a map (default:
+maps/TheTipsyQuest) for each JSON-prompted provider format, once with the
+full format instructions and once with structured_output (the answer
+format is enforced by a JSON schema whose "function" field is an enum of
+the available actions, so the prompt only carries a short format note).
+The size of the schema sent along with the request is listed for
+reference; constrained decoding does not add it to the prompt.
+
+With --live, turns are sent to the provider configured in config.yaml
+(llm section) for each state: every action name as a phrase plus a few
+chat inputs. Parse failures (no function call, or a function that is not
+available) and the prompt tokens reported by the provider are compared
+for both modes.
+
+Lua conditions are ignored, so every action of a state counts as available.
+Tokens are counted with tiktoken (o200k_base) if available, otherwise
+estimated as characters / 4 (see tokens.py).
+
+Run with: python benchmarks/bench_structured_output.py [map_dir] [--live] [--turns 40]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add src to path
+GAME_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(GAME_DIR / "src"))
+
+from bench_function_shortlist import CHAT_INPUTS, load_states
+from game_controller import GameController
+from llm import DeepSeekProvider, LLMFactory, LLMMessage, OllamaProvider, OpenAIProvider
+from llm.base_provider import BaseLLMProvider
+from tokens import TOKENIZER, count_tokens
+
+PROMPT_FORMATS = [
+    ("openai / litellm", OpenAIProvider("sk-bench", "gpt-4o-mini")),
+    ("deepseek (JSON mode)", DeepSeekProvider("-", "deepseek-chat")),
+    ("ollama qwen", OllamaProvider("-", "qwen2.5:7b")),
+    ("ollama llama", OllamaProvider("-", "llama3.1:8b")),
+    ("ollama hermes", OllamaProvider("-", "hermes3:8b")),
+]
+
+
+def system_prompt_tokens(provider: BaseLLMProvider, prompts, structured: bool) -> float:
+    """Average system prompt tokens per turn."""
+    provider.structured_output = structured
+    history = [LLMMessage(role="user", content="-")]
+    total = sum(
+        count_tokens(provider.build_prompt(base_prompt, functions, history, state_prompt)[0].content)
+        for base_prompt, state_prompt, functions in prompts
+    )
+    return total / len(prompts)
+
+
+def live(prompts, queries, turns: int) -> None:
+    """Send the same turns with and without structured_output to the configured provider."""
+    factory = LLMFactory()
+    print()
+    print(f"Live: {factory.config.get('llm', {}).get('provider')} / {factory.config.get('llm', {}).get('model')}, "
+          f"{turns} turns per mode")
+    print(f"{'mode':<14} {'parse failures':>15} {'prompt tokens':>14}")
+    for structured in (False, True):
+        provider = factory.create_provider(overrides={"structured_output": structured})
+        failures = prompt_tokens = 0
+        for index in range(turns):
+            base_prompt, state_prompt, functions = prompts[queries[index % len(queries)][0]]
+            text = queries[index % len(queries)][1]
+            try:
+                response = provider.chat_with_functions(
+                    [LLMMessage(role="user", content=text)], functions, base_prompt, state_prompt=state_prompt
+                )
+            except Exception as e:
+                print(f"  turn failed: {e}")
+                failures += 1
+                continue
+            call = response.function_call
+            failures += call is None or call.name not in {f.name for f in functions}
+            prompt_tokens += (response.usage or {}).get("prompt_tokens", 0)
+        mode = "schema" if provider.uses_response_schema else ("JSON mode" if structured else "instructions")
+        print(f"{mode:<14} {failures:>8} ({failures / turns:>4.0%}) {prompt_tokens / turns:>14.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("map_dir", nargs="?", default=str(GAME_DIR.parent / "maps" / "TheTipsyQuest"))
+    parser.add_argument("--live", action="store_true", help="send turns to the provider of config.yaml")
+    parser.add_argument("--turns", type=int, default=40, help="live turns per mode")
+    args = parser.parse_args()
+
+    game_data, states = load_states(Path(args.map_dir))
+    prompts, queries = [], []
+    for description, actions in states.values():
+        base_prompt = f"{game_data['personality']}\n\n{game_data['behaviour']}"
+        state_prompt = f"AKTUELLER RAUM:\n{description}\n"
+        functions = [GameController.action_function(action) for action in actions]
+        functions.append(GameController.no_action_function())
+        queries += [(len(prompts), action.name.replace("_", " ")) for action in actions]
+        queries += [(len(prompts), text) for text in CHAT_INPUTS[:2]]
+        prompts.append((base_prompt, state_prompt, functions))
+
+    schema_tokens = sum(
+        count_tokens(json.dumps(BaseLLMProvider.response_schema(functions), ensure_ascii=False))
+        for _, _, functions in prompts
+    ) / len(prompts)
+
+    print(f"Map: {Path(args.map_dir).name} ({len(prompts)} states)   tokenizer: {TOKENIZER}")
+    print()
+    print(f"{'prompt format':<22} {'instructions':>12} {'schema':>8} {'saved':>7}   (system prompt tokens per turn)")
+    for name, provider in PROMPT_FORMATS:
+        before = system_prompt_tokens(provider, prompts, structured=False)
+        after = system_prompt_tokens(provider, prompts, structured=True)
+        print(f"{name:<22} {before:>12.0f} {after:>8.0f} {1 - after / before:>7.0%}")
+    print(f"{'answer schema':<22} {'':>12} {schema_tokens:>8.0f}   (request payload, not prompt text)")
+
+    if args.live:
+        live(prompts, queries, args.turns)
+
+
+if __name__ == "__main__":
+    main()
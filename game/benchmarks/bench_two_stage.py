@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Turn latency of single-call turns versus two-stage turns (llm.two_stage).
+
+Simulated streaming backends answer after a time to first token and then
+emit tokens at a fixed rate: a large narrator model and a small classifier
+model. A single-call turn lets the narrator write the JSON answer
+({"response": ..., "function": ...}) - the action is only known, and the
+state only changes, once the whole answer is generated. A two-stage turn
+asks the classifier for the action name, applies it, and then lets the
+narrator stream the prose.
+
+Reported per mode: time until the state changes (room sound and client
+updates), time to the first narrative text (speech starts) and the
+end-to-end latency. Times are scaled by --scale to keep the run short.
+
+Run with: python benchmarks/bench_two_stage.py [--turns 20] [--narrative-tokens 80]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+GAME_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(GAME_DIR / "src"))
+
+from llm import LLMFunction, LLMMessage, LLMResponse
+from llm.base_provider import BaseLLMProvider
+
+ACTION = "gehe_nach_norden"
+FUNCTIONS = [
+    LLMFunction(ACTION, "Du gehst nach Norden."),
+    LLMFunction("gehe_nach_sueden", "Du gehst nach Süden."),
+    LLMFunction("untersuche_das_fenster", "Du untersuchst das Fenster."),
+    LLMFunction("keine_aktion", "Keine der Aktionen passt zur Eingabe des Spielers"),
+]
+
+
+class StreamingBackend(BaseLLMProvider):
+    """Backend with a time to first token and a constant token rate (one word = one token)."""
+
+    def __init__(self, name: str, first_token: float, tokens_per_second: float, answer: str) -> None:
+        self.first_token: float = first_token
+        self.tokens_per_second: float = tokens_per_second
+        self.answer: str = answer
+        super().__init__(api_key="-", model=name)
+
+    def call_chat(self, messages, functions=None):
+        return self.call_chat_stream(messages, functions, lambda delta: None)
+
+    def call_chat_stream(self, messages, functions, on_delta):
+        time.sleep(self.first_token)
+        for word in self.answer.split(" "):
+            on_delta(word + " ")
+            time.sleep(1 / self.tokens_per_second)
+        return LLMResponse(content=self.answer, model=self.model)
+
+    def _validate_config(self) -> None:
+        pass
+
+
+def single_call(narrator: BaseLLMProvider, narrative: str) -> dict:
+    """One narrator call chooses the function and writes the narrative."""
+    narrator.answer = f'{{"response": "{narrative}", "function": "{ACTION}"}}'
+    started = time.perf_counter()
+    first = []
+    response = narrator.chat_with_functions(
+        [LLMMessage("user", "geh nach norden")], FUNCTIONS, "Du bist der Erzähler.",
+        on_narrative=lambda delta: first or first.append(time.perf_counter())
+    )
+    ended = time.perf_counter()
+    assert response.function_call and response.function_call.name == ACTION
+    # The action is applied once the answer is complete
+    return {"state": ended - started, "first_text": first[0] - started, "total": ended - started}
+
+
+def two_stage(classifier: BaseLLMProvider, narrator: BaseLLMProvider, narrative: str) -> dict:
+    """The classifier picks the function, the narrator writes the prose afterwards."""
+    classifier.answer = ACTION
+    narrator.answer = narrative
+    started = time.perf_counter()
+    choice = classifier.chat([LLMMessage("system", "Aktionen: ..."), LLMMessage("user", "geh nach norden")])
+    assert choice.content == ACTION
+    state = time.perf_counter()
+    first = []
+    narrator.chat(
+        [LLMMessage("system", "Du bist der Erzähler."), LLMMessage("user", "geh nach norden")],
+        on_narrative=lambda delta: first or first.append(time.perf_counter())
+    )
+    ended = time.perf_counter()
+    return {"state": state - started, "first_text": first[0] - started, "total": ended - started}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--narrative-tokens", type=int, default=80, help="length of the narrative")
+    parser.add_argument("--narrator-ttft", type=float, default=0.8, help="narrator time to first token (s)")
+    parser.add_argument("--narrator-tps", type=float, default=40.0, help="narrator tokens per second")
+    parser.add_argument("--classifier-ttft", type=float, default=0.15, help="classifier time to first token (s)")
+    parser.add_argument("--classifier-tps", type=float, default=150.0, help="classifier tokens per second")
+    parser.add_argument("--scale", type=float, default=0.05, help="time scale of the simulation")
+    args = parser.parse_args()
+
+    scale = args.scale
+    narrator = StreamingBackend("narrator", args.narrator_ttft * scale, args.narrator_tps / scale, "")
+    classifier = StreamingBackend("classifier", args.classifier_ttft * scale, args.classifier_tps / scale, "")
+    narrative = " ".join(["Wort"] * args.narrative_tokens)
+
+    print(f"{args.turns} turns, narrative {args.narrative_tokens} tokens, "
+          f"narrator {args.narrator_ttft:.2f}s + {args.narrator_tps:.0f} tok/s, "
+          f"classifier {args.classifier_ttft:.2f}s + {args.classifier_tps:.0f} tok/s (simulated at {scale}x)")
+    print()
+    print(f"{'mode':<12} {'state':>8} {'1st text':>9} {'total':>8}   (average seconds)")
+    for name, turn in (("single", lambda: single_call(narrator, narrative)),
+                       ("two-stage", lambda: two_stage(classifier, narrator, narrative))):
+        results = [turn() for _ in range(args.turns)]
+        average = {key: sum(r[key] for r in results) / len(results) / scale for key in results[0]}
+        print(f"{name:<12} {average['state']:>7.2f}s {average['first_text']:>8.2f}s {average['total']:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Token counting for the prompt benchmarks.
+Uses tiktoken (o200k_base) if it is installed and its encoding can be loaded,
+otherwise estimates tokens as characters / 4.
+"""
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+    TOKENIZER = "tiktoken o200k_base"
+except Exception:  # Not installed, or the encoding cannot be downloaded
+    _ENCODING = None
+    TOKENIZER = "estimate (chars / 4)"
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens of a prompt text."""
+    if _ENCODING is None:
+        return len(text) // 4
+    return len(_ENCODING.encode(text))
@@ -5,11 +5,23 @@ Provides audio sink implementations for TTS output.
 from .base_sink import BaseAudioSink
 from .websocket_sink import WebSocketSink
 from .null_sink import NullSink
-from .pyaudio_sink import PyAudioSink
+from .paced_sink import PacedAudioSink
+from .codecs import AudioEncoder, available_codecs, create_encoder, negotiate_codec
+
+# Optional sinks (PyAudio is only needed for local playback)
+try:
+    from .pyaudio_sink import PyAudioSink
+except ImportError:
+    PyAudioSink = None
 
 __all__ = [
     'BaseAudioSink',
     'WebSocketSink',
     'NullSink',
+    'PacedAudioSink',
     'PyAudioSink',
+    'AudioEncoder',
+    'available_codecs',
+    'create_encoder',
+    'negotiate_codec',
 ]
@@ -34,3 +34,32 @@ class BaseAudioSink(ABC):
             session: Game session
         """
         pass
+
+    def flush(self, session) -> None:
+        """
+        Called at the end of an utterance so sinks that buffer
+        (e.g. the Opus encoder of a WebSocket connection) can emit the rest.
+
+        Args:
+            session: Game session
+        """
+        pass
+
+    def interrupt(self, session) -> None:
+        """
+        Called when speech is stopped (e.g. the player typed again).
+        Sinks that buffer audio should discard it.
+
+        Args:
+            session: Game session
+        """
+        pass
+
+    def resume(self, session) -> None:
+        """
+        Called before a new utterance starts after interrupt().
+
+        Args:
+            session: Game session
+        """
+        pass
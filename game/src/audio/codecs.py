@@ -0,0 +1,408 @@
+"""
+Audio codecs for the WebSocket speech stream.
+
+TTS providers produce 24 kHz mono int16 PCM. Before it goes over the
+WebSocket it can be compressed with a codec negotiated per client:
+
+    pcm        - raw int16 PCM (48 KB/s, no CPU)
+    mulaw      - G.711 µ-law, 8 bit per sample (24 KB/s)
+    ima_adpcm  - IMA-ADPCM, 4 bit per sample in self-contained blocks (~12 KB/s)
+    opus       - Opus in 20 ms packets (~3 KB/s, requires opuslib)
+
+The matching browser decoders live in static/js/handlers/audioCodecs.js.
+"""
+from __future__ import annotations
+import struct
+import threading
+from typing import Dict, List, Optional, Sequence, Type
+
+import numpy as np
+
+try:
+    import opuslib
+    OPUS_AVAILABLE = True
+except ImportError:
+    OPUS_AVAILABLE = False
+
+SAMPLE_RATE = 24000
+
+# Server-side preference order used when negotiating with a client
+DEFAULT_PREFERENCE = ["opus", "ima_adpcm", "mulaw", "pcm"]
+
+
+class AudioEncoder:
+    """
+    Base class for audio encoders.
+    One encoder instance per connection (encoders may keep state).
+    """
+
+    name: str = ""
+
+    def __init__(self) -> None:
+        self._carry: bytes = b""  # Odd trailing byte of a chunk
+        self._lock: threading.Lock = threading.Lock()
+
+    def encode(self, chunk: bytes) -> bytes:
+        """
+        Encode a chunk of int16 PCM.
+
+        Args:
+            chunk: int16 little-endian PCM (bytes or memoryview, any length)
+
+        Returns:
+            Encoded bytes (may be empty if the encoder buffers)
+        """
+        with self._lock:
+            data = self._carry + bytes(chunk) if self._carry else chunk
+            usable: int = len(data) - (len(data) % 2)
+            self._carry = data[usable:]
+            if not usable:
+                return b""
+            return self._encode(np.frombuffer(data[:usable], dtype=np.int16))
+
+    def flush(self) -> bytes:
+        """
+        Encode whatever the encoder still buffers (end of an utterance).
+
+        Returns:
+            Encoded bytes (may be empty)
+        """
+        with self._lock:
+            self._carry = b""
+            return self._flush()
+
+    def reset(self) -> None:
+        """Discard buffered audio and encoder state (speech was interrupted)."""
+        with self._lock:
+            self._carry = b""
+            self._reset()
+
+    def _encode(self, samples: np.ndarray) -> bytes:
+        raise NotImplementedError
+
+    def _flush(self) -> bytes:
+        return b""
+
+    def _reset(self) -> None:
+        pass
+
+
+class PCMEncoder(AudioEncoder):
+    """Pass-through (raw int16 PCM)."""
+
+    name = "pcm"
+
+    def _encode(self, samples: np.ndarray) -> bytes:
+        return samples.tobytes()
+
+
+class MuLawEncoder(AudioEncoder):
+    """G.711 µ-law, vectorized with numpy."""
+
+    name = "mulaw"
+
+    BIAS: int = 0x84
+    CLIP: int = 32635
+
+    def _encode(self, samples: np.ndarray) -> bytes:
+        return mulaw_encode(samples).tobytes()
+
+
+class ImaAdpcmEncoder(AudioEncoder):
+    """
+    IMA-ADPCM in self-contained blocks.
+
+    Every encoded chunk is one block, so a dropped frame does not corrupt
+    the following ones:
+
+        int16  first sample (predictor)
+        uint8  step index
+        uint8  reserved (0)
+        uint16 number of samples in the block
+        n-1 samples as 4 bit codes, low nibble first
+    """
+
+    name = "ima_adpcm"
+
+    HEADER = struct.Struct("<hBBH")
+    MAX_BLOCK_SAMPLES: int = 65535
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._step_index: int = 0  # Carried across blocks so the step size adapts smoothly
+
+    def _encode(self, samples: np.ndarray) -> bytes:
+        blocks: List[bytes] = []
+        for start in range(0, len(samples), self.MAX_BLOCK_SAMPLES):
+            block, self._step_index = adpcm_encode_block(
+                samples[start:start + self.MAX_BLOCK_SAMPLES], self._step_index
+            )
+            blocks.append(block)
+        return b"".join(blocks)
+
+    def _reset(self) -> None:
+        self._step_index = 0
+
+
+class OpusEncoder(AudioEncoder):
+    """
+    Opus (VOIP mode) in 20 ms packets.
+    Each packet is prefixed with its length as uint16 little-endian.
+    Samples that do not fill a packet are kept until the next chunk;
+    flush() pads the last packet with silence.
+    """
+
+    name = "opus"
+
+    FRAME_SAMPLES: int = SAMPLE_RATE // 50  # 20 ms
+
+    def __init__(self, bitrate: int = 24000) -> None:
+        """
+        Args:
+            bitrate: Target bitrate in bits per second
+        """
+        if not OPUS_AVAILABLE:
+            raise ImportError("opuslib package not installed")
+        super().__init__()
+        self._encoder = opuslib.Encoder(SAMPLE_RATE, 1, opuslib.APPLICATION_VOIP)
+        self._encoder.bitrate = bitrate
+        self._pending: np.ndarray = np.array([], dtype=np.int16)
+
+    def _encode(self, samples: np.ndarray) -> bytes:
+        self._pending = np.concatenate([self._pending, samples])
+        packets: List[bytes] = []
+        while len(self._pending) >= self.FRAME_SAMPLES:
+            frame: np.ndarray = self._pending[:self.FRAME_SAMPLES]
+            self._pending = self._pending[self.FRAME_SAMPLES:]
+            packet: bytes = self._encoder.encode(frame.tobytes(), self.FRAME_SAMPLES)
+            packets.append(struct.pack("<H", len(packet)) + packet)
+        return b"".join(packets)
+
+    def _flush(self) -> bytes:
+        if not len(self._pending):
+            return b""
+        padding = np.zeros(self.FRAME_SAMPLES - len(self._pending), dtype=np.int16)
+        self._pending = np.concatenate([self._pending, padding])
+        return self._encode(np.array([], dtype=np.int16))
+
+    def _reset(self) -> None:
+        self._pending = np.array([], dtype=np.int16)
+
+
+ENCODERS: Dict[str, Type[AudioEncoder]] = {
+    PCMEncoder.name: PCMEncoder,
+    MuLawEncoder.name: MuLawEncoder,
+    ImaAdpcmEncoder.name: ImaAdpcmEncoder,
+    OpusEncoder.name: OpusEncoder,
+}
+
+
+def available_codecs() -> List[str]:
+    """Get the codecs this server can encode."""
+    return [name for name in ENCODERS if name != "opus" or OPUS_AVAILABLE]
+
+
+def negotiate_codec(client_codecs: Sequence[str], preference: Optional[Sequence[str]] = None) -> str:
+    """
+    Pick the audio codec for a connection.
+
+    Args:
+        client_codecs: Codecs the client can decode (from the connect URL)
+        preference: Server preference order (default: DEFAULT_PREFERENCE)
+
+    Returns:
+        The first preferred codec both sides support ("pcm" as fallback)
+    """
+    supported: List[str] = available_codecs()
+    for name in preference or DEFAULT_PREFERENCE:
+        if name in supported and name in client_codecs:
+            return name
+    return "pcm"
+
+
+def create_encoder(name: str) -> AudioEncoder:
+    """
+    Create an encoder by codec name.
+
+    Args:
+        name: Codec name (see ENCODERS)
+
+    Returns:
+        New encoder instance
+
+    Raises:
+        ValueError: If the codec is unknown
+    """
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown audio codec: {name}")
+    return ENCODERS[name]()
+
+
+# ---------------------------------------------------------------------------
+# µ-law
+# ---------------------------------------------------------------------------
+
+def mulaw_encode(samples: np.ndarray) -> np.ndarray:
+    """
+    Encode int16 samples to µ-law bytes.
+
+    Args:
+        samples: int16 samples
+
+    Returns:
+        uint8 µ-law codes
+    """
+    pcm: np.ndarray = samples.astype(np.int32)
+    sign: np.ndarray = np.where(pcm < 0, 0x80, 0x00)
+    magnitude: np.ndarray = np.minimum(np.abs(pcm), MuLawEncoder.CLIP) + MuLawEncoder.BIAS
+    exponent: np.ndarray = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa: np.ndarray = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def mulaw_decode(codes: np.ndarray) -> np.ndarray:
+    """
+    Decode µ-law bytes to int16 samples.
+
+    Args:
+        codes: uint8 µ-law codes
+
+    Returns:
+        int16 samples
+    """
+    inverted: np.ndarray = ~codes.astype(np.int32) & 0xFF
+    exponent: np.ndarray = (inverted >> 4) & 0x07
+    mantissa: np.ndarray = inverted & 0x0F
+    magnitude: np.ndarray = ((mantissa << 3) + MuLawEncoder.BIAS) << exponent
+    pcm: np.ndarray = np.where(inverted & 0x80, MuLawEncoder.BIAS - magnitude, magnitude - MuLawEncoder.BIAS)
+    return pcm.astype(np.int16)
+
+
+# ---------------------------------------------------------------------------
+# IMA-ADPCM
+# ---------------------------------------------------------------------------
+
+ADPCM_INDEX_TABLE = [-1, -1, -1, -1, 2, 4, 6, 8, -1, -1, -1, -1, 2, 4, 6, 8]
+
+ADPCM_STEP_TABLE = [
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767
+]
+
+
+def adpcm_encode_block(samples: np.ndarray, step_index: int = 0) -> tuple:
+    """
+    Encode int16 samples into one IMA-ADPCM block.
+
+    The predictor loop is inherently sequential, so it runs on plain
+    Python ints with local lookups (numpy only handles the I/O).
+
+    Args:
+        samples: int16 samples (at most 65535)
+        step_index: Step index to start from
+
+    Returns:
+        Tuple of (block bytes, step index after the block)
+    """
+    values: List[int] = samples.tolist()
+    if not values:
+        return b"", step_index
+
+    step_table = ADPCM_STEP_TABLE
+    index_table = ADPCM_INDEX_TABLE
+    predictor: int = values[0]
+    index: int = step_index
+    header: bytes = ImaAdpcmEncoder.HEADER.pack(predictor, index, 0, len(values))
+
+    codes = bytearray((len(values)) // 2)
+    low: int = -1
+    position: int = 0
+    for sample in values[1:]:
+        step: int = step_table[index]
+        diff: int = sample - predictor
+        code: int = 0
+        if diff < 0:
+            code = 8
+            diff = -diff
+
+        delta: int = step >> 3
+        if diff >= step:
+            code |= 4
+            diff -= step
+            delta += step
+        step >>= 1
+        if diff >= step:
+            code |= 2
+            diff -= step
+            delta += step
+        step >>= 1
+        if diff >= step:
+            code |= 1
+            delta += step
+
+        if code & 8:
+            predictor -= delta
+            if predictor < -32768:
+                predictor = -32768
+        else:
+            predictor += delta
+            if predictor > 32767:
+                predictor = 32767
+
+        index += index_table[code]
+        if index < 0:
+            index = 0
+        elif index > 88:
+            index = 88
+
+        if low < 0:
+            low = code
+        else:
+            codes[position] = low | (code << 4)
+            position += 1
+            low = -1
+
+    if low >= 0:
+        codes[position] = low
+    return header + bytes(codes), index
+
+
+def adpcm_decode(data: bytes) -> np.ndarray:
+    """
+    Decode a sequence of IMA-ADPCM blocks (reference decoder for tests/benchmarks).
+
+    Args:
+        data: Concatenated blocks as produced by ImaAdpcmEncoder
+
+    Returns:
+        int16 samples
+    """
+    header = ImaAdpcmEncoder.HEADER
+    out: List[int] = []
+    offset: int = 0
+    while offset + header.size <= len(data):
+        predictor, index, _, count = header.unpack_from(data, offset)
+        offset += header.size
+        payload: int = count // 2
+        out.append(predictor)
+        for i in range(count - 1):
+            byte: int = data[offset + i // 2]
+            code: int = (byte >> 4) if i % 2 else (byte & 0x0F)
+            step: int = ADPCM_STEP_TABLE[index]
+            delta: int = step >> 3
+            if code & 4:
+                delta += step
+            if code & 2:
+                delta += step >> 1
+            if code & 1:
+                delta += step >> 2
+            predictor = max(-32768, predictor - delta) if code & 8 else min(32767, predictor + delta)
+            index = min(88, max(0, index + ADPCM_INDEX_TABLE[code]))
+            out.append(predictor)
+        offset += payload
+    return np.array(out, dtype=np.int16)
@@ -0,0 +1,126 @@
+"""
+Pacing wrapper for audio sinks.
+Sends audio at playback rate plus a bounded lookahead window.
+"""
+import threading
+import time
+
+from metrics import metrics
+from .base_sink import BaseAudioSink
+
+
+class PacedAudioSink(BaseAudioSink):
+    """
+    Audio sink that forwards chunks to another sink at playback speed.
+
+    TTS providers produce audio much faster than real time. Without pacing
+    the client buffers the whole reply, so a stop can't cut it off server-side
+    and slow clients pile up memory. This wrapper keeps at most
+    lookahead_seconds of audio in flight: write() blocks the producing
+    thread until the audio already sent has (nearly) been played.
+
+    interrupt() wakes blocked writers and drops everything written until
+    resume() is called, so a stop takes effect within the lookahead window.
+    """
+
+    def __init__(self, sink: BaseAudioSink, sample_rate: int = 24000,
+                 lookahead_seconds: float = 0.5, playback_rate: float = 1.0):
+        """
+        Initialize paced sink.
+
+        Args:
+            sink: Sink that receives the paced audio
+            sample_rate: Sample rate of the int16 mono PCM in Hz
+            lookahead_seconds: Audio allowed in flight ahead of playback
+            playback_rate: Playback speed of the client (browser plays at 1.05)
+        """
+        super().__init__()
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.lookahead_seconds = lookahead_seconds
+        self.playback_rate = playback_rate
+        self._play_until = 0.0  # monotonic time at which the client runs out of audio
+        self._interrupted = False
+        self._condition = threading.Condition()
+
+    def write(self, session, chunk: bytes) -> None:
+        """
+        Forward an audio chunk once it is within the lookahead window.
+
+        Args:
+            session: Game session
+            chunk: int16 PCM chunk
+        """
+        duration = len(chunk) / 2 / self.sample_rate / self.playback_rate
+
+        with self._condition:
+            now = time.monotonic()
+            if self._play_until < now:
+                # Client ran dry (or a new utterance starts): restart the clock
+                self._play_until = now
+
+            send_at = self._play_until - self.lookahead_seconds
+            while not self._interrupted:
+                remaining = send_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            if self._interrupted:
+                metrics.counter("audio_bytes_after_stop_total").inc(len(chunk), disposition="dropped")
+                return
+            self._play_until += duration
+
+        self.sink.write(session, chunk)
+
+    def interrupt(self, session) -> None:
+        """
+        Stop the current utterance: wake blocked writers and drop further audio.
+
+        Args:
+            session: Game session
+        """
+        with self._condition:
+            buffered = max(0.0, self._play_until - time.monotonic())
+            self._interrupted = True
+            self._play_until = 0.0
+            self._condition.notify_all()
+
+        # Audio already sent but not yet played is what the client still had queued
+        metrics.histogram("audio_buffered_at_stop_seconds").observe(buffered)
+        metrics.counter("audio_bytes_after_stop_total").inc(
+            int(buffered * self.playback_rate * self.sample_rate) * 2, disposition="buffered"
+        )
+        self.sink.interrupt(session)
+
+    def resume(self, session) -> None:
+        """
+        Accept audio again (start of a new utterance).
+
+        Args:
+            session: Game session
+        """
+        with self._condition:
+            self._interrupted = False
+        self.sink.resume(session)
+
+    def flush(self, session) -> None:
+        """
+        Flush the wrapped sink.
+
+        Args:
+            session: Game session
+        """
+        self.sink.flush(session)
+
+    def close(self, session) -> None:
+        """
+        Close the wrapped sink and release blocked writers.
+
+        Args:
+            session: Game session
+        """
+        with self._condition:
+            self._interrupted = True
+            self._condition.notify_all()
+        self.sink.close(session)
@@ -1,6 +1,9 @@
 """
 WebSocket audio sink for streaming audio to browser.
 """
+import time
+
+from metrics import metrics
 from .base_sink import BaseAudioSink
 
 
@@ -24,7 +27,60 @@ class WebSocketSink(BaseAudioSink):
         """
         if not self.closed and getattr(session, 'message_queue', None) is not None:
             if hasattr(session.message_queue, 'send_bytes'):
-                session.message_queue.send_bytes(chunk)
+                session.message_queue.send_bytes(self._encode(session.message_queue, chunk))
+
+    def flush(self, session) -> None:
+        """
+        Send audio still buffered by the connection's encoder.
+
+        Args:
+            session: Game session
+        """
+        message_queue = getattr(session, 'message_queue', None)
+        encoder = getattr(message_queue, 'audio_encoder', None)
+        if not self.closed and encoder is not None:
+            data = encoder.flush()
+            if data:
+                message_queue.send_bytes(data)
+
+    def interrupt(self, session) -> None:
+        """
+        Drop audio still queued for the browser and tell it to stop playback.
+
+        Args:
+            session: Game session
+        """
+        message_queue = getattr(session, 'message_queue', None)
+        if self.closed or message_queue is None:
+            return
+        if hasattr(message_queue, 'drop_audio'):
+            message_queue.drop_audio()
+        encoder = getattr(message_queue, 'audio_encoder', None)
+        if encoder is not None:
+            encoder.reset()
+        message_queue.send("speak_stop")
+
+    @staticmethod
+    def _encode(message_queue, chunk: bytes) -> bytes:
+        """
+        Encode a PCM chunk with the codec negotiated for the connection.
+
+        Args:
+            message_queue: WebSocket message queue (holds the audio encoder)
+            chunk: int16 PCM chunk
+
+        Returns:
+            Encoded audio (the chunk itself if no codec was negotiated)
+        """
+        encoder = getattr(message_queue, 'audio_encoder', None)
+        if encoder is None:
+            return chunk
+        started = time.perf_counter()
+        data = encoder.encode(chunk)
+        metrics.histogram("audio_encode_seconds").observe(time.perf_counter() - started, codec=encoder.name)
+        metrics.counter("audio_bytes_total").inc(len(chunk), codec=encoder.name, stage="pcm")
+        metrics.counter("audio_bytes_total").inc(len(data), codec=encoder.name, stage="encoded")
+        return data
 
     def close(self, session) -> None:
         """
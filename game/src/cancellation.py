@@ -0,0 +1,112 @@
+"""
+Cooperative cancellation of in-flight work (LLM calls, TTS synthesis, playback).
+"""
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class OperationCancelledError(Exception):
+    """Raised by cancellation checkpoints once the token was cancelled."""
+
+    def __init__(self, reason: str = "cancelled") -> None:
+        super().__init__(f"Operation cancelled ({reason})")
+        self.reason: str = reason
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation signal.
+
+    The owner calls cancel(); workers either poll `cancelled`, call
+    raise_if_cancelled() at checkpoints, or register a callback that is
+    invoked once on cancellation (e.g. to stop audio playback).
+    An optional deadline bounds the network requests made for the token
+    (see remaining()).
+    """
+
+    def __init__(self, deadline: Optional[float] = None) -> None:
+        """
+        Args:
+            deadline: time.monotonic() by which the work must be done (None: no limit)
+        """
+        self._event: threading.Event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock: threading.Lock = threading.Lock()
+        self.reason: Optional[str] = None
+        self.deadline: Optional[float] = deadline
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancel() was called."""
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline (at least 0.1 so a request can still fail fast), None without deadline."""
+        if self.deadline is None:
+            return None
+        return max(0.1, self.deadline - time.monotonic())
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """
+        Cancel the token and run registered callbacks (only the first call has an effect).
+
+        Args:
+            reason: Why the work was cancelled (e.g. "disconnect")
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks: List[Callable[[], None]] = list(self._callbacks)
+            self._callbacks.clear()
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[ERROR] Cancellation callback failed: {e}")
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Register a callback invoked on cancellation (immediately if already cancelled).
+
+        Args:
+            callback: Function without arguments
+
+        Returns:
+            Function that unregisters the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def remove() -> None:
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                return remove
+
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Cancellation checkpoint.
+
+        Raises:
+            OperationCancelledError: If the token was cancelled
+        """
+        if self._event.is_set():
+            raise OperationCancelledError(self.reason or "cancelled")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until cancelled or the timeout expires.
+
+        Returns:
+            True if the token was cancelled
+        """
+        return self._event.wait(timeout)
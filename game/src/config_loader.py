@@ -12,12 +12,14 @@ class GameConfig:
     All paths are absolute and resolved relative to config.yaml location.
     """
     
-    def __init__(self, config_path: Optional[Path] = None):
+    def __init__(self, config_path: Optional[Path] = None, data: Optional[Dict[str, Any]] = None):
         """
         Load and validate configuration.
         
         Args:
             config_path: Path to config.yaml. If None, looks for config.yaml in project root
+            data: Already loaded configuration (e.g. GameSession.config); paths are
+                  then resolved relative to the project root and no file is read
             
         Raises:
             FileNotFoundError: If config file doesn't exist
@@ -29,12 +31,15 @@ class GameConfig:
         
         self._config_path = Path(config_path)
         
-        if not self._config_path.exists():
-            raise FileNotFoundError(f"Config file not found: {self._config_path}")
-        
-        # Load YAML
-        with open(self._config_path, 'r', encoding='utf-8') as f:
-            self._data: Dict[str, Any] = yaml.safe_load(f)
+        if data is not None:
+            self._data: Dict[str, Any] = data
+        else:
+            if not self._config_path.exists():
+                raise FileNotFoundError(f"Config file not found: {self._config_path}")
+
+            # Load YAML
+            with open(self._config_path, 'r', encoding='utf-8') as f:
+                self._data: Dict[str, Any] = yaml.safe_load(f)
         
         # Project root is where config.yaml is located
         self._project_root = self._config_path.parent
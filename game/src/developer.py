@@ -9,6 +9,7 @@ Endpoints:
     POST /reload       - Hot-reload game definition (preserves state/inventory)
     POST /reset        - Full reset (reload + reset state/inventory)
     GET  /status       - Get current session status
+    GET  /metrics      - Get runtime metrics
 
 Usage:
     cd game/src && python developer.py
@@ -33,6 +34,8 @@ from session import GameSession
 from config_loader import GameConfig, load_config
 from audio import PyAudioSink
 from sound import LocalJukebox
+from metrics import metrics
+from llm import LLMQueueFullError
 
 
 # === Pydantic Models ===
@@ -223,7 +226,10 @@ async def chat(request: ChatRequest) -> ChatResponse:
     session = get_session()
     
     # Process input directly - returns dict with response and executed_action
-    result = session.game_engine.process_input(request.message)
+    try:
+        result = session.game_engine.process_input(request.message)
+    except LLMQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(max(1, int(e.retry_after)))})
     
     return ChatResponse(
         response=result['response'],
@@ -386,6 +392,14 @@ async def status() -> StatusResponse:
     )
 
 
+@app.get("/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """
+    Get runtime metrics (latencies, queues, caches).
+    """
+    return metrics.snapshot()
+
+
 # === Main ===
 
 if __name__ == "__main__":
@@ -402,6 +416,7 @@ if __name__ == "__main__":
     print("  POST /reload       - Hot-reload (preserve state)")
     print("  POST /reset        - Full reset")
     print("  GET  /status       - Get session status")
+    print("  GET  /metrics      - Get runtime metrics")
     print()
     
     uvicorn.run(
@@ -0,0 +1,189 @@
+"""
+Lexical relevance ranking of the available actions for the current input.
+In busy states the function catalog dominates the prompt; only the actions
+that are relevant for what the player typed are sent to the LLM.
+"""
+from __future__ import annotations
+import math
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from intent_matcher import tokenize
+from metrics import metrics
+
+if TYPE_CHECKING:
+    from llm import LLMFunction
+
+# Name of the fallback function that is always offered
+NO_ACTION: str = "keine_aktion"
+
+
+class BM25Index:
+    """
+    Okapi BM25 over action documents (name words count twice, plus description).
+    Uses the German normalization and stemming of the intent matcher.
+    """
+
+    def __init__(self, documents: List[Tuple[str, str]], k1: float = 1.2, b: float = 0.75) -> None:
+        """
+        Args:
+            documents: List of (name, description)
+            k1: Term frequency saturation
+            b: Length normalization
+        """
+        self.k1: float = k1
+        self.b: float = b
+        self.names: List[str] = [name for name, _ in documents]
+        self._terms: List[Counter] = [
+            Counter(tokenize(name) * 2 + tokenize(description)) for name, description in documents
+        ]
+        self._lengths: List[int] = [sum(terms.values()) for terms in self._terms]
+        self._average_length: float = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+        document_frequency: Counter = Counter()
+        for terms in self._terms:
+            document_frequency.update(terms.keys())
+        count: int = len(documents)
+        self._idf: Dict[str, float] = {
+            term: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        """
+        Score every document against a query.
+
+        Args:
+            query: Player input
+
+        Returns:
+            One score per document (0.0 = no shared term)
+        """
+        query_terms: List[str] = tokenize(query)
+        results: List[float] = []
+        for terms, length in zip(self._terms, self._lengths):
+            score: float = 0.0
+            for term in query_terms:
+                frequency: int = terms.get(term, 0)
+                if not frequency:
+                    continue
+                norm: float = self.k1 * (1 - self.b + self.b * length / (self._average_length or 1))
+                score += self._idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+            results.append(score)
+        return results
+
+
+class FunctionShortlist:
+    """
+    Keeps the top_k most relevant functions for the player input.
+
+    keine_aktion is always kept. The full list is used when shortlisting
+    cannot save anything (few actions) or when the input shares no word
+    with any action - chat-like or purely semantic input ("du bist doof")
+    must still see every trigger. Indexes are cached per action set.
+    """
+
+    def __init__(self, top_k: int = 6, min_functions: int = 8, cache_size: int = 256) -> None:
+        """
+        Args:
+            top_k: Number of actions kept (plus keine_aktion)
+            min_functions: Only shortlist states with more functions than this
+            cache_size: Number of cached indexes (one per distinct action set)
+        """
+        self.top_k: int = top_k
+        self.min_functions: int = min_functions
+        self.cache_size: int = cache_size
+        self.enabled: bool = True
+        self.retry_full: bool = False
+        self._indexes: "OrderedDict[Tuple[Tuple[str, str], ...], BM25Index]" = OrderedDict()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> FunctionShortlist:
+        """
+        Create a shortlist from the llm.function_shortlist section of config.yaml.
+
+        Args:
+            config: Function shortlist configuration dict
+        """
+        shortlist: FunctionShortlist = cls(
+            top_k=int(config.get('top_k', 6)),
+            min_functions=int(config.get('min_functions', 8))
+        )
+        shortlist.enabled = bool(config.get('enabled', True))
+        # Ask again with all functions if the shortlisted call chose keine_aktion
+        # although the shortlist left out matching actions (costs a second LLM call)
+        shortlist.retry_full = bool(config.get('retry_full', False))
+        return shortlist
+
+    def select(self, functions: List[LLMFunction], user_input: str) -> Optional[List[LLMFunction]]:
+        """
+        Select the relevant functions for an input.
+
+        Args:
+            functions: All available functions (including keine_aktion)
+            user_input: Player input
+
+        Returns:
+            Shortlisted functions in their original order, or None to use the full list
+        """
+        actions: List[LLMFunction] = [f for f in functions if f.name != NO_ACTION]
+        if not self.enabled or len(functions) <= self.min_functions or len(actions) <= self.top_k:
+            return None
+
+        scores: List[float] = self._index(actions).scores(user_input)
+        if max(scores, default=0.0) <= 0.0:
+            metrics.counter("function_shortlist_total").inc(result="fallback")
+            return None
+
+        ranked: List[int] = sorted(range(len(actions)), key=lambda i: scores[i], reverse=True)
+        keep: set = {actions[i].name for i in ranked[:self.top_k] if scores[i] > 0.0}
+        selected: List[LLMFunction] = [f for f in functions if f.name in keep or f.name == NO_ACTION]
+        metrics.counter("function_shortlist_total").inc(result="shortlisted")
+        metrics.counter("function_shortlist_dropped_total").inc(len(functions) - len(selected))
+        return selected
+
+    def relevance(self, functions: List[LLMFunction], user_input: str) -> List[Tuple[str, float]]:
+        """
+        Rank the actions (without keine_aktion) by relevance for an input.
+
+        Args:
+            functions: Available functions
+            user_input: Player input
+
+        Returns:
+            List of (function name, BM25 score), best first
+        """
+        actions: List[LLMFunction] = [f for f in functions if f.name != NO_ACTION]
+        if not actions:
+            return []
+        scores: List[float] = self._index(actions).scores(user_input)
+        return sorted(zip((f.name for f in actions), scores), key=lambda item: item[1], reverse=True)
+
+    def cut_matches(self, functions: List[LLMFunction], shortlist: List[LLMFunction], user_input: str) -> bool:
+        """
+        Check whether the shortlist left out actions that share a word with the input.
+        Only then can asking again with all functions find a better action.
+
+        Args:
+            functions: All available functions
+            shortlist: Result of select()
+            user_input: Player input
+
+        Returns:
+            True if a left-out action scores against the input
+        """
+        kept: set = {f.name for f in shortlist}
+        return any(score > 0.0 and name not in kept for name, score in self.relevance(functions, user_input))
+
+    def _index(self, actions: List[LLMFunction]) -> BM25Index:
+        """Get the (cached) index of an action set."""
+        key: Tuple[Tuple[str, str], ...] = tuple((f.name, f.description) for f in actions)
+        index: Optional[BM25Index] = self._indexes.get(key)
+        if index is None:
+            index = BM25Index(list(key))
+            self._indexes[key] = index
+            while len(self._indexes) > self.cache_size:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(key)
+        return index
@@ -1,13 +1,23 @@
 from __future__ import annotations
 import threading
-from typing import TYPE_CHECKING, List, Optional
-
-from llm import LLMFactory, LLMMessage, LLMFunction, BaseLLMProvider
-from game_history import GameHistory
-from voice import VoiceFactory, BaseTTSProvider
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+from llm import LLMFactory, LLMMessage, LLMFunction, BaseLLMProvider, LLMQueueFullError, Priority
+from metrics import metrics
+from cancellation import CancellationToken, OperationCancelledError
+from game_history import GameHistory, HistoryEntry
+from voice import VoiceFactory, BaseTTSProvider, SentenceSplitter, SpeechPipeline
+from welcome_cache import welcome_cache
+from narration_bundle import NarrationBundle, get_narration_bundle
+from response_cache import relevant_variables, response_cache
+from usage import usage_tracker
+from intent_matcher import IntentMatch, IntentMatcher
+from function_index import NO_ACTION, FunctionShortlist
 
 if TYPE_CHECKING:
     from session import GameSession
+    from state_engine import Action
 
 
 class GameController:
@@ -25,25 +35,104 @@ class GameController:
         """
         self.session: GameSession = session
         # LLM is implementation detail of this controller
-        self.llm_factory: LLMFactory = LLMFactory()
+        self.llm_factory: LLMFactory = LLMFactory(config=session.config)
         self.llm_provider: BaseLLMProvider = self.llm_factory.create_provider()
 
         # Structured history instead of simple message list
         max_length: int = self.llm_factory.config.get('llm', {}).get('max_history_length', 20)
-        self.history: GameHistory = GameHistory(max_length=max_length)
+        history_config: dict = self.llm_factory.config.get('llm', {}).get('history', {})
+        self.history: GameHistory = GameHistory(
+            max_length=max_length,
+            max_tokens=int(history_config.get('max_tokens', 0))
+        )
+
+        # Turns beyond the token budget are summarized in the background,
+        # optionally by a cheaper model (llm.history.summary_model)
+        self.history_summary_words: int = int(history_config.get('summary_words', 150))
+        self.summary_provider: BaseLLMProvider = self.llm_provider
+        summary_model: Optional[str] = history_config.get('summary_model')
+        if self.history.max_tokens and summary_model:
+            self.summary_provider = self.llm_factory.create_provider(
+                history_config.get('summary_provider'), model=summary_model
+            )
+
+        # Two-stage turns: a small classifier model picks the action, which is
+        # applied right away; the narrator (llm_provider) then only writes the
+        # prose for the new state (llm.two_stage)
+        two_stage_config: dict = self.llm_factory.config.get('llm', {}).get('two_stage', {})
+        self.two_stage: bool = bool(two_stage_config.get('enabled', False))
+        self.classifier_context_turns: int = int(two_stage_config.get('context_turns', 2))
+        self.classifier_provider: BaseLLMProvider = self.llm_provider
+        if self.two_stage and two_stage_config.get('model'):
+            self.classifier_provider = self.llm_factory.create_provider(
+                two_stage_config.get('provider'), model=two_stage_config['model']
+            )
+
+        # Pool of pre-generated welcome turns shared by all sessions
+        welcome_cache.configure(self.llm_factory.config.get('llm', {}).get('welcome_cache', {}))
 
         # Voice/TTS provider with audio sink from session
-        self.voice_factory: VoiceFactory = VoiceFactory()
+        self.voice_factory: VoiceFactory = VoiceFactory(config=session.config)
         self.voice_provider: BaseTTSProvider = self.voice_factory.create_provider(session.audio_sink)
 
+        # Sentence-pipelined speech: stream the LLM reply and speak each sentence
+        # as soon as it is complete (needs a provider that can synthesize sentences)
+        self.sentence_streaming: bool = (
+            self.voice_factory.config.get('sentence_streaming', True)
+            and self.voice_provider.SUPPORTS_SYNTHESIS
+            and self.voice_provider.audio_sink is not None
+        )
+        self._speech_pipeline: Optional[SpeechPipeline] = None
+
+        # Pre-generated narration of the map (pregenerate.py): fast path for the
+        # welcome turn and fallback when the LLM fails (loaded on game start)
+        self.narration_config: dict = self.llm_factory.config.get('llm', {}).get('narration_bundle', {})
+        self.narration_bundle: Optional[NarrationBundle] = None
+
+        # Clear-cut commands are resolved to an action without the LLM
+        intent_config: dict = self.llm_factory.config.get('llm', {}).get('intent_matcher', {})
+        self.intent_matcher: IntentMatcher = IntentMatcher.from_config(intent_config)
+        self.intent_narration: List[str] = list(intent_config.get('narration', ['bundle', 'llm', 'after_fire']))
+        # The narration of a matched action is short - a cheap model is enough
+        # (llm.intent_matcher.narration_model, else the two-stage classifier)
+        self.narration_provider: BaseLLMProvider = self.classifier_provider
+        if intent_config.get('narration_model'):
+            self.narration_provider = self.llm_factory.create_provider(
+                intent_config.get('narration_provider'), model=intent_config['narration_model']
+            )
+
+        # Functions per (state, available actions), see _build_functions
+        self._functions_cache: dict = {}
+
+        # Only the actions relevant for the input are offered in busy states
+        self.function_shortlist: FunctionShortlist = FunctionShortlist.from_config(
+            self.llm_factory.config.get('llm', {}).get('function_shortlist', {})
+        )
+
+        # Answers to repeated input (only for maps that opt in)
+        response_cache.configure(self.llm_factory.config.get('llm', {}).get('response_cache', {}))
+        self._game_hash: Optional[str] = None
+
+        # Token usage per session, game and provider (GET /usage, console "usage")
+        usage_tracker.configure(self.llm_factory.config.get('llm', {}).get('usage', {}))
+
+        # Session cancellation (client disconnect) stops speech of the running turn
+        self._watched_token: Optional[CancellationToken] = None
+        self._unwatch: Optional[Callable[[], None]] = None
+
     def _build_base_prompt(self) -> str:
         """
         Build base system prompt (identity, behavior, current state).
         Does NOT include function calling instructions.
         """
-        from state_engine import StateEngine
-        
-        state_engine: StateEngine = self.session.game_engine.state_engine
+        return self._build_static_prompt() + self._build_state_prompt()
+
+    def _build_static_prompt(self) -> str:
+        """
+        Build the part of the system prompt that is the same for every turn
+        of the game (identity, behavior). Sent first so providers with
+        prefix caching can reuse it.
+        """
         game_data: dict = self.session.game_engine.game_data
 
         # Combine identity and behaviour from game_data
@@ -57,47 +146,49 @@ class GameController:
         if behaviour:
             prompt += behaviour + "\n\n"
 
-        # Add current room description
-        from state_engine import State
-        current_state: State = state_engine.get_current_state()
-        prompt += f"AKTUELLER RAUM:\n{current_state.get_description()}\n"
-
         return prompt
 
-    def _build_functions(self) -> List[LLMFunction]:
-        """
-        Build list of available functions from current game state.
-        Each action becomes a callable function.
+    def _build_state_prompt(self) -> str:
+        """Build the per-state block of the system prompt (current room description)."""
+        from state_engine import State
+        current_state: State = self.session.game_engine.state_engine.get_current_state()
+        return f"AKTUELLER RAUM:\n{current_state.get_description()}\n"
+
+    @staticmethod
+    def action_function(action: Action) -> LLMFunction:
         """
-        from state_engine import StateEngine, Action
-        
-        state_engine: StateEngine = self.session.game_engine.state_engine
-        actions: List[Action] = state_engine.get_available_actions()
+        Describe an action as a callable function.
 
-        functions: List[LLMFunction] = []
-        for action in actions:
-            # Build description with after_fire hint if available
-            description: str = action.description
-            if action.after_fire:
-                description += f". Falls du diese Aktion auswählst, dann bitte dies in deiner Antwort berücksichtigen: {action.after_fire}"
-
-            functions.append(LLMFunction(
-                name=action.name,
-                description=description,
-                parameters={
-                    "type": "object",
-                    "properties": {
-                        "response": {
-                            "type": "string",
-                            "description": "Deine narrative Antwort an den Spieler (kurz, in character)"
-                        }
-                    },
-                    "required": ["response"]
-                }
-            ))
+        Args:
+            action: Available action
+
+        Returns:
+            LLMFunction (description includes the after_fire hint)
+        """
+        # Build description with after_fire hint if available
+        description: str = action.description
+        if action.after_fire:
+            description += f". Falls du diese Aktion auswählst, dann bitte dies in deiner Antwort berücksichtigen: {action.after_fire}"
+
+        return LLMFunction(
+            name=action.name,
+            description=description,
+            parameters={
+                "type": "object",
+                "properties": {
+                    "response": {
+                        "type": "string",
+                        "description": "Deine narrative Antwort an den Spieler (kurz, in character)"
+                    }
+                },
+                "required": ["response"]
+            }
+        )
 
-        # Always add fallback action
-        functions.append(LLMFunction(
+    @staticmethod
+    def no_action_function() -> LLMFunction:
+        """The fallback function offered in every turn."""
+        return LLMFunction(
             name="keine_aktion",
             description="Keine der Aktionen passt zur Eingabe des Spielers",
             parameters={
@@ -110,9 +201,29 @@ class GameController:
                 },
                 "required": ["response"]
             }
-        ))
+        )
 
-        return functions
+    def _build_functions(self) -> List[LLMFunction]:
+        """
+        Build list of available functions from current game state.
+        Each action becomes a callable function.
+        """
+        from state_engine import StateEngine, Action
+        
+        state_engine: StateEngine = self.session.game_engine.state_engine
+        actions: List[Action] = state_engine.get_available_actions()
+
+        # Unchanged states reuse the same functions (and thus the same cached catalog text)
+        key: tuple = (state_engine.current_state, tuple(action.name for action in actions))
+        functions: Optional[List[LLMFunction]] = self._functions_cache.get(key)
+        if functions is None:
+            functions = [self.action_function(action) for action in actions]
+
+            # Always add fallback action
+            functions.append(self.no_action_function())
+            self._functions_cache[key] = functions
+
+        return list(functions)
 
     def start_game(self) -> str:
         """
@@ -122,9 +233,12 @@ class GameController:
             LLM's welcome message
         """
         self.history.clear()
+        self._load_narration_bundle()
 
         # Build base prompt and functions
-        base_prompt: str = self._build_base_prompt()
+        static_prompt: str = self._build_static_prompt()
+        state_prompt: str = self._build_state_prompt()
+        base_prompt: str = static_prompt + state_prompt
         functions: List[LLMFunction] = self._build_functions()
 
         # Get welcome prompt from game definition
@@ -132,25 +246,54 @@ class GameController:
         game_data: dict = self.session.game_engine.game_data
         welcome_prompt: str = game_data.get('welcome_prompt', 'Das Spiel beginnt!')
 
-        # Create messages for LLM call
-        messages: List[LLMMessage] = [
-            LLMMessage(role="system", content=base_prompt),
-            LLMMessage(role="user", content=welcome_prompt)
-        ]
-
-        # Get LLM's welcome response
-        from llm import LLMResponse
-        try:
-            response: LLMResponse = self.llm_provider.chat_with_functions(
-                messages,
-                functions,
-                base_prompt
+        # Serve a pre-generated welcome turn if one is cached for this start situation
+        cache_key: Optional[str] = None
+        welcome_text: Optional[str] = None
+        if self.narration_config.get('fast_path', False) and self.narration_bundle is not None:
+            welcome_text = self.narration_bundle.pick("welcome")
+        if welcome_text is None and welcome_cache.enabled:
+            cache_key = welcome_cache.make_key(
+                game_data,
+                self.session.game_engine.inventory.to_dict(),
+                base_prompt,
+                welcome_prompt,
+                self.llm_provider.model
             )
-            welcome_text: str = response.content
-        except Exception:
-            # Fallback to state description if LLM fails
-            current_state = self.session.game_engine.state_engine.get_current_state()
-            return current_state.get_description()
+            welcome_text = welcome_cache.take(cache_key)
+        from_cache: bool = welcome_text is not None
+
+        cancel_token: CancellationToken = self._watch_cancellation()
+        pipeline: Optional[SpeechPipeline] = self._start_speech_pipeline(time.perf_counter())
+        metadata: dict = {"type": "welcome", "cached": from_cache}
+        if welcome_text is None:
+            try:
+                welcome_text = self._generate_welcome(
+                    static_prompt,
+                    state_prompt,
+                    functions,
+                    welcome_prompt,
+                    on_narrative=pipeline.feed if pipeline else None,
+                    cancel_token=cancel_token,
+                    metadata=metadata
+                )
+            except Exception:
+                if pipeline:
+                    pipeline.stop()
+                # Fallback to pre-generated narration or the state description if LLM fails
+                fallback: Optional[str] = self._bundle_narration("welcome")
+                if fallback:
+                    self._speak_fallback(fallback)
+                    return fallback
+                current_state = self.session.game_engine.state_engine.get_current_state()
+                return current_state.get_description()
+            if cache_key is not None:
+                welcome_cache.add(cache_key, welcome_text)
+
+        if cache_key is not None:
+            # Keep the pool topped up (background priority, optionally with pre-synthesized audio)
+            welcome_cache.refill(cache_key, lambda: self._generate_welcome(
+                static_prompt, state_prompt, functions, welcome_prompt, priority=Priority.BACKGROUND, presynthesize=True
+            ))
 
         # Add to structured history
         self.history.add_entry(
@@ -159,15 +302,75 @@ class GameController:
             available_functions=functions,
             llm_response=welcome_text,
             chosen_function="keine_aktion",
-            metadata={"type": "welcome"}
+            metadata=metadata
         )
 
         # Send initial ambient sound for starting state
         self._send_initial_ambient()
 
-        # Convert to speech
-        self.voice_provider.speak(self.session, welcome_text)
+        # Convert to speech (unless the client went away meanwhile)
+        if cancel_token.cancelled:
+            pass
+        elif pipeline:
+            pipeline.finish(welcome_text)
+        else:
+            self.voice_provider.speak(self.session, welcome_text)
+
+        return welcome_text
+
+    def _generate_welcome(
+        self,
+        static_prompt: str,
+        state_prompt: str,
+        functions: List[LLMFunction],
+        welcome_prompt: str,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        priority: Optional[Priority] = None,
+        presynthesize: bool = False,
+        metadata: Optional[dict] = None
+    ) -> str:
+        """
+        Ask the LLM for a welcome turn.
+
+        Args:
+            static_prompt: Static part of the system prompt (identity, behavior)
+            state_prompt: Per-state block of the system prompt (current room)
+            functions: Available functions
+            welcome_prompt: Welcome prompt from the game definition
+            on_narrative: Optional streaming callback (speech pipeline)
+            cancel_token: Optional cancellation token
+            priority: Admission priority (None = provider default)
+            presynthesize: Warm the TTS audio cache with the generated text
+            metadata: Optional history metadata to add the token usage to
 
+        Returns:
+            Welcome text
+        """
+        from llm import LLMResponse
+        messages: List[LLMMessage] = [
+            LLMMessage(role="user", content=welcome_prompt)
+        ]
+        started: float = time.perf_counter()
+        response: LLMResponse = self.llm_provider.chat_with_functions(
+            messages,
+            functions,
+            static_prompt,
+            on_narrative=on_narrative,
+            priority=priority,
+            cancel_token=cancel_token,
+            state_prompt=state_prompt
+        )
+        usage: dict = self._record_usage(self.llm_provider, response, time.perf_counter() - started, "welcome")
+        if metadata is not None:
+            metadata.update(usage)
+        welcome_text: str = response.content
+
+        if presynthesize and welcome_cache.presynthesize and self.voice_provider.audio_cache is not None:
+            # Same sentence split as SpeechPipeline, so playback hits the audio cache
+            splitter: SentenceSplitter = SentenceSplitter()
+            for sentence in splitter.feed(welcome_text) + splitter.flush():
+                self.voice_provider.synthesize_cached(sentence)
         return welcome_text
 
     def process_input(self, user_input: str) -> dict:
@@ -179,11 +382,16 @@ class GameController:
 
         Returns:
             Dict with 'response' (str), 'executed_action' (str or None)
+
+        Raises:
+            LLMQueueFullError: If the LLM provider is saturated (admission control)
         """
         from llm import LLMResponse
         
-        # Build current functions and base prompt
-        base_prompt: str = self._build_base_prompt()
+        # Build current functions and base prompt (static part first for prefix caching)
+        static_prompt: str = self._build_static_prompt()
+        state_prompt: str = self._build_state_prompt()
+        base_prompt: str = static_prompt + state_prompt
         functions: List[LLMFunction] = self._build_functions()
 
         # Convert history to LLM messages
@@ -192,15 +400,117 @@ class GameController:
         # Add current user input
         messages.append(LLMMessage(role="user", content=user_input))
 
+        # Stop any current speech before starting new one
+        turn_started: float = time.perf_counter()
+        self._stop_speech()
+        cancel_token: CancellationToken = self._watch_cancellation()
+        pipeline: Optional[SpeechPipeline] = self._start_speech_pipeline(turn_started)
+
+        # Clear-cut commands are resolved locally, repeated input in the same
+        # situation is answered from the response cache
+        from llm import LLMFunctionCall
+        intent: Optional[IntentMatch] = self._match_intent(user_input)
+        cache_key: Optional[str] = None if intent else self._response_cache_key(user_input)
+        cached: Optional[dict] = response_cache.get(cache_key) if cache_key else None
+        source: str = "intent" if intent else "cache" if cached is not None else "llm"
+
         # Get LLM response with function calling
+        # (narrative is streamed into the speech pipeline while the LLM generates)
+        usage: dict = {}
+        executed: Optional[tuple] = None
         try:
-            response: LLMResponse = self.llm_provider.chat_with_functions(messages, functions, base_prompt)
+            if intent is not None:
+                # Apply the action first, the narration describes its outcome
+                executed = self.session.game_engine.state_engine.execute_action(intent.action.name)
+                metrics.histogram("turn_state_update_seconds").observe(time.perf_counter() - turn_started, mode="intent")
+                narrative: str = self._narrate_intent(
+                    intent.action, executed, user_input, static_prompt, cancel_token,
+                    on_narrative=pipeline.feed if pipeline else None
+                )
+                response: LLMResponse = LLMResponse(
+                    content=narrative,
+                    model="intent-matcher",
+                    function_call=LLMFunctionCall(intent.action.name, {"response": narrative})
+                )
+            elif cached is not None:
+                response: LLMResponse = LLMResponse(
+                    content=cached['response'],
+                    model=self.llm_provider.model,
+                    function_call=LLMFunctionCall(cached['function'], {"response": cached['response']}) if cached['function'] else None
+                )
+            elif self.two_stage:
+                response, executed, usage = self._two_stage_turn(
+                    user_input, messages, functions, static_prompt, pipeline, cancel_token, turn_started
+                )
+            else:
+                shortlist: Optional[List[LLMFunction]] = self.function_shortlist.select(functions, user_input)
+                # A retry is only possible if the shortlist cut matching actions; the narration
+                # of such a call is buffered (spoken by pipeline.finish) so a retry is not heard
+                may_retry: bool = (
+                    shortlist is not None
+                    and self.function_shortlist.retry_full
+                    and self.function_shortlist.cut_matches(functions, shortlist, user_input)
+                )
+                started: float = time.perf_counter()
+                response = self.llm_provider.chat_with_functions(
+                    messages,
+                    shortlist or functions,
+                    static_prompt,
+                    on_narrative=pipeline.feed if pipeline and not may_retry else None,
+                    cancel_token=cancel_token,
+                    state_prompt=state_prompt
+                )
+                usage = self._record_usage(
+                    self.llm_provider, response, time.perf_counter() - started, "turn", self.history.turn_counter + 1
+                )
+                no_action: bool = response.function_call is None or response.function_call.name == NO_ACTION
+                if may_retry and no_action:
+                    # The relevant action may have been cut - ask again with all functions
+                    metrics.counter("function_shortlist_total").inc(result="retry")
+                    started = time.perf_counter()
+                    response = self.llm_provider.chat_with_functions(
+                        messages,
+                        functions,
+                        static_prompt,
+                        on_narrative=pipeline.feed if pipeline else None,
+                        cancel_token=cancel_token,
+                        state_prompt=state_prompt
+                    )
+                    retry_usage: dict = self._record_usage(
+                        self.llm_provider, response, time.perf_counter() - started, "retry", self.history.turn_counter + 1
+                    )
+                    usage = self._merge_usage(usage, retry_usage)
+        except OperationCancelledError:
+            # Client disconnected while the LLM was generating - nobody is listening
+            if pipeline:
+                pipeline.stop(reason=cancel_token.reason or "cancelled")
+            return {'response': '', 'executed_action': None, 'cancelled': True}
+        except LLMQueueFullError:
+            # Overload is reported to the caller (HTTP 429), not as game text
+            if pipeline:
+                pipeline.stop()
+            raise
         except Exception as e:
+            if pipeline:
+                pipeline.stop()
+            # LLM down: describe the current room from the pre-generated narration
+            current_state_name: str = self.session.game_engine.state_engine.current_state
+            fallback: Optional[str] = self._bundle_narration(f"state:{current_state_name}")
+            if fallback:
+                print(f"[NARRATION] LLM failed ({e}) - using pre-generated narration")
+                self.history.add_entry(
+                    user_input=user_input,
+                    base_prompt=base_prompt,
+                    available_functions=functions,
+                    llm_response=fallback,
+                    chosen_function="keine_aktion",
+                    metadata={"type": "fallback"}
+                )
+                self._speak_fallback(fallback)
+                return {'response': fallback, 'executed_action': None}
             return f"Fehler beim LLM-Aufruf: {e}"
 
         # Extract narrative response and function call
-        from llm import LLMFunctionCall
-        
         narrative_response: str = response.content
         function_call: Optional[LLMFunctionCall] = response.function_call
 
@@ -215,40 +525,59 @@ class GameController:
                 narrative_response = "Ich bin verwirrt... Kannst du das anders formulieren?"
             # else: keep the narrative response as-is (no action needed)
 
-        # Execute the action if one was chosen
+        # Execute the action if one was chosen (two-stage turns did so before narrating)
         function_success: bool = True
         if function_call and function_call.name != "keine_aktion":
             action_name: str = function_call.name
             success: bool
             message: str
-            success, message = self.session.game_engine.state_engine.execute_action(action_name)
+            if executed is not None:
+                success, message = executed
+            else:
+                success, message = self.session.game_engine.state_engine.execute_action(action_name)
+                metrics.histogram("turn_state_update_seconds").observe(time.perf_counter() - turn_started, mode="single")
             function_success = success
 
-            if not success:
-                # Action failed (hook veto or invalid)
+            if not success and executed is None:
+                # Action failed (hook veto or invalid) - two-stage narration already tells the player
                 narrative_response = f"{narrative_response}\n\n(Action konnte nicht ausgeführt werden: {message})"
 
-        # Add to structured history
+        if cache_key is not None:
+            if not function_success:
+                response_cache.invalidate(cache_key)
+            elif source == "llm" and function_call is not None:
+                response_cache.put(cache_key, narrative_response, chosen_function_name)
+
+        # Add to structured history (with the token usage and latency of the LLM calls of this turn)
+        metadata: dict = {"source": source, **usage}
         self.history.add_entry(
             user_input=user_input,
             base_prompt=base_prompt,
             available_functions=functions,
             llm_response=narrative_response,
             chosen_function=chosen_function_name,
-            function_success=function_success
+            function_success=function_success,
+            metadata=metadata
         )
 
-        # Stop any current speech before starting new one
-        self.voice_provider.stop(self.session)
+        if cancel_token.cancelled:
+            # Client went away after the LLM answered - skip speech
+            pass
+        elif pipeline:
+            # Speak whatever was not streamed yet (or everything if the provider didn't stream)
+            pipeline.finish(narrative_response)
+        else:
+            # Convert to speech in background thread (non-blocking)
+            # This allows the text response to return immediately
+            tts_thread = threading.Thread(
+                target=self.voice_provider.speak,
+                args=(self.session, narrative_response),
+                daemon=True
+            )
+            tts_thread.start()
 
-        # Convert to speech in background thread (non-blocking)
-        # This allows the text response to return immediately
-        tts_thread = threading.Thread(
-            target=self.voice_provider.speak,
-            args=(self.session, narrative_response),
-            daemon=True
-        )
-        tts_thread.start()
+        # Fold turns that fell out of the token budget into the summary (off the critical path)
+        self.history.summarize_async(self._summarize_history)
 
         # Return response with metadata
         return {
@@ -256,6 +585,414 @@ class GameController:
             'executed_action': chosen_function_name if chosen_function_name != "keine_aktion" else None
         }
 
+    def _two_stage_turn(
+        self,
+        user_input: str,
+        messages: List[LLMMessage],
+        functions: List[LLMFunction],
+        static_prompt: str,
+        pipeline: Optional[SpeechPipeline],
+        cancel_token: CancellationToken,
+        turn_started: float
+    ) -> Tuple[LLMResponse, Optional[Tuple[bool, str]], dict]:
+        """
+        Two-stage turn: classify the input, apply the action, then narrate.
+        The state (and with it room sounds and client updates) changes as soon
+        as the classifier has answered, the narrator streams its prose for
+        the new state afterwards.
+
+        Args:
+            user_input: Player input
+            messages: History messages of the turn (system prompt first)
+            functions: Available functions
+            static_prompt: Static part of the system prompt
+            pipeline: Speech pipeline receiving the narration (or None)
+            cancel_token: Cancellation token of the turn
+            turn_started: Start of the turn (perf_counter)
+
+        Returns:
+            (response with the chosen function call, (success, message) of the
+            executed action or None for keine_aktion, usage metadata)
+        """
+        from llm import LLMFunctionCall, LLMResponse
+        action_name, usage = self._classify_action(user_input, messages, functions, cancel_token)
+
+        executed: Optional[Tuple[bool, str]] = None
+        hint: str = "Keine der möglichen Aktionen passt zur Eingabe. Antworte dem Spieler kurz und in character."
+        if action_name != NO_ACTION:
+            state_engine = self.session.game_engine.state_engine
+            action: Optional[Action] = next(
+                (a for a in state_engine.get_available_actions() if a.name == action_name), None
+            )
+            executed = state_engine.execute_action(action_name)
+            metrics.histogram("turn_state_update_seconds").observe(time.perf_counter() - turn_started, mode="two_stage")
+            success, message = executed
+            if success:
+                done: str = ((action.after_fire or action.description) if action else action_name).strip().rstrip(".")
+                hint = f"Die Aktion wurde ausgeführt: {done}. "
+                hint += "Erzähle dem Spieler kurz und in character, was passiert."
+            else:
+                hint = f"Die Aktion '{action_name}' ist nicht möglich ({message}). Erkläre es dem Spieler kurz und in character."
+        metrics.counter("two_stage_turns_total").inc(
+            result="no_action" if executed is None else "executed" if executed[0] else "failed"
+        )
+
+        # Narrate with the state after the action (new room description)
+        narration: List[LLMMessage] = [LLMMessage(role="system", content=static_prompt + self._build_state_prompt())]
+        narration += messages[1:-1]
+        narration.append(LLMMessage(role="user", content=f"{user_input}\n\n({hint})"))
+        started: float = time.perf_counter()
+        response: LLMResponse = self.llm_provider.chat(
+            narration, on_narrative=pipeline.feed if pipeline else None, cancel_token=cancel_token
+        )
+        usage = self._merge_usage(
+            usage,
+            self._record_usage(self.llm_provider, response, time.perf_counter() - started, "turn", self.history.turn_counter + 1)
+        )
+        return LLMResponse(
+            content=response.content,
+            model=response.model,
+            function_call=LLMFunctionCall(action_name, {"response": response.content}),
+            usage=response.usage
+        ), executed, usage
+
+    def _classify_action(
+        self,
+        user_input: str,
+        messages: List[LLMMessage],
+        functions: List[LLMFunction],
+        cancel_token: CancellationToken
+    ) -> Tuple[str, dict]:
+        """
+        Let the classifier model pick the action of a two-stage turn.
+
+        Args:
+            user_input: Player input
+            messages: History messages of the turn (system prompt first, input last)
+            functions: Available functions
+            cancel_token: Cancellation token of the turn
+
+        Returns:
+            (function name, NO_ACTION if the answer names no available function; usage metadata)
+        """
+        catalog: str = "\n".join(f"- {f.name}: {f.description}" for f in functions)
+        context: List[LLMMessage] = messages[1:-1][-2 * self.classifier_context_turns:] if self.classifier_context_turns else []
+        classify: List[LLMMessage] = [
+            LLMMessage(role="system", content=(
+                "Du ordnest die Eingabe eines Spielers in einem Textadventure einer Aktion zu.\n\n"
+                f"{self._build_state_prompt()}\nMÖGLICHE AKTIONEN:\n{catalog}\n\n"
+                f"Antworte nur mit dem Namen der passenden Aktion, oder {NO_ACTION}, wenn keine passt."
+            )),
+            *context,
+            LLMMessage(role="user", content=user_input)
+        ]
+        started: float = time.perf_counter()
+        response: LLMResponse = self.classifier_provider.chat(classify, cancel_token=cancel_token)
+        latency: float = time.perf_counter() - started
+        metrics.histogram("two_stage_classify_seconds").observe(latency)
+        usage: dict = self._record_usage(self.classifier_provider, response, latency, "classify")
+
+        # Longest name first, so "nimm_schluessel_2" wins over "nimm_schluessel"
+        answer: str = (response.content or "").strip().strip('"\'`.').lower()
+        for name in sorted((f.name for f in functions), key=len, reverse=True):
+            if name.lower() == answer or name.lower() in answer:
+                return name, {f"classifier_{key}": value for key, value in usage.items()}
+        return NO_ACTION, {f"classifier_{key}": value for key, value in usage.items()}
+
+    @staticmethod
+    def _merge_usage(first: dict, second: dict) -> dict:
+        """Usage metadata of two LLM calls of one turn (tokens and latency add up)."""
+        merged: dict = dict(first)
+        for key, value in second.items():
+            merged[key] = merged.get(key, 0) + value if isinstance(value, (int, float)) else value
+        return merged
+
+    def _match_intent(self, user_input: str) -> Optional[IntentMatch]:
+        """
+        Resolve clear-cut input to an available action without the LLM.
+
+        Args:
+            user_input: Player input
+
+        Returns:
+            IntentMatch, or None if the turn needs the LLM
+        """
+        if not self.intent_matcher.enabled:
+            return None
+        actions = self.session.game_engine.state_engine.get_available_actions()
+        intent: Optional[IntentMatch] = self.intent_matcher.match(user_input, actions)
+        metrics.counter("intent_matcher_turns_total").inc(result="bypassed" if intent else "llm")
+        if intent:
+            print(f"[INTENT] '{user_input}' -> {intent.action.name} (score {intent.score})")
+        return intent
+
+    def _narrate_intent(
+        self,
+        action: Action,
+        executed: Tuple[bool, str],
+        user_input: str,
+        static_prompt: str,
+        cancel_token: CancellationToken,
+        on_narrative: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Narration for a turn resolved by the intent matcher (after the action was executed).
+        Sources are tried in the configured order (llm.intent_matcher.narration):
+        pre-generated bundle narration, a short LLM call without function
+        catalog (narration_provider), and finally the action's after_fire text
+        or description. If the action failed, only the LLM can explain it;
+        otherwise the failure message is returned.
+
+        Args:
+            action: Matched action
+            executed: (success, message) of the executed action
+            user_input: Player input
+            static_prompt: Static part of the system prompt
+            cancel_token: Cancellation token of the turn
+            on_narrative: Optional streaming callback for the LLM narration (speech pipeline)
+
+        Returns:
+            Narrative text
+        """
+        success, message = executed
+        streamed: List[str] = []
+
+        def feed(delta: str) -> None:
+            streamed.append(delta)
+            on_narrative(delta)
+
+        for narration_source in self.intent_narration:
+            text: Optional[str] = None
+            if narration_source == 'bundle' and success:
+                text = self._bundle_narration(f"action:{action.name}")
+            elif narration_source == 'llm':
+                if success:
+                    done: str = (action.after_fire or action.description or action.name).strip().rstrip(".")
+                    hint: str = f"Die Aktion wurde ausgeführt: {done}. Erzähle dem Spieler kurz und in character, was passiert."
+                else:
+                    hint = f"Die Aktion '{action.name}' ist nicht möglich ({message}). Erkläre es dem Spieler kurz und in character."
+                # State prompt after the action (new room description)
+                messages: List[LLMMessage] = [
+                    LLMMessage(role="system", content=static_prompt + self._build_state_prompt()),
+                    LLMMessage(role="user", content=f"{user_input}\n\n({hint})")
+                ]
+                try:
+                    started: float = time.perf_counter()
+                    response = self.narration_provider.chat(
+                        messages,
+                        on_narrative=feed if on_narrative else None,
+                        cancel_token=cancel_token
+                    )
+                    self._record_usage(self.narration_provider, response, time.perf_counter() - started, "narration")
+                    text = response.content
+                except (OperationCancelledError, LLMQueueFullError):
+                    raise
+                except Exception as e:
+                    print(f"[WARNING] Intent narration via LLM failed: {e}")
+                    if streamed:
+                        # Part of the failed narration was spoken - the next source starts over
+                        self._stop_speech(reason="retry")
+            elif narration_source == 'after_fire' and success:
+                text = action.after_fire or action.description
+
+            if text:
+                metrics.counter("intent_narration_total").inc(source=narration_source)
+                if streamed and narration_source != 'llm':
+                    self._speak_fallback(text)
+                return text
+
+        metrics.counter("intent_narration_total").inc(source="name" if success else "failure")
+        text = action.name.replace("_", " ") if success else message
+        if streamed:
+            self._speak_fallback(text)
+        return text
+
+    def _summarize_history(self, previous: str, entries: List[HistoryEntry]) -> Optional[str]:
+        """
+        Rolling summary of the game history (runs in the background, see GameHistory.summarize_async).
+
+        Args:
+            previous: Previous summary (empty for the first one)
+            entries: Turns to fold into the summary
+
+        Returns:
+            New summary, or None if the LLM returned nothing
+        """
+        turns: str = "\n".join(
+            f"Spieler: {entry.user_input}\nErzähler: {entry.llm_response}"
+            + (f"\n(Aktion: {entry.chosen_function})" if entry.chosen_function and entry.chosen_function != NO_ACTION else "")
+            for entry in entries
+        )
+        messages: List[LLMMessage] = [
+            LLMMessage(role="system", content=(
+                "Du fasst den Verlauf eines Textadventures für den Erzähler zusammen. "
+                "Behalte Orte, Gegenstände, Personen, ausgeführte Aktionen und offene Hinweise; "
+                f"lass Ausschmückungen weg. Höchstens {self.history_summary_words} Wörter, nur der Text."
+            )),
+            LLMMessage(role="user", content=(
+                f"BISHERIGE ZUSAMMENFASSUNG:\n{previous or '(keine)'}\n\nNEUE ZÜGE:\n{turns}"
+            ))
+        ]
+        started: float = time.perf_counter()
+        response = self.summary_provider.chat(messages, priority=Priority.BACKGROUND)
+        self._record_usage(self.summary_provider, response, time.perf_counter() - started, "summary")
+        return response.content or None
+
+    def _record_usage(
+        self,
+        provider: BaseLLMProvider,
+        response: LLMResponse,
+        latency: float,
+        kind: str,
+        turn_number: int = 0
+    ) -> dict:
+        """
+        Account the token usage of an LLM call (see usage.py).
+
+        Args:
+            provider: Provider that made the call
+            response: Its response (usage as reported by the provider, if any)
+            latency: Duration of the call in seconds
+            kind: Kind of call ("turn", "retry", "welcome", "narration", "summary")
+            turn_number: History turn of the call (0 = not a player turn)
+
+        Returns:
+            Usage as history metadata (tokens, latency_seconds, provider, model)
+        """
+        model: str = response.model or provider.model
+        usage_tracker.record(
+            self.session.session_id,
+            self._game_label(),
+            f"{provider.provider_name}:{model}",
+            response.usage,
+            latency,
+            turn_number=turn_number,
+            kind=kind
+        )
+        return {
+            **{key: value for key, value in (response.usage or {}).items()
+               if key in ("prompt_tokens", "completion_tokens", "cached_tokens")},
+            "latency_seconds": round(latency, 3),
+            "provider": provider.provider_name,
+            "model": model
+        }
+
+    def _game_label(self) -> str:
+        """Game of the usage accounting: map name and short hash of its definition."""
+        game_dir = self.session.game_engine.game_dir
+        return f"{game_dir.name if game_dir else 'game'}@{self._source_hash()[:8]}"
+
+    def _source_hash(self) -> str:
+        """Hash of the game definition (changes whenever the map is edited)."""
+        if self._game_hash is None:
+            self._game_hash = NarrationBundle.source_hash_of(self.session.game_engine.game_data)
+        return self._game_hash
+
+    def _response_cache_key(self, user_input: str) -> Optional[str]:
+        """
+        Build the response cache key of a turn.
+
+        Args:
+            user_input: Player input
+
+        Returns:
+            Cache key, or None if the map does not use the response cache
+        """
+        engine = self.session.game_engine
+        if not response_cache.enabled or not engine.game_data.get('response_cache'):
+            return None
+        state_engine = engine.state_engine
+        return response_cache.make_key(
+            self._source_hash(),
+            state_engine.current_state,
+            relevant_variables(state_engine, engine.inventory.to_dict()),
+            user_input
+        )
+
+    def _load_narration_bundle(self) -> None:
+        """Load the map's narration bundle and hand its speech to the voice provider."""
+        if not self.narration_config.get('enabled', True):
+            return
+        engine = self.session.game_engine
+        self.narration_bundle = get_narration_bundle(engine.game_dir, engine.game_data)
+        self.voice_provider.bundle_audio_cache = self.narration_bundle.audio_cache if self.narration_bundle else None
+
+    def _bundle_narration(self, key: str) -> Optional[str]:
+        """
+        Pick a pre-generated narration variant.
+
+        Args:
+            key: Moment key ("welcome", "state:<name>", "action:<name>")
+
+        Returns:
+            Narration text, or None without a bundle entry
+        """
+        if self.narration_bundle is None:
+            return None
+        return self.narration_bundle.pick(key)
+
+    def _speak_fallback(self, text: str) -> None:
+        """Speak pre-generated narration (sentence by sentence, so the bundle's audio is used)."""
+        pipeline: Optional[SpeechPipeline] = self._start_speech_pipeline(time.perf_counter())
+        if pipeline:
+            pipeline.finish(text)
+        else:
+            threading.Thread(
+                target=self.voice_provider.speak,
+                args=(self.session, text),
+                daemon=True
+            ).start()
+
+    def _start_speech_pipeline(self, started_at: float) -> Optional[SpeechPipeline]:
+        """
+        Create the speech pipeline for the next reply (if sentence streaming is enabled).
+
+        Args:
+            started_at: perf_counter() timestamp the turn started
+
+        Returns:
+            New SpeechPipeline or None
+        """
+        if self.session.audio_sink is not None:
+            self.session.audio_sink.resume(self.session)
+        if not self.sentence_streaming:
+            return None
+        self._speech_pipeline = SpeechPipeline(self.session, self.voice_provider, started_at=started_at)
+        return self._speech_pipeline
+
+    def _stop_speech(self, reason: str = "interrupted") -> None:
+        """
+        Stop the current reply (pipelined or provider-driven).
+        Does not wait for playback threads: stale audio is dropped by its writer.
+
+        Args:
+            reason: Why speech is stopped (metrics label)
+        """
+        # Interrupt the sink first: it releases writers blocked by pacing
+        if self.session.audio_sink is not None:
+            self.session.audio_sink.interrupt(self.session)
+        if self._speech_pipeline is not None:
+            self._speech_pipeline.stop(reason=reason)
+            self._speech_pipeline = None
+        self.voice_provider.stop(self.session)
+
+    def _watch_cancellation(self) -> CancellationToken:
+        """
+        Stop speech when the session's cancellation token fires (client disconnect).
+        A token that was already cancelled is renewed, so only work in flight at
+        the time of the disconnect is aborted. Registers once per token.
+
+        Returns:
+            The session's current cancellation token
+        """
+        token: CancellationToken = self.session.renew_cancel_token()
+        if token is not self._watched_token:
+            if self._unwatch is not None:
+                self._unwatch()
+            self._watched_token = token
+            self._unwatch = token.add_callback(lambda: self._stop_speech(reason=token.reason or "cancelled"))
+        return token
+
     def _send_initial_ambient(self) -> None:
         """Play ambient sound for the initial game state via jukebox."""
         from typing import Any
@@ -30,6 +30,8 @@ class GameEngine:
             session: GameSession for message passing (REQUIRED)
         """
         self.session: GameSession = session
+        # Map directory (model.json, config.json, narration bundle)
+        self.game_dir: Optional[Path] = None
         
         # Load game definition from config
         definition_path = self._get_definition_path_from_config()
@@ -113,15 +115,15 @@ class GameEngine:
     
     def _get_definition_path_from_config(self) -> str:
         """
-        Read config.yaml and construct path to game definition.
+        Construct the path to the game definition from the session's config.
         
         Returns:
             Full path to game definition file (maps_directory/game_name/index.json)
         """
         from config_loader import GameConfig
         
-        # Load configuration
-        config = GameConfig()
+        # Session config (loaded from config.yaml unless given to GameSession)
+        config = GameConfig(data=self.session.config)
         
         # Get game definition path (already validated and resolved)
         game_path = config.game_definition_path
@@ -147,6 +149,7 @@ class GameEngine:
             game_dir = path.parent
         else:
             game_dir = path
+        self.game_dir = game_dir
             
         model_path = game_dir / 'model.json'
         
@@ -203,6 +206,8 @@ class GameEngine:
         identity = config_data.get('personality', '') + '\n'
         behaviour = "WICHTIG: Du darfst NUR die explizit definierten Aktionen verwenden. Erfinde NIEMALS eigene Aktionen."
         welcome_prompt = config_data.get('welcome_prompt', '')
+        # Per-map opt-in: answers to repeated input may be served from the response cache
+        response_cache = bool(config_data.get('response_cache', False))
         
         # Convert Inventory list to dict
         inventory = {}
@@ -333,6 +338,7 @@ class GameEngine:
             'personality': identity,
             'behaviour': behaviour,
             'welcome_prompt': welcome_prompt,
+            'response_cache': response_cache,
             'states': states,
             'actions': actions,
             'inventory': inventory
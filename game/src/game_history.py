@@ -3,11 +3,29 @@ Game History Management
 Structured history that tracks prompts, functions, and responses.
 """
 from __future__ import annotations
+import threading
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from datetime import datetime
 from llm import LLMMessage, LLMFunction
+from metrics import metrics
+
+# Produces a new rolling summary from the previous summary and the turns to fold in
+Summarizer = Callable[[str, List["HistoryEntry"]], Optional[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count of a text (about 4 characters per token).
+
+    Args:
+        text: Message text
+
+    Returns:
+        Estimated number of tokens
+    """
+    return len(text) // 4 + 1
 
 
 @dataclass
@@ -43,19 +61,35 @@ class GameHistory:
 
     Provides conversion to LLM message format while maintaining
     complete historical context for debugging and analysis.
+
+    With a token budget only the newest turns that fit are sent verbatim;
+    older turns are folded into a rolling summary in the background
+    (summarize_async) after the turn has been answered. Turns waiting for
+    the summary are kept beyond max_length, but never more than twice as
+    many; after a failed summary the history is trimmed plainly again.
     """
 
-    def __init__(self, max_length: int = 20) -> None:
+    def __init__(self, max_length: int = 20, max_tokens: int = 0) -> None:
         """
         Initialize game history.
 
         Args:
             max_length: Maximum number of entries to keep
+            max_tokens: Token budget of the turns sent to the LLM (0 = no budget)
         """
         self.entries: List[HistoryEntry] = []
         self.max_length: int = max_length
+        self.max_tokens: int = max_tokens
         self.turn_counter: int = 0
 
+        # Rolling summary of all turns up to summarized_turn
+        self.summary: str = ""
+        self.summarized_turn: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._summarizing: bool = False
+        self._summary_failed: bool = False  # Last summary failed: trim without waiting for it
+        self._generation: int = 0  # Bumped by clear() to discard running summaries
+
     def add_entry(
         self,
         user_input: str,
@@ -95,8 +129,9 @@ class GameHistory:
             metadata=metadata or {}
         )
 
-        self.entries.append(entry)
-        self._trim_if_needed()
+        with self._lock:
+            self.entries.append(entry)
+            self._trim_if_needed()
 
         return entry
 
@@ -105,7 +140,8 @@ class GameHistory:
         Convert history to LLM message format.
 
         IMPORTANT: Functions are NOT included in messages!
-        Only the base prompt and conversation turns.
+        Only the base prompt, the rolling summary (if any) and the
+        conversation turns within the token budget.
 
         Args:
             current_base_prompt: Current base prompt (without functions)
@@ -117,12 +153,103 @@ class GameHistory:
             LLMMessage(role="system", content=current_base_prompt)
         ]
 
-        for entry in self.entries:
+        with self._lock:
+            summary_messages: List[LLMMessage] = self._summary_messages()
+            turns: List[HistoryEntry] = self._window()
+
+        messages.extend(summary_messages)
+        for entry in turns:
             messages.append(LLMMessage(role="user", content=entry.user_input))
             messages.append(LLMMessage(role="assistant", content=entry.llm_response))
 
+        metrics.histogram("history_tokens").observe(
+            sum(estimate_tokens(message.content) for message in messages[1:])
+        )
         return messages
 
+    def summarize_async(self, summarize: Summarizer) -> bool:
+        """
+        Fold the turns that fell out of the token budget into the rolling summary.
+        Runs in a background thread; call it after the turn has been answered.
+        No-op without a budget, while a summary is running or if nothing fell out.
+
+        Args:
+            summarize: Returns the new summary for (previous summary, turns), None on failure
+
+        Returns:
+            True if a summarization was started
+        """
+        with self._lock:
+            if not self.max_tokens or self._summarizing:
+                return False
+            pending: List[HistoryEntry] = self._unsummarized()
+            if not pending:
+                return False
+            self._summarizing = True
+            previous: str = self.summary
+            generation: int = self._generation
+
+        def run() -> None:
+            result: str = "failed"
+            try:
+                summary: Optional[str] = summarize(previous, pending)
+                if summary:
+                    with self._lock:
+                        if generation == self._generation:
+                            self.summary = summary.strip()
+                            self.summarized_turn = pending[-1].turn_number
+                            self._summary_failed = False
+                            self._trim_if_needed()
+                    result = "ok"
+            except Exception as e:
+                print(f"[WARNING] History summarization failed: {e}")
+            finally:
+                with self._lock:
+                    self._summarizing = False
+                    if result == "failed" and generation == self._generation:
+                        # Don't hold turns back for a summary that may never come
+                        self._summary_failed = True
+                        self._trim_if_needed()
+                metrics.counter("history_summaries_total").inc(result=result)
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
+
+    def _summary_messages(self) -> List[LLMMessage]:
+        """Messages carrying the rolling summary (caller holds the lock)."""
+        if not self.summary:
+            return []
+        return [
+            LLMMessage(role="user", content=f"BISHERIGER SPIELVERLAUF (Zusammenfassung):\n{self.summary}"),
+            LLMMessage(role="assistant", content="Verstanden.")
+        ]
+
+    def _window(self) -> List[HistoryEntry]:
+        """
+        Newest turns that fit into the token budget, oldest first (caller holds the lock).
+        Summarized turns are never repeated; the latest turn is always kept.
+        """
+        entries: List[HistoryEntry] = [e for e in self.entries if e.turn_number > self.summarized_turn]
+        if not self.max_tokens:
+            return entries
+
+        budget: int = self.max_tokens - sum(estimate_tokens(m.content) for m in self._summary_messages())
+        window: List[HistoryEntry] = []
+        for entry in reversed(entries):
+            cost: int = estimate_tokens(entry.user_input) + estimate_tokens(entry.llm_response)
+            if window and cost > budget:
+                break
+            budget -= cost
+            window.append(entry)
+        window.reverse()
+        return window
+
+    def _unsummarized(self) -> List[HistoryEntry]:
+        """Turns outside the budget window that are not in the summary yet (caller holds the lock)."""
+        window: List[HistoryEntry] = self._window()
+        first_kept: int = window[0].turn_number if window else self.turn_counter + 1
+        return [e for e in self.entries if self.summarized_turn < e.turn_number < first_kept]
+
     def get_last_entry(self) -> Optional[HistoryEntry]:
         """Get the most recent history entry."""
         return self.entries[-1] if self.entries else None
@@ -132,14 +259,30 @@ class GameHistory:
         return [e for e in self.entries if e.turn_number >= turn_number]
 
     def _trim_if_needed(self) -> None:
-        """Trim history to max_length if needed."""
-        if len(self.entries) > self.max_length:
-            self.entries = self.entries[-self.max_length:]
+        """
+        Trim history to max_length if needed (caller holds the lock).
+        With a token budget, turns are only dropped once they are in the summary,
+        unless the last summary failed or the summary lags 2 * max_length behind.
+        """
+        if len(self.entries) <= self.max_length:
+            return
+        cutoff: int = self.entries[-self.max_length].turn_number
+        if self.max_tokens and not self._summary_failed and len(self.entries) <= 2 * self.max_length:
+            cutoff = min(cutoff, self.summarized_turn + 1)
+        lost: int = sum(1 for e in self.entries if self.summarized_turn < e.turn_number < cutoff)
+        if self.max_tokens and lost:
+            metrics.counter("history_turns_unsummarized_total").inc(lost)
+        self.entries = [e for e in self.entries if e.turn_number >= cutoff]
 
     def clear(self) -> None:
-        """Clear all history."""
-        self.entries = []
-        self.turn_counter = 0
+        """Clear all history (including the summary)."""
+        with self._lock:
+            self.entries = []
+            self.turn_counter = 0
+            self.summary = ""
+            self.summarized_turn = 0
+            self._summary_failed = False
+            self._generation += 1
 
     def __len__(self) -> int:
         """Return number of entries."""
@@ -147,4 +290,5 @@ class GameHistory:
 
     def __repr__(self) -> str:
         """String representation."""
-        return f"GameHistory({len(self.entries)} entries, turn {self.turn_counter})"
+        summarized: str = f", summarized to turn {self.summarized_turn}" if self.summarized_turn else ""
+        return f"GameHistory({len(self.entries)} entries, turn {self.turn_counter}{summarized})"
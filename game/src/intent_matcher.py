@@ -0,0 +1,203 @@
+"""
+Local intent matcher for unambiguous player commands.
+Action names such as gehe_nach_norden or untersuche_das_fenster are close to
+what players type; clear-cut input is resolved to an available action without
+an LLM round trip.
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from metrics import metrics
+
+if TYPE_CHECKING:
+    from state_engine import Action
+
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Words that carry no intent (compared after normalization)
+_STOPWORDS: Set[str] = {
+    "der", "die", "das", "den", "dem", "des", "ein", "eine", "einen", "einem", "einer", "eines",
+    "zu", "zum", "zur", "nach", "in", "im", "ins", "an", "am", "auf", "aus", "mit", "von", "vom",
+    "durch", "ueber", "unter", "hin", "her", "mal", "bitte", "doch", "jetzt", "dann", "und",
+    "ich", "du", "wir", "mich", "dich", "mir", "dir", "will", "moechte", "moechten", "man", "kannst",
+    "kann", "lass", "lasst", "uns", "etwas", "noch", "einmal", "gern", "gerne", "hier", "da",
+}
+
+# Words that invert or hedge the intent - such input always goes to the LLM
+_NEGATIONS: Set[str] = {"nicht", "kein", "keine", "keinen", "nie", "niemals", "ohne", "warum", "wie", "was", "wer", "wo", "ob"}
+
+# Irregular imperatives and common synonyms -> stem used in action names
+_SYNONYMS: Dict[str, str] = {
+    "nimm": "nehm", "gib": "geb", "lies": "les", "sieh": "seh", "wirf": "werf", "iss": "ess",
+    "tritt": "tret", "sprich": "sprech", "brich": "brech", "hilf": "helf",
+    "geh": "geh", "lauf": "geh", "renn": "geh", "betritt": "geh",
+    "guck": "schau", "seh": "schau", "blick": "schau",
+    "pruef": "untersuch", "inspizier": "untersuch", "betracht": "untersuch",
+    "nord": "norden", "sued": "sueden", "ost": "osten", "west": "westen",
+}
+
+_SUFFIXES: Tuple[str, ...] = ("ern", "est", "em", "en", "er", "es", "st", "e", "s", "n", "t")
+
+
+def normalize(text: str) -> str:
+    """
+    Casefold, fold umlauts (ä -> ae, ß -> ss) and strip punctuation.
+
+    Args:
+        text: Player input or action text
+
+    Returns:
+        Lowercase ASCII words separated by single spaces
+    """
+    return _NON_WORD.sub(" ", text.casefold().translate(_UMLAUTS)).strip()
+
+
+def stem(word: str) -> str:
+    """
+    Light German stemmer: strips one inflection suffix, keeps at least 3 letters.
+
+    Args:
+        word: Normalized word
+
+    Returns:
+        Stem
+    """
+    if word in _SYNONYMS:
+        return _SYNONYMS[word]
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    return _SYNONYMS.get(word, word)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Normalized, stemmed content words of a text (action names are split at '_').
+
+    Args:
+        text: Player input, action name or description
+
+    Returns:
+        List of stems without stopwords
+    """
+    return [stem(word) for word in normalize(text.replace("_", " ")).split() if word not in _STOPWORDS]
+
+
+def similarity(a: str, b: str) -> float:
+    """
+    Similarity of two stems (1.0 = equal) based on the Levenshtein distance.
+    Tolerates typos and the remaining inflection differences.
+    """
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    previous: List[int] = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current: List[int] = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return 1.0 - previous[-1] / max(len(a), len(b))
+
+
+@dataclass
+class IntentMatch:
+    """An action the player input was resolved to."""
+    action: Action
+    score: float
+
+
+class IntentMatcher:
+    """
+    Resolves player input to one of the available actions.
+
+    Every content word of the action name must be found in the input
+    (exactly or within a small edit distance) and every content word of the
+    input must be explained by the action name or description. The best
+    action wins only if it scores above the threshold and clearly ahead of
+    the runner-up; otherwise the turn goes to the LLM.
+    """
+
+    def __init__(self, threshold: float = 0.85, margin: float = 0.15, min_similarity: float = 0.75) -> None:
+        """
+        Args:
+            threshold: Minimum score of a match (0..1)
+            margin: Minimum lead of the best action over the second best
+            min_similarity: Minimum similarity of two words to count as the same word
+        """
+        self.threshold: float = threshold
+        self.margin: float = margin
+        self.min_similarity: float = min_similarity
+        self.enabled: bool = True
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> IntentMatcher:
+        """
+        Create a matcher from the llm.intent_matcher section of config.yaml.
+
+        Args:
+            config: Intent matcher configuration dict
+        """
+        matcher: IntentMatcher = cls(
+            threshold=float(config.get('threshold', 0.85)),
+            margin=float(config.get('margin', 0.15)),
+            min_similarity=float(config.get('min_similarity', 0.75))
+        )
+        matcher.enabled = bool(config.get('enabled', True))
+        return matcher
+
+    def match(self, user_input: str, actions: List[Action]) -> Optional[IntentMatch]:
+        """
+        Find the action the player unambiguously asked for.
+
+        Args:
+            user_input: Player input
+            actions: Available actions of the current state
+
+        Returns:
+            IntentMatch, or None if the input is not clear-cut
+        """
+        words: Set[str] = set(normalize(user_input).split())
+        tokens: List[str] = tokenize(user_input)
+        if not tokens or words & _NEGATIONS:
+            return None
+
+        scored: List[Tuple[float, Action]] = sorted(
+            ((self._score(tokens, action), action) for action in actions),
+            key=lambda item: item[0],
+            reverse=True
+        )
+        if not scored:
+            return None
+
+        best_score, best_action = scored[0]
+        runner_up: float = scored[1][0] if len(scored) > 1 else 0.0
+        metrics.histogram("intent_match_score").observe(best_score)
+        if best_score < self.threshold or best_score - runner_up < self.margin:
+            return None
+        return IntentMatch(action=best_action, score=round(best_score, 3))
+
+    def _score(self, tokens: List[str], action: Action) -> float:
+        """Score an action: coverage of its name by the input times coverage of the input."""
+        name_tokens: List[str] = tokenize(action.name)
+        if not name_tokens:
+            return 0.0
+        description_tokens: List[str] = tokenize(action.description)
+
+        name_coverage: float = sum(self._best(token, tokens) for token in name_tokens) / len(name_tokens)
+        # Input words explained by the name count fully, by the description partly
+        input_coverage: float = sum(
+            max(self._best(token, name_tokens), 0.6 * self._best(token, description_tokens))
+            for token in tokens
+        ) / len(tokens)
+        return name_coverage * input_coverage
+
+    def _best(self, token: str, candidates: List[str]) -> float:
+        """Best similarity of a word to any candidate (0 below min_similarity)."""
+        best: float = max((similarity(token, candidate) for candidate in candidates), default=0.0)
+        return best if best >= self.min_similarity else 0.0
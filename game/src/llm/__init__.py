@@ -15,6 +15,9 @@ from .deepseek_provider import DeepSeekProvider
 from .ollama_provider import OllamaProvider
 from .gemma_provider import GemmaProvider
 from .llm_factory import LLMFactory
+from .scheduler import LLMScheduler, LLMQueueFullError, Priority, scheduler
+from .single_flight import SingleFlight, single_flight
+from .resilient_provider import LLMUnavailableError
 
 __all__ = [
     'BaseLLMProvider',
@@ -27,5 +30,12 @@ __all__ = [
     'DeepSeekProvider',
     'OllamaProvider',
     'GemmaProvider',
-    'LLMFactory'
+    'LLMFactory',
+    'LLMScheduler',
+    'LLMQueueFullError',
+    'Priority',
+    'LLMUnavailableError',
+    'scheduler',
+    'SingleFlight',
+    'single_flight'
 ]
\ No newline at end of file
@@ -5,10 +5,17 @@ Defines the interface that all LLM providers must implement.
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
 import json
 import re
 
+from cancellation import CancellationToken, OperationCancelledError
+from metrics import metrics
+from .scheduler import Priority, scheduler
+from .single_flight import single_flight
+from .catalog import function_catalog
+
 
 @dataclass
 class LLMFunction:
@@ -46,8 +53,21 @@ class BaseLLMProvider(ABC):
     """
     Abstract base class for all LLM providers.
     Each provider must implement the chat method.
+
+    Every synchronous call has an async counterpart (acall_chat,
+    achat_with_functions, achat) for callers running on an event loop.
+    Providers with an async client override acall_chat/acall_chat_stream;
+    the defaults run the synchronous call in a worker thread.
+
+    JSON-prompted providers that support constrained decoding
+    (SUPPORTS_RESPONSE_SCHEMA) send response_schema() with the request when
+    structured_output is enabled; the model can then only produce valid
+    JSON naming an available function, and the prompt carries just a short
+    format note instead of the full format instructions.
     """
 
+    SUPPORTS_RESPONSE_SCHEMA: bool = False  # Provider can enforce a JSON schema on the answer
+
     def __init__(self, api_key: str, model: str, temperature: float = 0.1, max_tokens: int = 2000) -> None:
         """
         Initialize the LLM provider.
@@ -63,8 +83,83 @@ class BaseLLMProvider(ABC):
         self.temperature: float = temperature
         self.max_tokens: int = max_tokens
         self.debug_mode: bool = False  # Will be set by LLMFactory
+        self.structured_output: bool = False  # Will be set by LLMFactory (llm.structured_output)
+        self.priority: Priority = Priority.INTERACTIVE  # Admission priority (see llm.scheduler)
+        self.coalesce: Optional[bool] = None  # Share identical concurrent calls (None = if deterministic, see llm.single_flight)
         self._validate_config()
 
+    def warmup(self) -> bool:
+        """
+        Prepare the backend before the first turn (e.g. load a local model).
+        Called once at server startup; the default does nothing.
+
+        Returns:
+            True if the provider warmed up its backend
+        """
+        return False
+
+    @property
+    def uses_response_schema(self) -> bool:
+        """True if answers are constrained to response_schema() (enabled and supported)."""
+        return self.structured_output and self.SUPPORTS_RESPONSE_SCHEMA
+
+    @staticmethod
+    def response_schema(functions: List[LLMFunction]) -> Dict[str, Any]:
+        """
+        JSON schema of a turn answer: the narrative and one of the available function names.
+        "response" comes first so the narrative can be streamed before the function is chosen.
+
+        Args:
+            functions: Available functions (including keine_aktion)
+
+        Returns:
+            JSON schema dict
+        """
+        return {
+            "type": "object",
+            "properties": {
+                "response": {"type": "string"},
+                "function": {"type": "string", "enum": list(dict.fromkeys(f.name for f in functions))}
+            },
+            "required": ["response", "function"],
+            "additionalProperties": False
+        }
+
+    def _response_format(self, functions: Optional[List[LLMFunction]]) -> Dict[str, Any]:
+        """
+        response_format parameter of an OpenAI-compatible request (empty without schema).
+
+        Args:
+            functions: Functions of the request (plain chat without functions is not constrained)
+
+        Returns:
+            Keyword arguments for client.chat.completions.create
+        """
+        if not functions or not self.uses_response_schema:
+            return {}
+        return {"response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": "turn", "strict": True, "schema": self.response_schema(functions)}
+        }}
+
+    @staticmethod
+    def _request_timeout(timeout: Optional[float]) -> Dict[str, Any]:
+        """
+        timeout parameter of an OpenAI-compatible request (empty: the client's default).
+
+        Args:
+            timeout: Seconds left for the request (see CancellationToken.remaining)
+
+        Returns:
+            Keyword arguments for client.chat.completions.create
+        """
+        return {} if timeout is None else {"timeout": timeout}
+
+    @property
+    def provider_name(self) -> str:
+        """Short provider name as used in config.yaml (e.g. "openai", "ollama")."""
+        return self.__class__.__name__.replace("Provider", "").lower()
+
     # ========== NEW 3-STEP API ==========
     # Providers can override these to customize behavior
 
@@ -72,16 +167,23 @@ class BaseLLMProvider(ABC):
         self,
         base_prompt: str,
         functions: List[LLMFunction],
-        messages: List[LLMMessage]
+        messages: List[LLMMessage],
+        state_prompt: str = ""
     ) -> List[LLMMessage]:
         """
         Build complete prompt with function calling instructions.
         Override this to customize prompt format for your provider.
 
+        The system prompt is ordered from stable to volatile - persona and
+        instructions first, then the per-state block (room description and
+        function catalog) - so providers with prefix caching can reuse the
+        common prefix across turns and states.
+
         Args:
-            base_prompt: Base system prompt (identity, behavior, current state)
+            base_prompt: Base system prompt (identity, behavior; may include the current state)
             functions: Available functions the LLM can call
             messages: Conversation history (WITHOUT system message)
+            state_prompt: Per-state block (current room), placed after the static part
 
         Returns:
             Complete messages ready for API call (including system message)
@@ -89,32 +191,33 @@ class BaseLLMProvider(ABC):
         # Default: Generic JSON-based function calling
         # Providers should override this for model-specific optimizations
 
-        # Build function list
-        functions_json: List[Dict[str, Any]] = [
-            {
-                "name": f.name,
-                "description": f.description,
-                "parameters": f.parameters or {}
-            }
-            for f in functions
-        ]
-
-        instructions: str = self._default_response_instructions()
+        instructions: str = (
+            self._schema_response_instructions() if self.uses_response_schema
+            else self._default_response_instructions()
+        )
 
         # Build complete system prompt
         system_prompt: str = f"""{base_prompt}
 
 WICHTIG: Du kommunizierst mit einer Maschine. Antworte IMMER im JSON-Format!
 
-VERFÜGBARE FUNKTIONEN:
-{json.dumps(functions_json, ensure_ascii=False, indent=2)}
-
 {instructions}
+
+{state_prompt}
+VERFÜGBARE FUNKTIONEN:
+{function_catalog(functions)}
 """
 
         # Return messages with system prompt
         return [LLMMessage(role="system", content=system_prompt), *messages]
 
+    def _schema_response_instructions(self) -> str:
+        """Short instructions when the answer format is enforced by response_schema()."""
+        return """ANTWORT: JSON mit "response" (deine Antwort an den Spieler, kurz, in character) und "function" (passende Funktion, "keine_aktion" wenn keine passt).
+- NIEMALS den Function-Namen im "response"-Text verwenden
+- KEINE Aktionsbeschreibungen in Sternchen oder Klammern, KEINE Erzähler-Perspektive
+- Bleibe IMMER in deiner Rolle und sprich den Spieler direkt an"""
+
     def _default_response_instructions(self) -> str:
         """Default instructions for JSON response format."""
         return """ANTWORT-FORMAT (EXAKT SO):
@@ -152,7 +255,8 @@ RICHTIG: "Ha, der Stock! Den nehm ich mit. Jetzt mal rüber zur Bank schauen...\
     def call_chat(
         self,
         messages: List[LLMMessage],
-        functions: Optional[List[LLMFunction]] = None
+        functions: Optional[List[LLMFunction]] = None,
+        timeout: Optional[float] = None
     ) -> LLMResponse:
         """
         Low-level API call to LLM.
@@ -163,6 +267,7 @@ RICHTIG: "Ha, der Stock! Den nehm ich mit. Jetzt mal rüber zur Bank schauen...\
             functions: Optional list of functions for native function calling support.
                       Providers that support native function calling should use this.
                       Providers using JSON-based function calling can ignore this.
+            timeout: Request timeout in seconds (None: the client's default)
 
         Returns:
             Raw LLMResponse from API (potentially with function_call if native support)
@@ -172,6 +277,70 @@ RICHTIG: "Ha, der Stock! Den nehm ich mit. Jetzt mal rüber zur Bank schauen...\
         """
         pass
 
+    def call_chat_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Callable[[str], None],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Streaming variant of call_chat.
+        Providers that support streaming forward every raw text delta
+        (content or tool call arguments) to on_delta while generating.
+
+        Default: no streaming, falls back to call_chat without deltas.
+
+        Args:
+            messages: Complete messages (including system prompt)
+            functions: Optional list of functions for native function calling
+            on_delta: Callback receiving raw text deltas
+            timeout: Request timeout in seconds (None: the client's default)
+
+        Returns:
+            The complete LLMResponse once generation has finished
+        """
+        return self.call_chat(messages, functions, timeout=timeout)
+
+    async def acall_chat(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]] = None,
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Async variant of call_chat.
+        Default: runs call_chat in a worker thread.
+
+        Args:
+            messages: Complete messages (including system prompt)
+            functions: Optional list of functions for native function calling
+            timeout: Request timeout in seconds (None: the client's default)
+
+        Returns:
+            Raw LLMResponse from API
+
+        Raises:
+            Exception: If the API call fails
+        """
+        return await asyncio.to_thread(self.call_chat, messages, functions, timeout)
+
+    async def acall_chat_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Callable[[str], None],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Async variant of call_chat_stream (on_delta is called on the event loop).
+        Default: no streaming, falls back to acall_chat without deltas.
+
+        Returns:
+            The complete LLMResponse once generation has finished
+        """
+        return await self.acall_chat(messages, functions, timeout=timeout)
+
     def parse_response(self, llm_response: str) -> LLMFunctionCall:
         """
         Parse function call from LLM response.
@@ -195,7 +364,11 @@ RICHTIG: "Ha, der Stock! Den nehm ich mit. Jetzt mal rüber zur Bank schauen...\
         self,
         messages: List[LLMMessage],
         functions: List[LLMFunction],
-        base_prompt: Optional[str] = None
+        base_prompt: Optional[str] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        priority: Optional[Priority] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        state_prompt: str = ""
     ) -> LLMResponse:
         """
         Chat with function calling support.
@@ -205,9 +378,58 @@ RICHTIG: "Ha, der Stock! Den nehm ich mit. Jetzt mal rüber zur Bank schauen...\
             messages: Conversation history
             functions: Available functions the LLM can call
             base_prompt: Base system prompt (if not in messages)
+            on_narrative: Optional callback receiving the narrative ("response")
+                          text in fragments while the LLM is still generating
+            priority: Admission priority (defaults to self.priority)
+            cancel_token: Optional token; cancelling it aborts the call between stream deltas
+            state_prompt: Per-state block (current room), placed after the static
+                          instructions (see build_prompt)
 
         Returns:
             LLMResponse with optional function_call
+
+        Raises:
+            OperationCancelledError: If cancel_token was cancelled
+        """
+        complete_messages, on_delta = self._prepare_turn(messages, functions, base_prompt, on_narrative, state_prompt)
+        response: LLMResponse = self._dispatch(complete_messages, functions, on_delta, priority, cancel_token)
+        return self._finish_turn(response)
+
+    async def achat_with_functions(
+        self,
+        messages: List[LLMMessage],
+        functions: List[LLMFunction],
+        base_prompt: Optional[str] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        priority: Optional[Priority] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        state_prompt: str = ""
+    ) -> LLMResponse:
+        """
+        Async variant of chat_with_functions (same arguments and result).
+        Waits for admission and the API call without blocking the event loop.
+
+        Raises:
+            LLMQueueFullError: If the provider is saturated and the queue is full
+            OperationCancelledError: If cancel_token was cancelled
+        """
+        complete_messages, on_delta = self._prepare_turn(messages, functions, base_prompt, on_narrative, state_prompt)
+        response: LLMResponse = await self._adispatch(complete_messages, functions, on_delta, priority, cancel_token)
+        return self._finish_turn(response)
+
+    def _prepare_turn(
+        self,
+        messages: List[LLMMessage],
+        functions: List[LLMFunction],
+        base_prompt: Optional[str],
+        on_narrative: Optional[Callable[[str], None]],
+        state_prompt: str
+    ) -> Tuple[List[LLMMessage], Optional[Callable[[str], None]]]:
+        """
+        Steps before the API call: build the prompt and the stream callback.
+
+        Returns:
+            (complete messages, raw delta callback or None)
         """
         # Determine base prompt (parameter takes priority over history)
         effective_base_prompt: str
@@ -225,7 +447,7 @@ RICHTIG: "Ha, der Stock! Den nehm ich mit. Jetzt mal rüber zur Bank schauen...\
                 messages = messages[1:]  # Remove old system message
 
         # STEP 1: Build prompt with functions
-        complete_messages: List[LLMMessage] = self.build_prompt(effective_base_prompt, functions, messages)
+        complete_messages: List[LLMMessage] = self.build_prompt(effective_base_prompt, functions, messages, state_prompt)
 
         # DEBUG: Print LLM request if debug_mode is enabled
         if self.debug_mode:
@@ -235,8 +457,21 @@ RICHTIG: "Ha, der Stock! Den nehm ich mit. Jetzt mal rüber zur Bank schauen...\
             except ImportError:
                 print("[DEBUG] Could not import debug_utils")
 
-        # STEP 2: Call LLM API (pass functions for native function calling support)
-        response: LLMResponse = self.call_chat(complete_messages, functions)
+        # STEP 2 (by the caller): Call LLM API (pass functions for native function calling support)
+        on_delta: Optional[Callable[[str], None]] = None
+        if on_narrative is not None:
+            from .streaming import NarrativeStreamExtractor
+            on_delta = NarrativeStreamExtractor(on_narrative).feed
+        return complete_messages, on_delta
+
+    def _finish_turn(self, response: LLMResponse) -> LLMResponse:
+        """Step after the API call: parse the function call and extract the narrative."""
+        # Turns and their prompt size per answer format (parse failure rate = failures / turns)
+        metrics.counter("llm_turns_total").inc(provider=self.provider_name, format=self._answer_format)
+        if response.usage and response.usage.get("prompt_tokens"):
+            metrics.histogram("llm_turn_prompt_tokens").observe(
+                response.usage["prompt_tokens"], provider=self.provider_name, format=self._answer_format
+            )
 
         # STEP 3: Parse response (only if function_call not already set by native function calling)
         if not response.function_call:
@@ -248,6 +483,7 @@ RICHTIG: "Ha, der Stock! Den nehm ich mit. Jetzt mal rüber zur Bank schauen...\
                 response.content = function_call.arguments.get("response", response.content)
             except ValueError as e:
                 # Parsing failed, return response as-is
+                metrics.counter("llm_parse_failures_total").inc(provider=self.provider_name, format=self._answer_format)
                 if self.debug_mode:
                     print(f"[DEBUG] Function parsing failed: {e}")
         else:
@@ -269,12 +505,211 @@ RICHTIG: "Ha, der Stock! Den nehm ich mit. Jetzt mal rüber zur Bank schauen...\
 
         return response
 
-    def chat(self, messages: List[LLMMessage]) -> LLMResponse:
+    def chat(
+        self,
+        messages: List[LLMMessage],
+        priority: Optional[Priority] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """
+        Plain chat without function calling.
+        Delegates to call_chat() without functions (subject to admission control).
+
+        Args:
+            messages: Complete messages (including system prompt)
+            priority: Admission priority (defaults to self.priority)
+            on_narrative: Optional callback receiving the text while it is generated
+                          (without functions the raw deltas are the narrative)
+            cancel_token: Optional token; cancelling it aborts the call between stream deltas
+        """
+        return self._dispatch(messages, None, on_narrative, priority, cancel_token)
+
+    async def achat(
+        self,
+        messages: List[LLMMessage],
+        priority: Optional[Priority] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """Async variant of chat()."""
+        return await self._adispatch(messages, None, on_narrative, priority, cancel_token)
+
+    def _dispatch(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Optional[Callable[[str], None]],
+        priority: Optional[Priority],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """
+        Send the request, sharing an identical call already in flight (see single_flight.py).
+
+        Raises:
+            LLMQueueFullError: If the provider is saturated and the queue is full
+            OperationCancelledError: If cancel_token was cancelled
+        """
+        key: Optional[str] = single_flight.key(self, messages, functions)
+        if key is None:
+            return self._send(messages, functions, on_delta, priority, cancel_token)
+        return single_flight.run(
+            key, self.provider_name,
+            lambda delta: self._send(messages, functions, delta, priority, cancel_token),
+            on_delta, cancel_token
+        )
+
+    async def _adispatch(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Optional[Callable[[str], None]],
+        priority: Optional[Priority],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """
+        Async variant of _dispatch.
+
+        Raises:
+            LLMQueueFullError: If the provider is saturated and the queue is full
+            OperationCancelledError: If cancel_token was cancelled
+        """
+        key: Optional[str] = single_flight.key(self, messages, functions)
+        if key is None:
+            return await self._asend(messages, functions, on_delta, priority, cancel_token)
+        return await single_flight.arun(
+            key, self.provider_name,
+            lambda delta: self._asend(messages, functions, delta, priority, cancel_token),
+            on_delta, cancel_token
+        )
+
+    def _send(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Optional[Callable[[str], None]],
+        priority: Optional[Priority],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """
+        Send the request through the process-wide scheduler.
+        With a cancel_token the call is streamed so it can be aborted between deltas;
+        its deadline (if any) becomes the request timeout.
+
+        Raises:
+            LLMQueueFullError: If the provider is saturated and the queue is full
+            OperationCancelledError: If cancel_token was cancelled
+        """
+        on_delta, streamed = self._cancellable(on_delta, cancel_token)
+        with scheduler.slot(self.provider_name, priority if priority is not None else self.priority):
+            try:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                timeout: Optional[float] = cancel_token.remaining() if cancel_token is not None else None
+                if on_delta is not None:
+                    response: LLMResponse = self.call_chat_stream(messages, functions, on_delta, timeout=timeout)
+                else:
+                    response = self.call_chat(messages, functions, timeout=timeout)
+            except OperationCancelledError:
+                self._record_cancelled(streamed[0])
+                raise
+        self._record_usage(response)
+        return response
+
+    async def _asend(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Optional[Callable[[str], None]],
+        priority: Optional[Priority],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """
+        Async variant of _send (waits for a scheduler slot on the event loop).
+
+        Raises:
+            LLMQueueFullError: If the provider is saturated and the queue is full
+            OperationCancelledError: If cancel_token was cancelled
+        """
+        on_delta, streamed = self._cancellable(on_delta, cancel_token)
+        async with scheduler.aslot(self.provider_name, priority if priority is not None else self.priority):
+            try:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                timeout: Optional[float] = cancel_token.remaining() if cancel_token is not None else None
+                if on_delta is not None:
+                    response: LLMResponse = await self.acall_chat_stream(messages, functions, on_delta, timeout=timeout)
+                else:
+                    response = await self.acall_chat(messages, functions, timeout=timeout)
+            except OperationCancelledError:
+                self._record_cancelled(streamed[0])
+                raise
+        self._record_usage(response)
+        return response
+
+    @staticmethod
+    def _cancellable(
+        on_delta: Optional[Callable[[str], None]],
+        cancel_token: Optional[CancellationToken]
+    ) -> Tuple[Optional[Callable[[str], None]], List[int]]:
         """
-        Backward compatibility wrapper for chat().
-        Delegates to call_chat() without functions.
+        Wrap on_delta with a cancellation checkpoint (streams the call if a token is given).
+
+        Returns:
+            (delta callback, [characters streamed so far])
+        """
+        streamed: List[int] = [0]
+        if cancel_token is None:
+            return on_delta, streamed
+        cancel_token.raise_if_cancelled()
+        forward: Optional[Callable[[str], None]] = on_delta
+
+        def checkpoint(delta: str) -> None:
+            cancel_token.raise_if_cancelled()
+            streamed[0] += len(delta)
+            if forward is not None:
+                forward(delta)
+        return checkpoint, streamed
+
+    @property
+    def _answer_format(self) -> str:
+        """Metrics label of the answer format: "schema" (constrained decoding) or "instructions"."""
+        return "schema" if self.uses_response_schema else "instructions"
+
+    def _record_usage(self, response: LLMResponse) -> None:
+        """Record prompt, prefix cache and completion token metrics of a response."""
+        if response.usage and response.usage.get("prompt_tokens"):
+            metrics.histogram("llm_prompt_tokens").observe(
+                response.usage["prompt_tokens"], provider=self.provider_name
+            )
+            if "cached_tokens" in response.usage:
+                # Prefix cache utilization (only providers that report it)
+                cached: int = response.usage["cached_tokens"]
+                metrics.counter("llm_prompt_cached_tokens_total").inc(cached, provider=self.provider_name)
+                metrics.counter("llm_prompt_uncached_tokens_total").inc(
+                    response.usage["prompt_tokens"] - cached, provider=self.provider_name
+                )
+                metrics.histogram("llm_prompt_cache_hit_ratio").observe(
+                    cached / response.usage["prompt_tokens"], provider=self.provider_name
+                )
+        if response.usage and response.usage.get("completion_tokens"):
+            metrics.histogram("llm_completion_tokens").observe(
+                response.usage["completion_tokens"], provider=self.provider_name
+            )
+
+    def _record_cancelled(self, streamed_chars: int) -> None:
+        """
+        Count a cancelled call and estimate the completion tokens it saved
+        (typical completion length minus what was already streamed, ~4 chars per token).
+
+        Args:
+            streamed_chars: Characters received before the call was aborted
         """
-        return self.call_chat(messages, functions=None)
+        metrics.counter("cancelled_work_total").inc(kind="llm", provider=self.provider_name)
+        typical: Optional[float] = metrics.histogram("llm_completion_tokens").percentile(50, provider=self.provider_name)
+        if typical is not None:
+            saved: float = max(0.0, typical - streamed_chars / 4)
+            metrics.counter("cancelled_llm_tokens_saved_total").inc(round(saved), provider=self.provider_name)
 
     def _parse_function_call(self, llm_response: str) -> LLMFunctionCall:
         """
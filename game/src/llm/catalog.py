@@ -0,0 +1,78 @@
+"""
+Compact encoding of the function catalog for JSON-prompted providers.
+"""
+from __future__ import annotations
+import json
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from metrics import metrics
+
+if TYPE_CHECKING:
+    from .base_provider import LLMFunction
+
+# (name, description, parameters as canonical JSON) per function
+CatalogKey = Tuple[Tuple[str, str, str], ...]
+
+_COMPACT: Dict[str, Any] = {"ensure_ascii": False, "separators": (",", ":")}
+
+_cache: "OrderedDict[Tuple[CatalogKey, bool], str]" = OrderedDict()
+_cache_lock: threading.Lock = threading.Lock()
+CACHE_SIZE: int = 256
+
+
+def function_catalog(functions: List[LLMFunction], include_parameters: bool = True) -> str:
+    """
+    Encode the available functions for the system prompt.
+
+    Names and descriptions only, without indentation. The parameter schema
+    that most functions share is declared once; functions with a different
+    schema carry it inline. The text is cached per function set, so an
+    unchanged state produces the byte-identical catalog every turn.
+
+    Args:
+        functions: Available functions
+        include_parameters: Declare parameter schemas (False for models that
+                            answer with a top-level "response" field anyway)
+
+    Returns:
+        Catalog text
+    """
+    key: CatalogKey = tuple(
+        (f.name, f.description, json.dumps(f.parameters or {}, sort_keys=True, **_COMPACT))
+        for f in functions
+    )
+    with _cache_lock:
+        text: Optional[str] = _cache.get((key, include_parameters))
+        if text is not None:
+            _cache.move_to_end((key, include_parameters))
+            metrics.counter("function_catalog_requests_total").inc(result="hit")
+            return text
+
+    text = _encode(key, include_parameters)
+    with _cache_lock:
+        _cache[(key, include_parameters)] = text
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    metrics.counter("function_catalog_requests_total").inc(result="miss")
+    return text
+
+
+def _encode(key: CatalogKey, include_parameters: bool) -> str:
+    """Build the catalog text (see function_catalog)."""
+    if not include_parameters:
+        return json.dumps([{"name": name, "description": description} for name, description, _ in key], **_COMPACT)
+
+    shared: str = Counter(parameters for _, _, parameters in key).most_common(1)[0][0] if key else "{}"
+    entries: List[Dict[str, Any]] = []
+    for name, description, parameters in key:
+        entry: Dict[str, Any] = {"name": name, "description": description}
+        if parameters != shared:
+            entry["parameters"] = json.loads(parameters)
+        entries.append(entry)
+
+    catalog: str = json.dumps(entries, **_COMPACT)
+    if shared == "{}":
+        return catalog
+    return f"Parameter aller Funktionen (sofern nicht angegeben): {shared}\n{catalog}"
@@ -2,10 +2,12 @@
 Gemini LLM Provider implementation.
 Uses OpenAI-compatible API endpoint provided by Google.
 """
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 import json
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from cancellation import OperationCancelledError
 from .base_provider import BaseLLMProvider, LLMMessage, LLMResponse, LLMFunction, LLMFunctionCall
+from .streaming import aconsume_openai_stream, consume_openai_stream, openai_usage
 
 
 class GeminiProvider(BaseLLMProvider):
@@ -24,35 +26,46 @@ class GeminiProvider(BaseLLMProvider):
             base_url=self.BASE_URL,
             api_key=self.api_key
         )
-    def build_prompt(self, base_prompt: str, functions: List[LLMFunction], messages: List[LLMMessage]) -> List[LLMMessage]:
+        self.async_client = AsyncOpenAI(
+            base_url=self.BASE_URL,
+            api_key=self.api_key
+        )
+
+    def build_prompt(
+        self,
+        base_prompt: str,
+        functions: List[LLMFunction],
+        messages: List[LLMMessage],
+        state_prompt: str = ""
+    ) -> List[LLMMessage]:
         """
         Build prompt for Gemini.
         Uses native function calling, so no need to inject function descriptions into prompt.
+        The per-state block comes last (stable prefix, see BaseLLMProvider.build_prompt).
         """
         # Build system prompt WITHOUT function descriptions (native function calling handles this)
         system_prompt = f"""{base_prompt}
 
 HINWEIS FÜR KONTEXT: Du kannst alle Informationen aus deinem Kontext (Raumbeschreibung, Schilder, Objekte, etc.) frei mit dem Spieler teilen, wenn er danach fragt. Nutze dafür 'keine_aktion' als Funktion und beantworte die Frage direkt."""
+        if state_prompt:
+            system_prompt += f"\n\n{state_prompt}"
 
         return [LLMMessage(role="system", content=system_prompt), *messages]
 
-    def call_chat(
+    def _build_api_params(
         self,
         messages: List[LLMMessage],
-        functions: Optional[List[LLMFunction]] = None
-    ) -> LLMResponse:
+        functions: Optional[List[LLMFunction]]
+    ) -> Dict[str, Any]:
         """
-        Send messages to Gemini and get a response with native function calling.
-        
+        Build chat completion parameters (messages + native tools).
+
         Args:
             messages: List of LLMMessage objects
             functions: Optional list of functions for native function calling
-            
+
         Returns:
-            LLMResponse object
-            
-        Raises:
-            Exception: If the API call fails
+            Keyword arguments for client.chat.completions.create
         """
         # Convert LLMMessage objects to OpenAI format
         # Filter out messages with empty content (Gemini doesn't accept them)
@@ -83,74 +96,169 @@ HINWEIS FÜR KONTEXT: Du kannst alle Informationen aus deinem Kontext (Raumbesch
                 for f in functions
             ]
         
-        try:
-            # Call API with or without tools
-            api_params = {
-                "model": self.model,
-                "messages": formatted_messages,
-                "temperature": self.temperature,
-                "max_tokens": self.max_tokens
-            }
-            
-            if tools:
-                api_params["tools"] = tools
-                api_params["tool_choice"] = "auto"
-            
-            response = self.client.chat.completions.create(**api_params)
-            
-            content = response.choices[0].message.content or ""
-            
-            # Extract usage information if available
-            usage = None
-            if hasattr(response, 'usage') and response.usage:
-                usage = {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens
-                }
-            
-            # Handle native function call if present
-            function_call = None
-            message = response.choices[0].message
-            if hasattr(message, 'tool_calls') and message.tool_calls:
-                tool_call = message.tool_calls[0]
-                if tool_call.function:
-                    try:
-                        arguments = json.loads(tool_call.function.arguments)
-                        
-                        # Debug logging
-                        if self.debug_mode:
-                            print(f"[DEBUG] Native function call detected:")
-                            print(f"  Function name: {tool_call.function.name}")
-                            print(f"  Raw arguments: {tool_call.function.arguments}")
-                            print(f"  Parsed arguments: {arguments}")
-                        
-                        function_call = LLMFunctionCall(
-                            name=tool_call.function.name,
-                            arguments=arguments
-                        )
-                        # If there's a function call but no content, use the function response
-                        if not content and "response" in arguments:
-                            content = arguments["response"]
-                    except json.JSONDecodeError as e:
-                        if self.debug_mode:
-                            print(f"[DEBUG] Failed to parse function arguments: {e}")
-                            print(f"  Raw arguments string: {tool_call.function.arguments}")
-                    except Exception as e:
-                        if self.debug_mode:
-                            print(f"[DEBUG] Unexpected error processing function call: {e}")
+        api_params: Dict[str, Any] = {
+            "model": self.model,
+            "messages": formatted_messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens
+        }
+        
+        if tools:
+            api_params["tools"] = tools
+            api_params["tool_choice"] = "auto"
+
+        return api_params
+
+    def call_chat(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]] = None,
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Send messages to Gemini and get a response with native function calling.
+        
+        Args:
+            messages: List of LLMMessage objects
+            functions: Optional list of functions for native function calling
+            timeout: Request timeout in seconds (None: the client's default)
             
-            return LLMResponse(
-                content=content,
-                model=response.model,
-                usage=usage,
-                finish_reason=response.choices[0].finish_reason,
-                function_call=function_call
-            )
+        Returns:
+            LLMResponse object
             
+        Raises:
+            Exception: If the API call fails
+        """
+        api_params: Dict[str, Any] = self._build_api_params(messages, functions)
+
+        try:
+            response = self.client.chat.completions.create(**api_params, **self._request_timeout(timeout))
+            return self._to_response(response)
+        except OperationCancelledError:
+            raise
         except Exception as e:
             raise Exception(f"Gemini API error: {str(e)}")
-    
+
+    async def acall_chat(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]] = None,
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """Async variant of call_chat (AsyncOpenAI client)."""
+        api_params: Dict[str, Any] = self._build_api_params(messages, functions)
+
+        try:
+            response = await self.async_client.chat.completions.create(**api_params, **self._request_timeout(timeout))
+            return self._to_response(response)
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"Gemini API error: {str(e)}")
+
+    def _to_response(self, response: Any) -> LLMResponse:
+        """
+        Convert a chat completion into an LLMResponse (native function call included).
+
+        Args:
+            response: Chat completion returned by the (async) client
+
+        Returns:
+            LLMResponse object
+        """
+        content = response.choices[0].message.content or ""
+
+        # Extract usage information if available
+        usage = openai_usage(getattr(response, 'usage', None))
+
+        # Handle native function call if present
+        function_call = None
+        message = response.choices[0].message
+        if hasattr(message, 'tool_calls') and message.tool_calls:
+            tool_call = message.tool_calls[0]
+            if tool_call.function:
+                try:
+                    arguments = json.loads(tool_call.function.arguments)
+
+                    # Debug logging
+                    if self.debug_mode:
+                        print(f"[DEBUG] Native function call detected:")
+                        print(f"  Function name: {tool_call.function.name}")
+                        print(f"  Raw arguments: {tool_call.function.arguments}")
+                        print(f"  Parsed arguments: {arguments}")
+
+                    function_call = LLMFunctionCall(
+                        name=tool_call.function.name,
+                        arguments=arguments
+                    )
+                    # If there's a function call but no content, use the function response
+                    if not content and "response" in arguments:
+                        content = arguments["response"]
+                except json.JSONDecodeError as e:
+                    if self.debug_mode:
+                        print(f"[DEBUG] Failed to parse function arguments: {e}")
+                        print(f"  Raw arguments string: {tool_call.function.arguments}")
+                except Exception as e:
+                    if self.debug_mode:
+                        print(f"[DEBUG] Unexpected error processing function call: {e}")
+
+        return LLMResponse(
+            content=content,
+            model=response.model,
+            usage=usage,
+            finish_reason=response.choices[0].finish_reason,
+            function_call=function_call
+        )
+
+    def call_chat_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Callable[[str], None],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Stream a response from Gemini, forwarding content and tool call
+        argument deltas to on_delta.
+
+        Returns:
+            The complete LLMResponse once the stream has finished
+        """
+        api_params: Dict[str, Any] = self._build_api_params(messages, functions)
+
+        try:
+            stream = self.client.chat.completions.create(**api_params, stream=True, **self._request_timeout(timeout))
+            response: LLMResponse = consume_openai_stream(stream, on_delta, self.model)
+            # Same as call_chat: use the function response if there is no content
+            if not response.content and response.function_call and "response" in response.function_call.arguments:
+                response.content = response.function_call.arguments["response"]
+            return response
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"Gemini API error: {str(e)}")
+
+    async def acall_chat_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Callable[[str], None],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """Async variant of call_chat_stream (AsyncOpenAI client)."""
+        api_params: Dict[str, Any] = self._build_api_params(messages, functions)
+
+        try:
+            stream = await self.async_client.chat.completions.create(**api_params, stream=True, **self._request_timeout(timeout))
+            response: LLMResponse = await aconsume_openai_stream(stream, on_delta, self.model)
+            if not response.content and response.function_call and "response" in response.function_call.arguments:
+                response.content = response.function_call.arguments["response"]
+            return response
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"Gemini API error: {str(e)}")
+
     def _validate_config(self) -> None:
         """Validate Gemini configuration."""
         if not self.api_key:
@@ -2,32 +2,61 @@
 Gemma provider for local Gemma models via Ollama.
 Uses Ollama's native OpenAI-compatible tool calling API.
 """
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 import json
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from cancellation import OperationCancelledError
 from .base_provider import BaseLLMProvider, LLMMessage, LLMResponse, LLMFunction, LLMFunctionCall
+from .ollama_native import OllamaNativeClient
+from .streaming import aconsume_openai_stream, consume_openai_stream, openai_usage
 
 
 class GemmaProvider(BaseLLMProvider):
     """
     Provider for Gemma models running via Ollama.
     Uses native function calling via the OpenAI tools API instead of JSON prompting.
+    With llm.ollama.native the native Ollama API is used (keep_alive, num_ctx sizing, warmup).
     """
 
     DEFAULT_BASE_URL = "http://localhost:11434/v1"
 
-    def __init__(self, api_key: str, model: str, temperature: float = 0.1, max_tokens: int = 2000, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+        base_url: Optional[str] = None,
+        native: Optional[OllamaNativeClient] = None
+    ):
         super().__init__(api_key, model, temperature, max_tokens)
         self.base_url = base_url or self.DEFAULT_BASE_URL
         self.client = OpenAI(
             base_url=self.base_url,
             api_key="ollama"
         )
-
-    def build_prompt(self, base_prompt: str, functions: List[LLMFunction], messages: List[LLMMessage]) -> List[LLMMessage]:
+        self.async_client = AsyncOpenAI(
+            base_url=self.base_url,
+            api_key="ollama"
+        )
+        # Native Ollama API (keep_alive, num_ctx, warmup) instead of the OpenAI-compatible endpoint
+        self.native: Optional[OllamaNativeClient] = native
+
+    def warmup(self) -> bool:
+        """Load the model into Ollama's memory (native API only)."""
+        return self.native.warmup(self.model) if self.native else False
+
+    def build_prompt(
+        self,
+        base_prompt: str,
+        functions: List[LLMFunction],
+        messages: List[LLMMessage],
+        state_prompt: str = ""
+    ) -> List[LLMMessage]:
         """
         Build system prompt for Gemma. Functions are passed natively via tools API,
-        so the prompt only needs character/behavior instructions.
+        so the prompt only needs character/behavior instructions. The per-state
+        block comes last, so llama.cpp/Ollama can reuse the KV cache of the prefix.
         """
         system_prompt = f"""{base_prompt}
 
@@ -35,11 +64,17 @@ Antworte immer auf Deutsch, kurz und in deiner Rolle. Sprich den Spieler direkt
 Wähle die passende Funktion basierend auf der Absicht des Spielers.
 Nutze 'keine_aktion' nur wenn wirklich keine Funktion passt.
 """
+        if state_prompt:
+            system_prompt += f"\n{state_prompt}"
         return [LLMMessage(role="system", content=system_prompt), *messages]
 
-    def call_chat(self, messages: List[LLMMessage], functions: Optional[List[LLMFunction]] = None) -> LLMResponse:
+    def _build_api_params(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]]
+    ) -> Dict[str, Any]:
         """
-        Call Gemma via Ollama with native tool calling.
+        Build chat completion parameters with the OpenAI-compatible tools schema.
         """
         formatted_messages = [
             {"role": msg.role, "content": msg.content}
@@ -70,51 +105,124 @@ Nutze 'keine_aktion' nur wenn wirklich keine Funktion passt.
                 for f in functions
             ]
 
+        kwargs: Dict[str, Any] = {
+            "model": self.model,
+            "messages": formatted_messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+        if tools:
+            kwargs["tools"] = tools
+            kwargs["tool_choice"] = "required"
+        return kwargs
+
+    def call_chat(self, messages: List[LLMMessage], functions: Optional[List[LLMFunction]] = None, timeout: Optional[float] = None) -> LLMResponse:
+        """
+        Call Gemma via Ollama with native tool calling.
+        """
+        kwargs: Dict[str, Any] = self._build_api_params(messages, functions)
+        if self.native:
+            return self.native.chat(
+                self.model, messages, {"temperature": self.temperature}, self.max_tokens, tools=kwargs.get("tools"), timeout=timeout
+            )
+
         try:
-            kwargs: Dict[str, Any] = {
-                "model": self.model,
-                "messages": formatted_messages,
-                "temperature": self.temperature,
-                "max_tokens": self.max_tokens,
-            }
-            if tools:
-                kwargs["tools"] = tools
-                kwargs["tool_choice"] = "required"
-
-            response = self.client.chat.completions.create(**kwargs)
-
-            message = response.choices[0].message
-            content = message.content or ""
-
-            # Extract native tool call if present
-            function_call = None
-            if message.tool_calls:
-                tool_call = message.tool_calls[0]
-                try:
-                    arguments = json.loads(tool_call.function.arguments or "{}")
-                except json.JSONDecodeError:
-                    arguments = {}
-                function_call = LLMFunctionCall(
-                    name=tool_call.function.name,
-                    arguments=arguments
-                )
-
-            usage = None
-            if hasattr(response, 'usage') and response.usage:
-                usage = {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens
-                }
+            response = self.client.chat.completions.create(**kwargs, **self._request_timeout(timeout))
+            return self._to_response(response)
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"Gemma/Ollama API error: {str(e)}")
 
-            return LLMResponse(
-                content=content,
-                model=response.model,
-                function_call=function_call,
-                usage=usage,
-                finish_reason=response.choices[0].finish_reason
+    async def acall_chat(self, messages: List[LLMMessage], functions: Optional[List[LLMFunction]] = None, timeout: Optional[float] = None) -> LLMResponse:
+        """Async variant of call_chat (AsyncOpenAI client or the native API)."""
+        kwargs: Dict[str, Any] = self._build_api_params(messages, functions)
+        if self.native:
+            return await self.native.achat(
+                self.model, messages, {"temperature": self.temperature}, self.max_tokens, tools=kwargs.get("tools"), timeout=timeout
             )
 
+        try:
+            response = await self.async_client.chat.completions.create(**kwargs, **self._request_timeout(timeout))
+            return self._to_response(response)
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"Gemma/Ollama API error: {str(e)}")
+
+    def _to_response(self, response: Any) -> LLMResponse:
+        """Convert a chat completion into an LLMResponse (native tool call included)."""
+        message = response.choices[0].message
+        content = message.content or ""
+
+        # Extract native tool call if present
+        function_call = None
+        if message.tool_calls:
+            tool_call = message.tool_calls[0]
+            try:
+                arguments = json.loads(tool_call.function.arguments or "{}")
+            except json.JSONDecodeError:
+                arguments = {}
+            function_call = LLMFunctionCall(
+                name=tool_call.function.name,
+                arguments=arguments
+            )
+
+        usage = openai_usage(getattr(response, 'usage', None))
+
+        return LLMResponse(
+            content=content,
+            model=response.model,
+            function_call=function_call,
+            usage=usage,
+            finish_reason=response.choices[0].finish_reason
+        )
+
+    def call_chat_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Callable[[str], None],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Stream Gemma's answer, forwarding tool call argument deltas to on_delta.
+        """
+        kwargs: Dict[str, Any] = self._build_api_params(messages, functions)
+        if self.native:
+            return self.native.chat(
+                self.model, messages, {"temperature": self.temperature}, self.max_tokens,
+                tools=kwargs.get("tools"), on_delta=on_delta, timeout=timeout
+            )
+
+        try:
+            stream = self.client.chat.completions.create(**kwargs, stream=True, **self._request_timeout(timeout))
+            return consume_openai_stream(stream, on_delta, self.model)
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"Gemma/Ollama API error: {str(e)}")
+
+    async def acall_chat_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Callable[[str], None],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """Async variant of call_chat_stream (AsyncOpenAI client or the native API)."""
+        kwargs: Dict[str, Any] = self._build_api_params(messages, functions)
+        if self.native:
+            return await self.native.achat(
+                self.model, messages, {"temperature": self.temperature}, self.max_tokens,
+                tools=kwargs.get("tools"), on_delta=on_delta, timeout=timeout
+            )
+
+        try:
+            stream = await self.async_client.chat.completions.create(**kwargs, stream=True, **self._request_timeout(timeout))
+            return await aconsume_openai_stream(stream, on_delta, self.model)
+        except OperationCancelledError:
+            raise
         except Exception as e:
             raise Exception(f"Gemma/Ollama API error: {str(e)}")
 
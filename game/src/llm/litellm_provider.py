@@ -2,9 +2,11 @@
 LiteLLM Proxy Provider implementation.
 Uses the OpenAI-compatible API format to communicate with LiteLLM Proxy.
 """
-from typing import List, Optional
-from openai import OpenAI
+from typing import Callable, List, Optional
+from openai import AsyncOpenAI, OpenAI
+from cancellation import OperationCancelledError
 from .base_provider import BaseLLMProvider, LLMMessage, LLMResponse, LLMFunction
+from .streaming import aconsume_openai_stream, consume_openai_stream, openai_usage
 
 
 class LiteLLMProvider(BaseLLMProvider):
@@ -15,6 +17,7 @@ class LiteLLMProvider(BaseLLMProvider):
     """
 
     DEFAULT_BASE_URL = "http://localhost:4000/v1"
+    SUPPORTS_RESPONSE_SCHEMA = True  # response_format is passed through to the routed model
 
     def __init__(
         self,
@@ -41,18 +44,25 @@ class LiteLLMProvider(BaseLLMProvider):
             base_url=self.base_url,
             api_key=self.api_key
         )
+        self.async_client = AsyncOpenAI(
+            base_url=self.base_url,
+            api_key=self.api_key
+        )
 
     def call_chat(
         self,
         messages: List[LLMMessage],
-        functions: Optional[List[LLMFunction]] = None
+        functions: Optional[List[LLMFunction]] = None,
+        timeout: Optional[float] = None
     ) -> LLMResponse:
         """
         Send messages to LiteLLM Proxy and get a response.
         
         Args:
             messages: List of LLMMessage objects
-            functions: Optional list of functions (ignored - uses JSON-based function calling)
+            functions: Optional list of functions (JSON-based function calling; their names
+                       constrain the answer if structured_output is enabled)
+            timeout: Request timeout in seconds (None: the client's default)
             
         Returns:
             LLMResponse object
@@ -71,19 +81,15 @@ class LiteLLMProvider(BaseLLMProvider):
                 model=self.model,
                 messages=formatted_messages,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self.max_tokens,
+                **self._response_format(functions),
+                **self._request_timeout(timeout)
             )
             
             content = response.choices[0].message.content or ""
             
             # Extract usage information
-            usage = None
-            if hasattr(response, 'usage') and response.usage:
-                usage = {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens
-                }
+            usage = openai_usage(getattr(response, 'usage', None))
             
             return LLMResponse(
                 content=content,
@@ -92,9 +98,108 @@ class LiteLLMProvider(BaseLLMProvider):
                 finish_reason=response.choices[0].finish_reason
             )
             
+        except OperationCancelledError:
+            raise
         except Exception as e:
             raise Exception(f"LiteLLM Proxy API error: {str(e)}")
     
+    def call_chat_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Callable[[str], None],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Stream a response from LiteLLM Proxy, forwarding text deltas to on_delta.
+
+        Returns:
+            The complete LLMResponse once the stream has finished
+        """
+        formatted_messages = [
+            {"role": msg.role, "content": msg.content}
+            for msg in messages
+        ]
+
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=formatted_messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                **self._response_format(functions),
+                stream=True,
+                stream_options={"include_usage": True},
+                **self._request_timeout(timeout)
+            )
+            return consume_openai_stream(stream, on_delta, self.model)
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"LiteLLM Proxy API error: {str(e)}")
+
+    async def acall_chat(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]] = None,
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """Async variant of call_chat (AsyncOpenAI client)."""
+        formatted_messages = [
+            {"role": msg.role, "content": msg.content}
+            for msg in messages
+        ]
+
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=formatted_messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                **self._response_format(functions),
+                **self._request_timeout(timeout)
+            )
+            return LLMResponse(
+                content=response.choices[0].message.content or "",
+                model=response.model,
+                usage=openai_usage(getattr(response, 'usage', None)),
+                finish_reason=response.choices[0].finish_reason
+            )
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"LiteLLM Proxy API error: {str(e)}")
+
+    async def acall_chat_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Callable[[str], None],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """Async variant of call_chat_stream (AsyncOpenAI client)."""
+        formatted_messages = [
+            {"role": msg.role, "content": msg.content}
+            for msg in messages
+        ]
+
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=formatted_messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                **self._response_format(functions),
+                stream=True,
+                stream_options={"include_usage": True},
+                **self._request_timeout(timeout)
+            )
+            return await aconsume_openai_stream(stream, on_delta, self.model)
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"LiteLLM Proxy API error: {str(e)}")
+
     def _validate_config(self) -> None:
         """Validate LiteLLM configuration."""
         if not self.api_key:
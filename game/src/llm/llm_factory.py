@@ -13,6 +13,11 @@ from .deepseek_provider import DeepSeekProvider
 from .ollama_provider import OllamaProvider
 from .gemma_provider import GemmaProvider
 from .litellm_provider import LiteLLMProvider
+from .ollama_native import OllamaNativeClient
+from .resilient_provider import ResilientProvider
+from .router_provider import RouterProvider
+from .scheduler import scheduler
+from .single_flight import single_flight
 
 
 class LLMFactory:
@@ -28,22 +33,29 @@ class LLMFactory:
         "deepseek": DeepSeekProvider,
         "ollama": OllamaProvider,
         "gemma": GemmaProvider,
-        "litellm": LiteLLMProvider
+        "litellm": LiteLLMProvider,
+        "router": RouterProvider
     }
     
-    def __init__(self, config_path: Optional[str] = None) -> None:
+    def __init__(self, config_path: Optional[str] = None, config: Optional[Dict] = None) -> None:
         """
         Initialize the factory with a config file.
         
         Args:
             config_path: Path to config.yaml. If None, looks for config.yaml in game/
+            config: Already loaded configuration (e.g. GameSession.config); used
+                    instead of reading config_path
         """
         if config_path is None:
             # Default to dungeon/config.yaml (project root)
             config_path = Path(__file__).parent.parent.parent.parent / "config.yaml"
         
         self.config_path: Path = Path(config_path)
-        self.config: Dict = self._load_config()
+        self.config: Dict = config if config is not None else self._load_config()
+
+        # Process-wide admission control for outbound LLM calls
+        scheduler.configure(self.config.get('llm', {}).get('scheduler', {}))
+        single_flight.configure(self.config.get('llm', {}).get('single_flight', {}))
     
     def _load_config(self) -> Dict:
         """Load configuration from YAML file."""
@@ -55,21 +67,43 @@ class LLMFactory:
 
         return config
 
-    def create_provider(self, provider_name: Optional[str] = None) -> BaseLLMProvider:
+    def create_provider(
+        self,
+        provider_name: Optional[str] = None,
+        model: Optional[str] = None,
+        overrides: Optional[Dict] = None
+    ) -> BaseLLMProvider:
         """
         Create an LLM provider instance.
 
         Args:
             provider_name: Name of the provider to create. If None, uses config default.
+            model: Model to use. If None, uses config default.
+            overrides: Settings that replace the llm section of config.yaml
+                       (e.g. api_key, base_url of a router route)
 
         Returns:
-            Instance of the requested provider
+            Instance of the requested provider (wrapped in a ResilientProvider
+            if llm.resilience.enabled; route and backup providers are not wrapped)
 
         Raises:
             ValueError: If provider is not supported or configuration is invalid
         """
+        provider_instance: BaseLLMProvider = self._create_provider(provider_name, model, overrides)
+        resilience: Dict = self.config.get('llm', {}).get('resilience', {})
+        if overrides is None and resilience.get('enabled', False):
+            return ResilientProvider.from_config(self, provider_instance, resilience)
+        return provider_instance
+
+    def _create_provider(
+        self,
+        provider_name: Optional[str],
+        model: Optional[str],
+        overrides: Optional[Dict]
+    ) -> BaseLLMProvider:
+        """Create an unwrapped provider instance (see create_provider)."""
         # Get LLM configuration scope
-        llm_config: Dict = self.config.get('llm', {})
+        llm_config: Dict = {**self.config.get('llm', {}), **(overrides or {})}
 
         # Use provided provider name or fall back to config
         provider: Optional[str] = provider_name or llm_config.get('provider')
@@ -85,13 +119,20 @@ class LLMFactory:
             )
 
         # Get model, temperature, max_tokens from LLM config
-        model: Optional[str] = llm_config.get('model')
+        model = model or llm_config.get('model')
         temperature: float = llm_config.get('temperature', 0.1)
         max_tokens: int = llm_config.get('max_tokens', 2000)
 
         # Get debug flag from debug scope
         debug_mode: bool = self.config.get('debug', {}).get('llm', False)
+
+        # Schema-constrained answers for JSON-prompted providers that support it
+        structured_output: bool = bool(llm_config.get('structured_output', False))
         
+        # Routing provider (fast local model, escalation to a larger model)
+        if provider == "router":
+            return RouterProvider.from_config(self, llm_config.get('router', {}))
+
         if not model:
             raise ValueError("No model specified in config")
         
@@ -127,9 +168,11 @@ class LLMFactory:
                 model=model,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                base_url=base_url
+                base_url=base_url,
+                native=OllamaNativeClient.from_config(base_url or OllamaProvider.DEFAULT_BASE_URL, llm_config.get('ollama', {}))
             )
             provider_instance.debug_mode = debug_mode
+            provider_instance.structured_output = structured_output
             return provider_instance
 
         # Special handling for Gemma (via Ollama, native tool calling)
@@ -140,9 +183,11 @@ class LLMFactory:
                 model=model,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                base_url=base_url
+                base_url=base_url,
+                native=OllamaNativeClient.from_config(base_url or GemmaProvider.DEFAULT_BASE_URL, llm_config.get('ollama', {}))
             )
             provider_instance.debug_mode = debug_mode
+            provider_instance.structured_output = structured_output
             return provider_instance
 
         # Special handling for LiteLLM Proxy
@@ -163,6 +208,7 @@ class LLMFactory:
                 base_url=base_url
             )
             provider_instance.debug_mode = debug_mode
+            provider_instance.structured_output = structured_output
             return provider_instance
 
         # Standard providers (OpenAI, Gemini, DeepSeek)
@@ -180,6 +226,7 @@ class LLMFactory:
             max_tokens=max_tokens
         )
         provider_instance.debug_mode = debug_mode
+        provider_instance.structured_output = structured_output
         return provider_instance
     
     def get_available_providers(self) -> List[str]:
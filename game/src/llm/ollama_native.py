@@ -0,0 +1,378 @@
+"""
+Native Ollama API client (/api/chat).
+The OpenAI-compatible endpoint of Ollama gives no control over keep_alive,
+num_ctx or model preloading; this client talks to Ollama directly so the
+model stays loaded between turns and long prompts are not truncated.
+"""
+from __future__ import annotations
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import requests
+
+from metrics import metrics
+from .base_provider import LLMFunctionCall, LLMMessage, LLMResponse
+
+
+class OllamaNativeClient:
+    """
+    Client for Ollama's native chat API.
+
+    - keep_alive pins the model in memory (e.g. "30m", -1 = forever)
+    - warmup() loads the model before the first turn
+    - num_ctx is sized from the prompt length; it only grows per model,
+      because every change of num_ctx makes Ollama reload the model
+    - load/prompt eval/eval durations of every response are recorded
+    - achat() is the async variant (httpx.AsyncClient) for event loop callers
+    """
+
+    CALIBRATION_MIN_CHARS: int = 2000
+    MIN_CHARS_PER_TOKEN: float = 2.0
+
+    def __init__(
+        self,
+        base_url: str,
+        keep_alive: Any = "30m",
+        min_ctx: int = 2048,
+        max_ctx: int = 32768,
+        timeout: float = 120.0
+    ) -> None:
+        """
+        Args:
+            base_url: Ollama URL (a trailing /v1 of the OpenAI-compatible endpoint is stripped)
+            keep_alive: How long Ollama keeps the model loaded after a request
+            min_ctx: Smallest context window (tokens)
+            max_ctx: Largest context window (tokens)
+            timeout: Request timeout in seconds
+        """
+        self.base_url: str = self.native_base_url(base_url)
+        self.keep_alive: Any = keep_alive
+        self.min_ctx: int = min_ctx
+        self.max_ctx: int = max_ctx
+        self.timeout: float = timeout
+        self._lock: threading.Lock = threading.Lock()
+        self._num_ctx: Dict[str, int] = {}
+        # Characters per token measured from prompt_eval_count (starts conservative for German text)
+        self._chars_per_token: Dict[str, float] = {}
+        self._async_client: Optional[httpx.AsyncClient] = None  # Created on first achat()
+
+    @classmethod
+    def from_config(cls, base_url: str, config: Dict[str, Any]) -> Optional[OllamaNativeClient]:
+        """
+        Create a client from the llm.ollama section of config.yaml.
+
+        Args:
+            base_url: Configured Ollama URL
+            config: Ollama configuration dict
+
+        Returns:
+            Client, or None if the native API is not enabled
+        """
+        if not config.get('native', False):
+            return None
+        num_ctx: Dict[str, Any] = config.get('num_ctx', {})
+        return cls(
+            base_url=base_url,
+            keep_alive=config.get('keep_alive', "30m"),
+            min_ctx=int(num_ctx.get('min', 2048)),
+            max_ctx=int(num_ctx.get('max', 32768)),
+            timeout=float(config.get('timeout', 120.0))
+        )
+
+    @staticmethod
+    def native_base_url(base_url: str) -> str:
+        """Ollama root URL (http://host:11434) from a native or OpenAI-compatible URL."""
+        url: str = base_url.rstrip("/")
+        return url[:-len("/v1")] if url.endswith("/v1") else url
+
+    def num_ctx_for(self, model: str, messages: List[LLMMessage], max_tokens: int) -> int:
+        """
+        Context window for a request: prompt tokens plus the answer, rounded
+        up to a power of two within [min_ctx, max_ctx]. Never shrinks per model.
+
+        Args:
+            model: Model name
+            messages: Complete prompt
+            max_tokens: Maximum answer length
+
+        Returns:
+            num_ctx option for Ollama
+        """
+        chars: int = sum(len(message.content) for message in messages)
+        with self._lock:
+            prompt_tokens: int = int(chars / self._chars_per_token.get(model, 3.0)) + 1
+            needed: int = prompt_tokens + max_tokens
+            size: int = self.min_ctx
+            while size < needed and size < self.max_ctx:
+                size *= 2
+            size = max(min(size, self.max_ctx), self._num_ctx.get(model, 0))
+            self._num_ctx[model] = size
+
+        if needed > size:
+            # Ollama silently drops the start of the prompt
+            metrics.counter("ollama_context_overflow_total").inc(model=model)
+            print(f"[OLLAMA] Prompt (~{prompt_tokens} tokens) exceeds num_ctx {size} - raise llm.ollama.num_ctx.max")
+        return size
+
+    def warmup(self, model: str) -> bool:
+        """
+        Load a model into memory (chat request without messages) and pin it with keep_alive.
+
+        Args:
+            model: Model name
+
+        Returns:
+            True if Ollama loaded the model
+        """
+        with self._lock:
+            num_ctx: int = self._num_ctx.setdefault(model, self.min_ctx)
+        try:
+            response = requests.post(
+                f"{self.base_url}/api/chat",
+                json={"model": model, "messages": [], "keep_alive": self.keep_alive, "options": {"num_ctx": num_ctx}},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            data: Dict[str, Any] = response.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"[OLLAMA] Warmup of {model} failed: {e}")
+            return False
+        load_seconds: float = data.get('load_duration', 0) / 1e9
+        metrics.histogram("ollama_load_seconds").observe(load_seconds, model=model)
+        print(f"[OLLAMA] {model} loaded in {load_seconds:.2f}s (keep_alive={self.keep_alive}, num_ctx={num_ctx})")
+        return True
+
+    def chat(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Dict[str, Any],
+        max_tokens: int,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+        schema: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Send a chat request to /api/chat.
+
+        Args:
+            model: Model name
+            messages: Complete prompt
+            options: Ollama options (temperature, ...); num_ctx and num_predict are added
+            max_tokens: Maximum answer length (num_predict)
+            tools: Optional tools schema (native tool calling)
+            on_delta: Stream the answer and forward text deltas (tool call arguments as JSON)
+            schema: Optional JSON schema the answer must follow (format, constrained decoding)
+            timeout: Request timeout in seconds (capped at the configured timeout)
+
+        Returns:
+            LLMResponse (usage from prompt_eval_count/eval_count)
+
+        Raises:
+            Exception: If the API call fails
+        """
+        payload: Dict[str, Any] = self._payload(model, messages, options, max_tokens, tools, on_delta is not None, schema)
+        try:
+            with requests.post(
+                f"{self.base_url}/api/chat", json=payload, stream=on_delta is not None, timeout=self._timeout(timeout)
+            ) as response:
+                response.raise_for_status()
+                if on_delta is None:
+                    data: Dict[str, Any] = response.json()
+                    message: Dict[str, Any] = data.get('message', {})
+                    content: str = message.get('content', '')
+                    tool_calls: List[Dict[str, Any]] = message.get('tool_calls') or []
+                else:
+                    data, content, tool_calls = self._consume_stream(response, on_delta)
+        except requests.RequestException as e:
+            raise Exception(f"Ollama API error: {e}")
+        return self._to_response(model, messages, data, content, tool_calls)
+
+    async def achat(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Dict[str, Any],
+        max_tokens: int,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+        schema: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Async variant of chat() (same arguments and result).
+
+        Raises:
+            Exception: If the API call fails
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(timeout=self.timeout)
+        payload: Dict[str, Any] = self._payload(model, messages, options, max_tokens, tools, on_delta is not None, schema)
+        try:
+            if on_delta is None:
+                response: httpx.Response = await self._async_client.post(
+                    f"{self.base_url}/api/chat", json=payload, timeout=self._timeout(timeout)
+                )
+                response.raise_for_status()
+                data: Dict[str, Any] = response.json()
+                message: Dict[str, Any] = data.get('message', {})
+                content: str = message.get('content', '')
+                tool_calls: List[Dict[str, Any]] = message.get('tool_calls') or []
+            else:
+                parts: List[str] = []
+                tool_calls = []
+                data = {}
+                async with self._async_client.stream(
+                    "POST", f"{self.base_url}/api/chat", json=payload, timeout=self._timeout(timeout)
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk: Dict[str, Any] = json.loads(line)
+                        if self._apply_chunk(chunk, parts, tool_calls, on_delta):
+                            data = chunk
+                            break
+                content = "".join(parts)
+        except httpx.HTTPError as e:
+            raise Exception(f"Ollama API error: {e}")
+        return self._to_response(model, messages, data, content, tool_calls)
+
+    def _timeout(self, timeout: Optional[float]) -> float:
+        """Timeout of one request: the configured timeout, or less if the caller's deadline is nearer."""
+        return self.timeout if timeout is None else min(self.timeout, timeout)
+
+    def _payload(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        options: Dict[str, Any],
+        max_tokens: int,
+        tools: Optional[List[Dict[str, Any]]],
+        stream: bool,
+        schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Request body of /api/chat (keep_alive, num_predict and the sized num_ctx included)."""
+        payload: Dict[str, Any] = {
+            "model": model,
+            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": {**options, "num_predict": max_tokens, "num_ctx": self.num_ctx_for(model, messages, max_tokens)}
+        }
+        if tools:
+            payload["tools"] = tools
+        if schema:
+            payload["format"] = schema
+        return payload
+
+    def _to_response(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        data: Dict[str, Any],
+        content: str,
+        tool_calls: List[Dict[str, Any]]
+    ) -> LLMResponse:
+        """Record the timings and build the LLMResponse (usage from prompt_eval_count/eval_count)."""
+        self._record(model, messages, data)
+
+        function_call: Optional[LLMFunctionCall] = None
+        if tool_calls:
+            function: Dict[str, Any] = tool_calls[0].get('function', {})
+            arguments: Any = function.get('arguments') or {}
+            if isinstance(arguments, str):
+                try:
+                    arguments = json.loads(arguments)
+                except json.JSONDecodeError:
+                    arguments = {}
+            function_call = LLMFunctionCall(name=function.get('name', ''), arguments=arguments)
+
+        prompt_tokens: int = data.get('prompt_eval_count', 0)
+        completion_tokens: int = data.get('eval_count', 0)
+        return LLMResponse(
+            content=content,
+            model=data.get('model', model),
+            function_call=function_call,
+            usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            },
+            finish_reason=data.get('done_reason')
+        )
+
+    def _consume_stream(
+        self,
+        response: Any,
+        on_delta: Callable[[str], None]
+    ) -> Tuple[Dict[str, Any], str, List[Dict[str, Any]]]:
+        """
+        Read the NDJSON stream of /api/chat.
+
+        Returns:
+            (final chunk with timings, content, tool calls)
+        """
+        parts: List[str] = []
+        tool_calls: List[Dict[str, Any]] = []
+        final: Dict[str, Any] = {}
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk: Dict[str, Any] = json.loads(line)
+            if self._apply_chunk(chunk, parts, tool_calls, on_delta):
+                final = chunk
+                break
+        return final, "".join(parts), tool_calls
+
+    @staticmethod
+    def _apply_chunk(
+        chunk: Dict[str, Any],
+        parts: List[str],
+        tool_calls: List[Dict[str, Any]],
+        on_delta: Callable[[str], None]
+    ) -> bool:
+        """
+        Collect the content and tool calls of one stream chunk and forward its deltas.
+
+        Returns:
+            True for the final chunk (done, carries the timings)
+        """
+        if chunk.get('error'):
+            raise Exception(f"Ollama API error: {chunk['error']}")
+        message: Dict[str, Any] = chunk.get('message', {})
+        if message.get('content'):
+            parts.append(message['content'])
+            on_delta(message['content'])
+        if message.get('tool_calls'):
+            tool_calls.extend(message['tool_calls'])
+            # Same text the OpenAI stream would carry, so the narrative extractor works
+            on_delta(json.dumps(message['tool_calls'][0].get('function', {}).get('arguments', {}), ensure_ascii=False))
+        return bool(chunk.get('done'))
+
+    def _record(self, model: str, messages: List[LLMMessage], data: Dict[str, Any]) -> None:
+        """Record Ollama's timings (nanoseconds) and calibrate the prompt length estimate."""
+        load_seconds: float = data.get('load_duration', 0) / 1e9
+        prompt_eval_seconds: float = data.get('prompt_eval_duration', 0) / 1e9
+        eval_seconds: float = data.get('eval_duration', 0) / 1e9
+        metrics.histogram("ollama_load_seconds").observe(load_seconds, model=model)
+        metrics.histogram("ollama_prompt_eval_seconds").observe(prompt_eval_seconds, model=model)
+        metrics.histogram("ollama_eval_seconds").observe(eval_seconds, model=model)
+        if eval_seconds > 0:
+            metrics.histogram("ollama_eval_tokens_per_second").observe(data.get('eval_count', 0) / eval_seconds, model=model)
+        if load_seconds > 1.0:
+            print(f"[OLLAMA] {model} was not loaded - load took {load_seconds:.2f}s")
+
+        # Ollama reports only the evaluated (not KV-cached) prompt tokens; the
+        # smallest chars/token ratio seen is the safe one for sizing num_ctx.
+        # Short prompts are skipped (chat template tokens dominate them).
+        prompt_tokens: int = data.get('prompt_eval_count', 0)
+        chars: int = sum(len(message.content) for message in messages)
+        if prompt_tokens > 0 and chars >= self.CALIBRATION_MIN_CHARS:
+            with self._lock:
+                self._chars_per_token[model] = max(
+                    self.MIN_CHARS_PER_TOKEN, min(self._chars_per_token.get(model, 3.0), chars / prompt_tokens)
+                )
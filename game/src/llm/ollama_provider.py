@@ -1,50 +1,70 @@
 """
 Ollama LLM Provider implementation.
 """
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 import json
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from cancellation import OperationCancelledError
 from .base_provider import BaseLLMProvider, LLMMessage, LLMResponse, LLMFunction, LLMFunctionCall
+from .catalog import function_catalog
+from .ollama_native import OllamaNativeClient
+from .streaming import aconsume_openai_stream, consume_openai_stream, openai_usage
 
 
 class OllamaProvider(BaseLLMProvider):
     """
     Ollama provider for local models.
-    Uses the OpenAI-compatible API provided by Ollama.
+    Uses the OpenAI-compatible API provided by Ollama, or the native API
+    (llm.ollama.native: keep_alive, num_ctx sizing, warmup).
     Uses JSON-based function calling with model-specific optimizations.
     """
 
     DEFAULT_BASE_URL = "http://localhost:11434/v1"
+    SUPPORTS_RESPONSE_SCHEMA = True  # format (native API) / response_format json_schema
 
-    def __init__(self, api_key: str, model: str, temperature: float = 0.1, max_tokens: int = 2000, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+        base_url: Optional[str] = None,
+        native: Optional[OllamaNativeClient] = None
+    ):
         super().__init__(api_key, model, temperature, max_tokens)
         self.base_url = base_url or self.DEFAULT_BASE_URL
         self.client = OpenAI(
             base_url=self.base_url,
             api_key="ollama"
         )
+        self.async_client = AsyncOpenAI(
+            base_url=self.base_url,
+            api_key="ollama"
+        )
+        # Native Ollama API (keep_alive, num_ctx, warmup) instead of the OpenAI-compatible endpoint
+        self.native: Optional[OllamaNativeClient] = native
+
+    def warmup(self) -> bool:
+        """Load the model into Ollama's memory (native API only)."""
+        return self.native.warmup(self.model) if self.native else False
 
-    def build_prompt(self, base_prompt: str, functions: List[LLMFunction], messages: List[LLMMessage]) -> List[LLMMessage]:
-        """Build prompt with model-specific instructions."""
+    def build_prompt(
+        self,
+        base_prompt: str,
+        functions: List[LLMFunction],
+        messages: List[LLMMessage],
+        state_prompt: str = ""
+    ) -> List[LLMMessage]:
+        """Build prompt with model-specific instructions (stable part first, see BaseLLMProvider.build_prompt)."""
         model_lower = self.model.lower()
 
         # For hermes: strip parameters to reduce noise — response is top-level, not a parameter
-        if 'hermes' in model_lower:
-            functions_json = [
-                {"name": f.name, "description": f.description}
-                for f in functions
-            ]
-        else:
-            functions_json = [
-                {
-                    "name": f.name,
-                    "description": f.description,
-                    "parameters": f.parameters or {}
-                }
-                for f in functions
-            ]
-
-        if 'qwen' in model_lower:
+        catalog = function_catalog(functions, include_parameters='hermes' not in model_lower)
+
+        if self.uses_response_schema:
+            # The schema enforces the format (and the "function" key, also for hermes)
+            instructions = self._schema_response_instructions()
+        elif 'qwen' in model_lower:
             instructions = self._qwen_instructions()
         elif 'llama' in model_lower:
             instructions = self._llama_instructions()
@@ -57,12 +77,13 @@ class OllamaProvider(BaseLLMProvider):
 
 WICHTIG: Du kommunizierst mit einer Maschine. Antworte IMMER im JSON-Format!
 
-VERFÜGBARE FUNKTIONEN:
-{json.dumps(functions_json, ensure_ascii=False, indent=2)}
-
 {instructions}
 
 HINWEIS FÜR KONTEXT: Du kannst alle Informationen aus deinem Kontext (Raumbeschreibung, Schilder, Objekte, etc.) frei mit dem Spieler teilen, wenn er danach fragt. Nutze dafür 'keine_aktion' als Funktion und beantworte die Frage direkt im 'response' Feld.
+
+{state_prompt}
+VERFÜGBARE FUNKTIONEN:
+{catalog}
 """
         return [LLMMessage(role="system", content=system_prompt), *messages]
 
@@ -131,7 +152,7 @@ WICHTIG:
 
     def parse_response(self, llm_response: str) -> LLMFunctionCall:
         """Override to handle hermes 'name' key instead of 'function'."""
-        if 'hermes' in self.model.lower():
+        if 'hermes' in self.model.lower() and not self.uses_response_schema:
             return self._parse_hermes_response(llm_response)
         return self._parse_function_call(llm_response)
 
@@ -152,7 +173,15 @@ WICHTIG:
             arguments={"response": llm_response.strip()}
         )
 
-    def call_chat(self, messages: List[LLMMessage], functions: Optional[List[LLMFunction]] = None) -> LLMResponse:
+    def _schema(self, functions: Optional[List[LLMFunction]]) -> Optional[Dict[str, Any]]:
+        """Answer schema for the native API (None without functions or structured_output)."""
+        return self.response_schema(functions) if functions and self.uses_response_schema else None
+
+    def call_chat(self, messages: List[LLMMessage], functions: Optional[List[LLMFunction]] = None, timeout: Optional[float] = None) -> LLMResponse:
+        if self.native:
+            return self.native.chat(
+                self.model, messages, {"temperature": self.temperature}, self.max_tokens, schema=self._schema(functions), timeout=timeout
+            )
         formatted_messages = [
             {"role": msg.role, "content": msg.content}
             for msg in messages
@@ -162,22 +191,125 @@ WICHTIG:
                 model=self.model,
                 messages=formatted_messages,
                 temperature=self.temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self.max_tokens,
+                **self._response_format(functions),
+                **self._request_timeout(timeout)
             )
             content = response.choices[0].message.content or ""
-            usage = None
-            if hasattr(response, 'usage') and response.usage:
-                usage = {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens
-                }
+            usage = openai_usage(getattr(response, 'usage', None))
             return LLMResponse(
                 content=content,
                 model=response.model,
                 usage=usage,
                 finish_reason=response.choices[0].finish_reason
             )
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"Ollama API error: {str(e)}")
+
+    def call_chat_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Callable[[str], None],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """
+        Stream a response from Ollama, forwarding text deltas to on_delta.
+
+        Returns:
+            The complete LLMResponse once the stream has finished
+        """
+        if self.native:
+            return self.native.chat(
+                self.model, messages, {"temperature": self.temperature}, self.max_tokens,
+                on_delta=on_delta, schema=self._schema(functions), timeout=timeout
+            )
+        formatted_messages = [
+            {"role": msg.role, "content": msg.content}
+            for msg in messages
+        ]
+
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=formatted_messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                **self._response_format(functions),
+                stream=True,
+                stream_options={"include_usage": True},
+                **self._request_timeout(timeout)
+            )
+            return consume_openai_stream(stream, on_delta, self.model)
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"Ollama API error: {str(e)}")
+
+    async def acall_chat(self, messages: List[LLMMessage], functions: Optional[List[LLMFunction]] = None, timeout: Optional[float] = None) -> LLMResponse:
+        """Async variant of call_chat (AsyncOpenAI client or the native API)."""
+        if self.native:
+            return await self.native.achat(
+                self.model, messages, {"temperature": self.temperature}, self.max_tokens, schema=self._schema(functions), timeout=timeout
+            )
+        formatted_messages = [
+            {"role": msg.role, "content": msg.content}
+            for msg in messages
+        ]
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=formatted_messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                **self._response_format(functions),
+                **self._request_timeout(timeout)
+            )
+            return LLMResponse(
+                content=response.choices[0].message.content or "",
+                model=response.model,
+                usage=openai_usage(getattr(response, 'usage', None)),
+                finish_reason=response.choices[0].finish_reason
+            )
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            raise Exception(f"Ollama API error: {str(e)}")
+
+    async def acall_chat_stream(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]],
+        on_delta: Callable[[str], None],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """Async variant of call_chat_stream (AsyncOpenAI client or the native API)."""
+        if self.native:
+            return await self.native.achat(
+                self.model, messages, {"temperature": self.temperature}, self.max_tokens,
+                on_delta=on_delta, schema=self._schema(functions), timeout=timeout
+            )
+        formatted_messages = [
+            {"role": msg.role, "content": msg.content}
+            for msg in messages
+        ]
+
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=formatted_messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                **self._response_format(functions),
+                stream=True,
+                stream_options={"include_usage": True},
+                **self._request_timeout(timeout)
+            )
+            return await aconsume_openai_stream(stream, on_delta, self.model)
+        except OperationCancelledError:
+            raise
         except Exception as e:
             raise Exception(f"Ollama API error: {str(e)}")
 
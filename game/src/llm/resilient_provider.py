@@ -0,0 +1,748 @@
+"""
+Resilient provider wrapper: per-turn deadline, jittered retries, circuit
+breakers per backend, failover and optional hedging to a backup provider.
+"""
+from __future__ import annotations
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from cancellation import CancellationToken, OperationCancelledError
+from metrics import metrics
+from .base_provider import BaseLLMProvider, LLMFunction, LLMMessage, LLMResponse
+from .scheduler import LLMQueueFullError, Priority, scheduler
+
+if TYPE_CHECKING:
+    from .llm_factory import LLMFactory
+
+# One backend call: (provider, cancel token of the attempt, narrative callback or None)
+BackendCall = Callable[[BaseLLMProvider, CancellationToken, Optional[Callable[[str], None]]], LLMResponse]
+AsyncBackendCall = Callable[[BaseLLMProvider, CancellationToken, Optional[Callable[[str], None]]], Awaitable[LLMResponse]]
+
+
+class LLMUnavailableError(Exception):
+    """Raised when no backend answered within the deadline (all failed, timed out, circuits open or the narrating backend failed)."""
+
+
+class _BackendFailure(Exception):
+    """A backend call of an attempt failed (raised by _attempt, handled by _run)."""
+
+    def __init__(self, provider: BaseLLMProvider, error: Exception, narrated: bool = False) -> None:
+        """
+        Args:
+            provider: Backend whose call failed
+            error: The backend's error
+            narrated: True if the backend had already streamed narrative text
+        """
+        super().__init__(str(error))
+        self.provider: BaseLLMProvider = provider
+        self.error: Exception = error
+        self.narrated: bool = narrated
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one backend.
+
+    closed: requests pass. After failure_threshold consecutive failures the
+    circuit opens and requests are skipped for reset_seconds; then a single
+    trial request is let through (half-open). Its success closes the
+    circuit, its failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0) -> None:
+        """
+        Args:
+            name: Backend name (metrics label)
+            failure_threshold: Consecutive failures that open the circuit
+            reset_seconds: Time until a trial request is allowed
+        """
+        self.name: str = name
+        self.failure_threshold: int = failure_threshold
+        self.reset_seconds: float = reset_seconds
+        self._failures: int = 0
+        self._opened_at: Optional[float] = None
+        self._trial_at: Optional[float] = None  # Trial request in flight (expires after reset_seconds)
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """"closed", "open" or "half_open"."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.reset_seconds else "open"
+
+    def available(self) -> bool:
+        """True if allow() would let a request through (without claiming the trial slot)."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now: float = time.monotonic()
+            return now - self._opened_at >= self.reset_seconds and not self._trial_pending(now)
+
+    def allow(self) -> bool:
+        """True if a request may be sent to the backend (claims the trial slot when half-open)."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now: float = time.monotonic()
+            if now - self._opened_at < self.reset_seconds or self._trial_pending(now):
+                return False
+            self._trial_at = now
+            return True
+
+    def _trial_pending(self, now: float) -> bool:
+        """True while a trial request is in flight (caller holds the lock)."""
+        return self._trial_at is not None and now - self._trial_at < self.reset_seconds
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_at = None
+        metrics.gauge("llm_circuit_open").set(0, backend=self.name)
+
+    def record_failure(self) -> None:
+        """Count a failure; open the circuit at the threshold or after a failed trial."""
+        with self._lock:
+            self._failures += 1
+            trial: bool = self._trial_at is not None
+            if trial or self._failures >= self.failure_threshold:
+                if self._opened_at is None or trial:
+                    print(f"[RESILIENCE] Circuit of {self.name} opened after {self._failures} failures")
+                    metrics.counter("llm_circuit_opened_total").inc(backend=self.name)
+                self._opened_at = time.monotonic()
+            self._trial_at = None
+        if self._opened_at is not None:
+            metrics.gauge("llm_circuit_open").set(1, backend=self.name)
+
+
+class ResilientProvider(BaseLLMProvider):
+    """
+    Wraps a primary provider and an optional backup provider.
+
+    Every turn has a deadline. Failed calls are retried with jittered
+    exponential backoff, switching to the backup after a failure (failover).
+    Backends whose circuit is open are skipped. With hedging, a second
+    request goes to the backup when the primary has not answered within
+    its p95 latency; the first backend to answer wins (when streaming: the
+    first to deliver narrative text) and the other call is cancelled.
+    Once a backend has streamed narrative text, its failure ends the call
+    without retry (another answer can't continue the spoken text; the
+    caller falls back as for any LLMUnavailableError).
+    The async API (achat_with_functions, ...) runs the same logic on the
+    event loop with tasks instead of worker threads.
+
+    Every backend request gets the time left until the deadline as its
+    timeout, so a stalled backend frees its worker thread by then.
+    """
+
+    # Worker threads of the sync API, shared by all instances (grown by _size_executor)
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_workers: int = 0
+    _executor_lock: threading.Lock = threading.Lock()
+
+    def __init__(
+        self,
+        primary: BaseLLMProvider,
+        backup: Optional[BaseLLMProvider] = None,
+        config: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Args:
+            primary: Provider used by default
+            backup: Provider for failover and hedging (optional)
+            config: llm.resilience section of config.yaml
+        """
+        config = config or {}
+        self.primary: BaseLLMProvider = primary
+        self.backup: Optional[BaseLLMProvider] = backup
+        self.deadline_seconds: float = float(config.get('deadline_seconds', 30.0))
+        self.retries: int = int(config.get('retries', 2))
+        self.backoff_seconds: float = float(config.get('backoff_seconds', 0.5))
+        breaker: Dict[str, Any] = config.get('circuit_breaker', {})
+        hedge: Dict[str, Any] = config.get('hedge', {})
+        self.hedge: bool = bool(hedge.get('enabled', False)) and backup is not None
+        self.hedge_percentile: float = float(hedge.get('percentile', 95))
+        self.hedge_initial_delay: float = float(hedge.get('initial_delay_seconds', 2.0))
+        self.hedge_min_delay: float = float(hedge.get('min_delay_seconds', 0.2))
+        self.breakers: Dict[int, CircuitBreaker] = {
+            id(provider): CircuitBreaker(
+                self.backend_name(provider),
+                failure_threshold=int(breaker.get('failures', 5)),
+                reset_seconds=float(breaker.get('reset_seconds', 30.0))
+            )
+            for provider in self.backends
+        }
+        super().__init__(api_key="resilient", model=primary.model,
+                         temperature=primary.temperature, max_tokens=primary.max_tokens)
+        self.debug_mode = primary.debug_mode
+        # One worker per backend request the scheduler can admit or queue (llm.resilience.workers overrides)
+        names: Set[str] = {provider.provider_name for provider in self.backends}
+        self._size_executor(int(config.get('workers', 0)) or sum(scheduler.capacity(name) for name in names))
+
+    @classmethod
+    def _size_executor(cls, workers: int) -> None:
+        """Grow the shared worker pool to at least `workers` threads (calls on the old pool finish there)."""
+        with cls._executor_lock:
+            if cls._executor is not None and cls._executor_workers >= workers:
+                return
+            previous: Optional[ThreadPoolExecutor] = cls._executor
+            cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-resilient")
+            cls._executor_workers = workers
+        if previous is not None:
+            previous.shutdown(wait=False)
+
+    @classmethod
+    def from_config(cls, factory: LLMFactory, primary: BaseLLMProvider, config: Dict[str, Any]) -> ResilientProvider:
+        """
+        Wrap a provider according to the llm.resilience section of config.yaml.
+
+        Args:
+            factory: Factory creating the backup provider (llm.resilience.backup)
+            primary: Configured provider
+            config: Resilience configuration dict
+        """
+        backup_config: Dict[str, Any] = config.get('backup') or {}
+        backup: Optional[BaseLLMProvider] = None
+        if backup_config.get('provider'):
+            backup = factory.create_provider(backup_config['provider'], backup_config.get('model'), overrides=backup_config)
+        return cls(primary, backup, config)
+
+    @property
+    def backends(self) -> List[BaseLLMProvider]:
+        """Primary first, then the backup (if any)."""
+        return [self.primary] + ([self.backup] if self.backup else [])
+
+    @property
+    def provider_name(self) -> str:
+        """Name of the primary provider (the wrapper is transparent for keys and metrics)."""
+        return self.primary.provider_name
+
+    @staticmethod
+    def backend_name(provider: BaseLLMProvider) -> str:
+        """Metrics label of a backend (provider:model)."""
+        return f"{provider.provider_name}:{provider.model}"
+
+    def warmup(self) -> bool:
+        """Warm up all backends."""
+        warmed: List[bool] = [provider.warmup() for provider in self.backends]
+        return any(warmed)
+
+    def build_prompt(
+        self,
+        base_prompt: str,
+        functions: List[LLMFunction],
+        messages: List[LLMMessage],
+        state_prompt: str = ""
+    ) -> List[LLMMessage]:
+        """Prompt of the primary provider (each backend builds its own prompt when called)."""
+        return self.primary.build_prompt(base_prompt, functions, messages, state_prompt)
+
+    def call_chat(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]] = None,
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """Raw call with deadline, retries and failover (timeout caps the deadline)."""
+        return self._run(
+            lambda provider, token, on_narrative: provider.call_chat(messages, functions, timeout=token.remaining()),
+            None, None, timeout
+        )
+
+    async def acall_chat(
+        self,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]] = None,
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """Async variant of call_chat."""
+        return await self._arun(
+            lambda provider, token, on_narrative: provider.acall_chat(messages, functions, timeout=token.remaining()),
+            None, None, timeout
+        )
+
+    def chat(
+        self,
+        messages: List[LLMMessage],
+        priority: Optional[Priority] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """Plain chat with deadline, retries and failover."""
+        return self._run(
+            lambda provider, token, narrative: provider.chat(
+                messages, priority=priority, on_narrative=narrative, cancel_token=token
+            ),
+            on_narrative, cancel_token
+        )
+
+    async def achat(
+        self,
+        messages: List[LLMMessage],
+        priority: Optional[Priority] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """Async variant of chat()."""
+        return await self._arun(
+            lambda provider, token, narrative: provider.achat(
+                messages, priority=priority, on_narrative=narrative, cancel_token=token
+            ),
+            on_narrative, cancel_token
+        )
+
+    def chat_with_functions(
+        self,
+        messages: List[LLMMessage],
+        functions: List[LLMFunction],
+        base_prompt: Optional[str] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        priority: Optional[Priority] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        state_prompt: str = ""
+    ) -> LLMResponse:
+        """
+        Function calling turn with deadline, retries, failover and hedging.
+        Arguments as in BaseLLMProvider.chat_with_functions.
+
+        Raises:
+            LLMUnavailableError: If no backend answered within the deadline
+            OperationCancelledError: If cancel_token was cancelled
+        """
+        def call(provider: BaseLLMProvider, token: CancellationToken, narrative: Optional[Callable[[str], None]]) -> LLMResponse:
+            return provider.chat_with_functions(
+                messages, functions, base_prompt, on_narrative=narrative,
+                priority=priority, cancel_token=token, state_prompt=state_prompt
+            )
+        return self._run(call, on_narrative, cancel_token)
+
+    async def achat_with_functions(
+        self,
+        messages: List[LLMMessage],
+        functions: List[LLMFunction],
+        base_prompt: Optional[str] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        priority: Optional[Priority] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        state_prompt: str = ""
+    ) -> LLMResponse:
+        """
+        Async variant of chat_with_functions.
+
+        Raises:
+            LLMUnavailableError: If no backend answered within the deadline
+            OperationCancelledError: If cancel_token was cancelled
+        """
+        def call(provider: BaseLLMProvider, token: CancellationToken, narrative: Optional[Callable[[str], None]]) -> Awaitable[LLMResponse]:
+            return provider.achat_with_functions(
+                messages, functions, base_prompt, on_narrative=narrative,
+                priority=priority, cancel_token=token, state_prompt=state_prompt
+            )
+        return await self._arun(call, on_narrative, cancel_token)
+
+    def _run(
+        self,
+        call: BackendCall,
+        on_narrative: Optional[Callable[[str], None]],
+        cancel_token: Optional[CancellationToken],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """Run a call with deadline, retries, failover and hedging."""
+        started: float = time.monotonic()
+        deadline: float = started + min(self.deadline_seconds, timeout or self.deadline_seconds)
+        failed: Set[int] = set()
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.retries + 1):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            selected: Optional[Tuple[BaseLLMProvider, Optional[BaseLLMProvider]]] = self._select(failed)
+            if selected is None:
+                last_error = last_error or LLMUnavailableError("all circuits open")
+                break
+            first, hedge = selected
+
+            try:
+                response: LLMResponse = self._attempt(first, hedge, call, on_narrative, cancel_token, deadline)
+                self._record_latency(started)
+                return response
+            except OperationCancelledError:
+                raise
+            except _BackendFailure as e:
+                if isinstance(e.error, LLMQueueFullError):
+                    # Overload without an alternative is reported as such (HTTP 429)
+                    if len(self.backends) == 1:
+                        raise e.error
+                    failed.add(id(e.provider))
+                    continue
+                last_error = e.error
+                if e.narrated:
+                    # Part of the narrative was already spoken - another answer can't continue it
+                    print(f"[RESILIENCE] {self.backend_name(e.provider)} failed while narrating: {e.error}")
+                    break
+                self._record_retry(e.provider, attempt, e.error, failed)
+            except LLMUnavailableError as e:
+                # Deadline exceeded - no time left for another attempt
+                last_error = e
+                break
+            except Exception as e:
+                last_error = e
+                self._record_retry(first, attempt, e, failed)
+
+            pause: Optional[float] = self._backoff(attempt, deadline)
+            if pause is None:
+                break
+            if cancel_token is not None:
+                if cancel_token.wait(pause):
+                    cancel_token.raise_if_cancelled()
+            else:
+                time.sleep(pause)
+
+        metrics.counter("llm_unavailable_total").inc()
+        raise LLMUnavailableError(f"No LLM backend answered: {last_error}")
+
+    async def _arun(
+        self,
+        call: AsyncBackendCall,
+        on_narrative: Optional[Callable[[str], None]],
+        cancel_token: Optional[CancellationToken],
+        timeout: Optional[float] = None
+    ) -> LLMResponse:
+        """Async variant of _run."""
+        started: float = time.monotonic()
+        deadline: float = started + min(self.deadline_seconds, timeout or self.deadline_seconds)
+        failed: Set[int] = set()
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.retries + 1):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            selected: Optional[Tuple[BaseLLMProvider, Optional[BaseLLMProvider]]] = self._select(failed)
+            if selected is None:
+                last_error = last_error or LLMUnavailableError("all circuits open")
+                break
+            first, hedge = selected
+
+            try:
+                response: LLMResponse = await self._aattempt(first, hedge, call, on_narrative, cancel_token, deadline)
+                self._record_latency(started)
+                return response
+            except OperationCancelledError:
+                raise
+            except _BackendFailure as e:
+                if isinstance(e.error, LLMQueueFullError):
+                    if len(self.backends) == 1:
+                        raise e.error
+                    failed.add(id(e.provider))
+                    continue
+                last_error = e.error
+                if e.narrated:
+                    print(f"[RESILIENCE] {self.backend_name(e.provider)} failed while narrating: {e.error}")
+                    break
+                self._record_retry(e.provider, attempt, e.error, failed)
+            except LLMUnavailableError as e:
+                last_error = e
+                break
+            except Exception as e:
+                last_error = e
+                self._record_retry(first, attempt, e, failed)
+
+            pause: Optional[float] = self._backoff(attempt, deadline)
+            if pause is None:
+                break
+            await asyncio.sleep(pause)
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+
+        metrics.counter("llm_unavailable_total").inc()
+        raise LLMUnavailableError(f"No LLM backend answered: {last_error}")
+
+    def _select(self, failed: Set[int]) -> Optional[Tuple[BaseLLMProvider, Optional[BaseLLMProvider]]]:
+        """
+        Backend for the next attempt and the hedge backend (if hedging).
+        Backends that did not fail in this turn come first (failover), open circuits are skipped.
+
+        Returns:
+            (first backend, hedge backend or None), or None if no circuit lets a request through
+        """
+        candidates: List[BaseLLMProvider] = sorted(
+            (p for p in self.backends if self.breakers[id(p)].available()),
+            key=lambda p: id(p) in failed
+        )
+        if not candidates or not self.breakers[id(candidates[0])].allow():
+            return None
+        return candidates[0], candidates[1] if self.hedge and len(candidates) > 1 else None
+
+    def _backoff(self, attempt: int, deadline: float) -> Optional[float]:
+        """Jittered exponential backoff before the next attempt, or None if it would pass the deadline."""
+        pause: float = self.backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+        return None if time.monotonic() + pause >= deadline else pause
+
+    def _record_retry(self, provider: BaseLLMProvider, attempt: int, error: Exception, failed: Set[int]) -> None:
+        """Mark a backend as failed in this turn and count the retry."""
+        failed.add(id(provider))
+        metrics.counter("llm_retries_total").inc(backend=self.backend_name(provider))
+        print(f"[RESILIENCE] {self.backend_name(provider)} failed (attempt {attempt + 1}): {error}")
+
+    def _record_latency(self, started: float) -> None:
+        """Record the latency of a turn including retries and hedging."""
+        metrics.histogram("llm_resilient_latency_seconds").observe(
+            time.monotonic() - started, hedging="on" if self.hedge else "off"
+        )
+
+    def _attempt(
+        self,
+        first: BaseLLMProvider,
+        hedge: Optional[BaseLLMProvider],
+        call: BackendCall,
+        on_narrative: Optional[Callable[[str], None]],
+        cancel_token: Optional[CancellationToken],
+        deadline: float
+    ) -> LLMResponse:
+        """
+        One attempt: call the first backend, hedge to the second after the
+        p95-derived delay, return the first answer before the deadline.
+
+        Raises:
+            _BackendFailure: If the calls failed (the last failure), or the backend
+                             that was streaming the narrative failed
+            LLMUnavailableError: If the deadline passed
+        """
+        owner: List[Optional[int]] = [None]
+        owner_lock: threading.Lock = threading.Lock()
+        failures: List[_BackendFailure] = []
+        tokens: Dict[int, CancellationToken] = {}
+        futures: Dict[Future, BaseLLMProvider] = {}
+        unwatch: List[Callable[[], None]] = []
+
+        def launch(provider: BaseLLMProvider) -> None:
+            token: CancellationToken = self._attempt_token(provider, tokens, cancel_token, unwatch, deadline)
+            narrative: Optional[Callable[[str], None]] = self._race_narrative(provider, owner, owner_lock, on_narrative)
+
+            def run() -> LLMResponse:
+                with metrics.histogram("llm_call_seconds").time(backend=self.backend_name(provider)):
+                    return call(provider, token, narrative)
+
+            futures[self._executor.submit(run)] = provider
+
+        launch(first)
+        pending: Set[Future] = set(futures)
+        hedge_at: Optional[float] = time.monotonic() + self._hedge_delay(first) if hedge is not None else None
+        try:
+            while pending:
+                timeout: float = self._wait_timeout(first, futures.values(), deadline, hedge_at)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    response: Optional[LLMResponse] = self._outcome(
+                        future, futures[future], first, cancel_token, owner, failures, last=not pending and hedge_at is None
+                    )
+                    if response is not None:
+                        return response
+
+                if hedge_at is not None and (time.monotonic() >= hedge_at or not pending):
+                    # Primary is slow (or already failed): fire the hedge request
+                    hedge_at = None
+                    if self._start_hedge(hedge):
+                        launch(hedge)
+                        pending = {f for f in futures if not f.done()}
+            # Every call failed (or the hedge was not allowed) before the deadline
+            raise failures[-1] if failures else LLMUnavailableError("no backend answered")
+        finally:
+            for token in tokens.values():
+                token.cancel("superseded")
+            for remove in unwatch:
+                remove()
+
+    async def _aattempt(
+        self,
+        first: BaseLLMProvider,
+        hedge: Optional[BaseLLMProvider],
+        call: AsyncBackendCall,
+        on_narrative: Optional[Callable[[str], None]],
+        cancel_token: Optional[CancellationToken],
+        deadline: float
+    ) -> LLMResponse:
+        """Async variant of _attempt (backend calls run as tasks; the losers are cancelled)."""
+        owner: List[Optional[int]] = [None]
+        owner_lock: threading.Lock = threading.Lock()
+        failures: List[_BackendFailure] = []
+        tokens: Dict[int, CancellationToken] = {}
+        tasks: Dict[asyncio.Task, BaseLLMProvider] = {}
+        unwatch: List[Callable[[], None]] = []
+
+        def launch(provider: BaseLLMProvider) -> None:
+            token: CancellationToken = self._attempt_token(provider, tokens, cancel_token, unwatch, deadline)
+            narrative: Optional[Callable[[str], None]] = self._race_narrative(provider, owner, owner_lock, on_narrative)
+
+            async def run() -> LLMResponse:
+                with metrics.histogram("llm_call_seconds").time(backend=self.backend_name(provider)):
+                    return await call(provider, token, narrative)
+
+            tasks[asyncio.ensure_future(run())] = provider
+
+        launch(first)
+        pending: Set[asyncio.Task] = set(tasks)
+        hedge_at: Optional[float] = time.monotonic() + self._hedge_delay(first) if hedge is not None else None
+        try:
+            while pending:
+                timeout: float = self._wait_timeout(first, tasks.values(), deadline, hedge_at)
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    response: Optional[LLMResponse] = self._outcome(
+                        task, tasks[task], first, cancel_token, owner, failures, last=not pending and hedge_at is None
+                    )
+                    if response is not None:
+                        return response
+
+                if hedge_at is not None and (time.monotonic() >= hedge_at or not pending):
+                    hedge_at = None
+                    if self._start_hedge(hedge):
+                        launch(hedge)
+                        pending = {t for t in tasks if not t.done()}
+            # Every call failed (or the hedge was not allowed) before the deadline
+            raise failures[-1] if failures else LLMUnavailableError("no backend answered")
+        finally:
+            for token in tokens.values():
+                token.cancel("superseded")
+            for task in tasks:
+                task.cancel()
+            for remove in unwatch:
+                remove()
+
+    @staticmethod
+    def _attempt_token(
+        provider: BaseLLMProvider,
+        tokens: Dict[int, CancellationToken],
+        cancel_token: Optional[CancellationToken],
+        unwatch: List[Callable[[], None]],
+        deadline: float
+    ) -> CancellationToken:
+        """
+        Cancellation token of one backend call, cancelled together with the caller's token.
+        Its deadline becomes the timeout of the backend's request.
+        """
+        token: CancellationToken = CancellationToken(deadline=deadline)
+        tokens[id(provider)] = token
+        if cancel_token is not None:
+            unwatch.append(cancel_token.add_callback(lambda: token.cancel(cancel_token.reason or "cancelled")))
+        return token
+
+    @staticmethod
+    def _race_narrative(
+        provider: BaseLLMProvider,
+        owner: List[Optional[int]],
+        owner_lock: threading.Lock,
+        on_narrative: Optional[Callable[[str], None]]
+    ) -> Optional[Callable[[str], None]]:
+        """Narrative callback of one backend call: the first backend to stream owns the speech."""
+        if on_narrative is None:
+            return None
+
+        def narrative(delta: str) -> None:
+            # The other backend is stopped at its next delta
+            with owner_lock:
+                if owner[0] is None:
+                    owner[0] = id(provider)
+            if owner[0] != id(provider):
+                raise OperationCancelledError("hedge lost")
+            on_narrative(delta)
+        return narrative
+
+    def _wait_timeout(
+        self,
+        first: BaseLLMProvider,
+        running: Any,
+        deadline: float,
+        hedge_at: Optional[float]
+    ) -> float:
+        """
+        Time to wait for the next answer (until the hedge or the deadline).
+
+        Raises:
+            LLMUnavailableError: If the deadline has passed (the running backends count as failed)
+        """
+        now: float = time.monotonic()
+        if now >= deadline:
+            metrics.counter("llm_deadline_exceeded_total").inc(backend=self.backend_name(first))
+            for provider in running:
+                self.breakers[id(provider)].record_failure()
+            raise LLMUnavailableError(f"deadline of {self.deadline_seconds:.1f}s exceeded")
+        return deadline - now if hedge_at is None else max(0.0, min(deadline, hedge_at) - now)
+
+    def _outcome(
+        self,
+        done: Any,
+        provider: BaseLLMProvider,
+        first: BaseLLMProvider,
+        cancel_token: Optional[CancellationToken],
+        owner: List[Optional[int]],
+        failures: List[_BackendFailure],
+        last: bool
+    ) -> Optional[LLMResponse]:
+        """
+        Result of a finished backend call (Future or Task).
+
+        Args:
+            done: Finished future/task
+            provider: Backend of the call
+            first: Backend the attempt started with (other winners are hedge wins)
+            cancel_token: Caller's token
+            owner: Backend streaming the narrative (see _race_narrative)
+            failures: Failed calls of the attempt (appended to)
+            last: True if no other call is running or will be started
+
+        Returns:
+            The response, or None if the call failed and another one may still answer
+
+        Raises:
+            _BackendFailure: If this was the last call, or the backend streaming the
+                             narrative failed (another backend can't continue it)
+        """
+        try:
+            response: LLMResponse = done.result()
+        except OperationCancelledError:
+            if cancel_token is not None and cancel_token.cancelled:
+                raise
+            return None  # Lost the hedge race
+        except Exception as e:
+            if not isinstance(e, LLMQueueFullError):
+                self.breakers[id(provider)].record_failure()
+            failure: _BackendFailure = _BackendFailure(provider, e, narrated=owner[0] == id(provider))
+            failures.append(failure)
+            if last or failure.narrated:
+                raise failure
+            print(f"[RESILIENCE] {self.backend_name(provider)} failed: {e}")
+            return None
+        self.breakers[id(provider)].record_success()
+        if provider is not first:
+            metrics.counter("llm_hedge_wins_total").inc(backend=self.backend_name(provider))
+        return response
+
+    def _start_hedge(self, hedge: BaseLLMProvider) -> bool:
+        """True if the hedge request may be sent (counts it)."""
+        if not self.breakers[id(hedge)].allow():
+            return False
+        metrics.counter("llm_hedges_total").inc(backend=self.backend_name(hedge))
+        return True
+
+    def _hedge_delay(self, provider: BaseLLMProvider) -> float:
+        """Delay before hedging: the configured percentile of the backend's call latency."""
+        latency: Optional[float] = metrics.histogram("llm_call_seconds").percentile(
+            self.hedge_percentile, backend=self.backend_name(provider)
+        )
+        if latency is None:
+            return self.hedge_initial_delay
+        return max(self.hedge_min_delay, latency)
+
+    def _validate_config(self) -> None:
+        """Backends are validated by their own providers."""
+        pass
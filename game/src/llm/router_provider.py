@@ -0,0 +1,259 @@
+"""
+Routing provider: a small, fast model answers by default, a larger model
+takes over when the fast answer is unusable or the turn looks hard.
+"""
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from cancellation import CancellationToken
+from function_index import NO_ACTION, FunctionShortlist
+from metrics import metrics
+from .base_provider import BaseLLMProvider, LLMFunction, LLMMessage, LLMResponse
+from .scheduler import Priority
+
+if TYPE_CHECKING:
+    from .llm_factory import LLMFactory
+
+
+class RouterProvider(BaseLLMProvider):
+    """
+    Cascades between two providers ("fast" and "strong" route).
+
+    Before the call the turn goes straight to the strong route if the input
+    is long or ambiguous (two actions about equally relevant). After the
+    fast call it is escalated if the answer could not be parsed, names an
+    unknown function, or is keine_aktion although the input clearly refers
+    to an available action (low confidence).
+
+    The fast route does not stream its narrative: an escalated answer would
+    otherwise already be half spoken. The controller speaks the final text.
+    """
+
+    ROUTES: Tuple[str, str] = ("fast", "strong")
+
+    def __init__(self, fast: BaseLLMProvider, strong: BaseLLMProvider, rules: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Args:
+            fast: Provider answering by default (e.g. a local Ollama/Gemma model)
+            strong: Provider used for escalated turns
+            rules: Escalation rules and prices (llm.router section of config.yaml)
+        """
+        self.routes: Dict[str, BaseLLMProvider] = {"fast": fast, "strong": strong}
+        rules = rules or {}
+        self.max_input_words: int = int(rules.get('max_input_words', 25))
+        self.ambiguous_margin: float = float(rules.get('ambiguous_margin', 0.1))
+        self.no_action_min_score: float = float(rules.get('no_action_min_score', 2.0))
+        self.escalate_parse_failure: bool = bool(rules.get('parse_failure', True))
+        self.escalate_unknown_function: bool = bool(rules.get('unknown_function', True))
+        # Price per 1M tokens per route: {"fast": {"input": 0, "output": 0}, "strong": {...}}
+        self.prices: Dict[str, Dict[str, float]] = rules.get('cost_per_million_tokens', {})
+        self._relevance: FunctionShortlist = FunctionShortlist()
+        self._turns: int = 0
+        self._escalations: int = 0
+        super().__init__(api_key="router", model=f"{fast.model}>{strong.model}",
+                         temperature=fast.temperature, max_tokens=fast.max_tokens)
+
+    @classmethod
+    def from_config(cls, factory: LLMFactory, config: Dict[str, Any]) -> RouterProvider:
+        """
+        Create the router and its route providers from the llm.router section of config.yaml.
+
+        Args:
+            factory: Factory creating the route providers
+            config: Router configuration dict ("fast" and "strong" hold the
+                    provider settings of each route, e.g. provider, model, api_key)
+
+        Raises:
+            ValueError: If a route is missing or names no provider
+        """
+        routes: Dict[str, BaseLLMProvider] = {}
+        for name in cls.ROUTES:
+            route: Dict[str, Any] = config.get(name) or {}
+            if not route.get('provider') or route.get('provider') == "router":
+                raise ValueError(f"Router requires llm.router.{name}.provider (not 'router')")
+            routes[name] = factory.create_provider(route['provider'], route.get('model'), overrides=route)
+        return cls(routes["fast"], routes["strong"], config)
+
+    def warmup(self) -> bool:
+        """Warm up both routes."""
+        warmed: List[bool] = [provider.warmup() for provider in self.routes.values()]
+        return any(warmed)
+
+    def build_prompt(
+        self,
+        base_prompt: str,
+        functions: List[LLMFunction],
+        messages: List[LLMMessage],
+        state_prompt: str = ""
+    ) -> List[LLMMessage]:
+        """Prompt of the fast route (each route builds its own prompt when called)."""
+        return self.routes["fast"].build_prompt(base_prompt, functions, messages, state_prompt)
+
+    def call_chat(self, messages: List[LLMMessage], functions: Optional[List[LLMFunction]] = None, timeout: Optional[float] = None) -> LLMResponse:
+        """Raw call on the fast route."""
+        return self.routes["fast"].call_chat(messages, functions, timeout=timeout)
+
+    async def acall_chat(self, messages: List[LLMMessage], functions: Optional[List[LLMFunction]] = None, timeout: Optional[float] = None) -> LLMResponse:
+        """Async raw call on the fast route."""
+        return await self.routes["fast"].acall_chat(messages, functions, timeout=timeout)
+
+    def chat(
+        self,
+        messages: List[LLMMessage],
+        priority: Optional[Priority] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """Plain chat (summaries, narration) always uses the fast route."""
+        return self._call("fast", "default", lambda provider: provider.chat(
+            messages, priority=priority, on_narrative=on_narrative, cancel_token=cancel_token
+        ))
+
+    async def achat(
+        self,
+        messages: List[LLMMessage],
+        priority: Optional[Priority] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """Async variant of chat()."""
+        return await self._acall("fast", "default", lambda provider: provider.achat(
+            messages, priority=priority, on_narrative=on_narrative, cancel_token=cancel_token
+        ))
+
+    def chat_with_functions(
+        self,
+        messages: List[LLMMessage],
+        functions: List[LLMFunction],
+        base_prompt: Optional[str] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        priority: Optional[Priority] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        state_prompt: str = ""
+    ) -> LLMResponse:
+        """
+        Answer a turn on the fast route and escalate to the strong route if needed.
+        Arguments as in BaseLLMProvider.chat_with_functions.
+        """
+        user_input: str = next((m.content for m in reversed(messages) if m.role == "user"), "")
+        ranking: List[Tuple[str, float]] = self._relevance.relevance(functions, user_input)
+
+        def strong(provider: BaseLLMProvider) -> LLMResponse:
+            return provider.chat_with_functions(
+                messages, functions, base_prompt, on_narrative=on_narrative,
+                priority=priority, cancel_token=cancel_token, state_prompt=state_prompt
+            )
+
+        reason: Optional[str] = self._pre_route(user_input, ranking)
+        if reason:
+            return self._finish(self._call("strong", reason, strong), reason)
+
+        response: LLMResponse = self._call("fast", "default", lambda provider: provider.chat_with_functions(
+            messages, functions, base_prompt, priority=priority, cancel_token=cancel_token, state_prompt=state_prompt
+        ))
+        reason = self._escalation_reason(response, functions, ranking)
+        if reason is None:
+            return self._finish(response, None)
+
+        print(f"[ROUTER] Escalating '{user_input[:40]}' to {self.routes['strong'].model} ({reason})")
+        return self._finish(self._call("strong", reason, strong), reason)
+
+    async def achat_with_functions(
+        self,
+        messages: List[LLMMessage],
+        functions: List[LLMFunction],
+        base_prompt: Optional[str] = None,
+        on_narrative: Optional[Callable[[str], None]] = None,
+        priority: Optional[Priority] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        state_prompt: str = ""
+    ) -> LLMResponse:
+        """Async variant of chat_with_functions."""
+        user_input: str = next((m.content for m in reversed(messages) if m.role == "user"), "")
+        ranking: List[Tuple[str, float]] = self._relevance.relevance(functions, user_input)
+
+        def strong(provider: BaseLLMProvider) -> Awaitable[LLMResponse]:
+            return provider.achat_with_functions(
+                messages, functions, base_prompt, on_narrative=on_narrative,
+                priority=priority, cancel_token=cancel_token, state_prompt=state_prompt
+            )
+
+        reason: Optional[str] = self._pre_route(user_input, ranking)
+        if reason:
+            return self._finish(await self._acall("strong", reason, strong), reason)
+
+        response: LLMResponse = await self._acall("fast", "default", lambda provider: provider.achat_with_functions(
+            messages, functions, base_prompt, priority=priority, cancel_token=cancel_token, state_prompt=state_prompt
+        ))
+        reason = self._escalation_reason(response, functions, ranking)
+        if reason is None:
+            return self._finish(response, None)
+
+        print(f"[ROUTER] Escalating '{user_input[:40]}' to {self.routes['strong'].model} ({reason})")
+        return self._finish(await self._acall("strong", reason, strong), reason)
+
+    def _pre_route(self, user_input: str, ranking: List[Tuple[str, float]]) -> Optional[str]:
+        """Reason to send a turn directly to the strong route, or None."""
+        if len(user_input.split()) > self.max_input_words:
+            return "long_input"
+        if self.ambiguous_margin > 0 and len(ranking) > 1:
+            (_, best), (_, second) = ranking[0], ranking[1]
+            if best > 0 and second >= best * (1 - self.ambiguous_margin):
+                return "ambiguous"
+        return None
+
+    def _escalation_reason(
+        self,
+        response: LLMResponse,
+        functions: List[LLMFunction],
+        ranking: List[Tuple[str, float]]
+    ) -> Optional[str]:
+        """Reason to escalate an answer of the fast route, or None to accept it."""
+        call = response.function_call
+        if call is None:
+            return "parse_failure" if self.escalate_parse_failure else None
+        if call.name != NO_ACTION and call.name not in {f.name for f in functions}:
+            return "unknown_function" if self.escalate_unknown_function else None
+        if call.name == NO_ACTION and ranking and ranking[0][1] >= self.no_action_min_score:
+            # The input names an available action, yet the fast model did nothing
+            return "no_action"
+        return None
+
+    def _call(self, route: str, reason: str, call: Callable[[BaseLLMProvider], LLMResponse]) -> LLMResponse:
+        """Call a route and record latency, requests and cost."""
+        with metrics.histogram("router_latency_seconds").time(route=route):
+            response: LLMResponse = call(self.routes[route])
+        self._record(route, reason, response)
+        return response
+
+    async def _acall(self, route: str, reason: str, call: Callable[[BaseLLMProvider], Awaitable[LLMResponse]]) -> LLMResponse:
+        """Async variant of _call."""
+        with metrics.histogram("router_latency_seconds").time(route=route):
+            response: LLMResponse = await call(self.routes[route])
+        self._record(route, reason, response)
+        return response
+
+    def _record(self, route: str, reason: str, response: LLMResponse) -> None:
+        """Count a routed request and its cost."""
+        metrics.counter("router_requests_total").inc(route=route, reason=reason)
+
+        prices: Dict[str, float] = self.prices.get(route, {})
+        if response.usage and prices:
+            cost: float = (
+                response.usage.get("prompt_tokens", 0) * float(prices.get('input', 0.0))
+                + response.usage.get("completion_tokens", 0) * float(prices.get('output', 0.0))
+            ) / 1_000_000
+            metrics.counter("router_cost_total").inc(cost, route=route)
+
+    def _finish(self, response: LLMResponse, escalation: Optional[str]) -> LLMResponse:
+        """Update the escalation rate (share of turns answered by the strong route)."""
+        self._turns += 1
+        if escalation:
+            self._escalations += 1
+            metrics.counter("router_escalations_total").inc(reason=escalation)
+        metrics.gauge("router_escalation_rate").set(self._escalations / self._turns)
+        return response
+
+    def _validate_config(self) -> None:
+        """Routes are validated by their own providers."""
+        pass
@@ -0,0 +1,305 @@
+"""
+Process-wide admission control for outbound LLM calls.
+Limits concurrent requests per provider and queues the rest by priority.
+"""
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from metrics import metrics
+
+
+class Priority(IntEnum):
+    """Request priority (lower value is served first)."""
+    INTERACTIVE = 0  # Player turns
+    EDITOR = 1       # Editor tools (TextImprover)
+    BACKGROUND = 2   # Summaries, cache refills, pre-generation
+
+
+class LLMQueueFullError(Exception):
+    """
+    Raised when an LLM request cannot be admitted (queue full or wait timeout).
+    Servers map this to HTTP 429.
+    """
+
+    def __init__(self, provider: str, reason: str, retry_after: float = 1.0) -> None:
+        super().__init__(f"LLM provider '{provider}' is overloaded ({reason})")
+        self.provider: str = provider
+        self.reason: str = reason
+        self.retry_after: float = retry_after
+
+
+class _Waiter:
+    """A queued request waiting for a free slot (a thread, or a coroutine on loop)."""
+
+    def __init__(self, priority: Priority, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.priority: Priority = priority
+        self.event: threading.Event = threading.Event()
+        self.loop: Optional[asyncio.AbstractEventLoop] = loop
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop is not None else None
+        self.granted: bool = False
+        self.cancelled: bool = False
+        self.evicted: bool = False
+
+    def wake(self) -> None:
+        """Wake the waiting thread or coroutine (callable from any thread)."""
+        self.event.set()
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class _Lane:
+    """Concurrency slots and wait queue for one provider."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit: int = limit
+        self.active: int = 0
+        self.waiting: List[Tuple[int, int, _Waiter]] = []
+
+
+class LLMScheduler:
+    """
+    Admission control for LLM requests.
+
+    Each provider gets its own concurrency limit. Requests beyond the limit
+    wait in a bounded priority queue; when the queue is full (or a request
+    waited longer than max_wait_seconds) the request fails fast with
+    LLMQueueFullError instead of piling up on the provider. A full queue
+    makes room for a higher-priority request by rejecting the
+    lowest-priority waiter. Threads use slot(), coroutines aslot(); both
+    share the same lanes and queue.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue: int = 32,
+        max_wait_seconds: float = 30.0
+    ) -> None:
+        """
+        Args:
+            max_concurrency: Default concurrent requests per provider
+            max_queue: Maximum number of waiting requests per provider
+            max_wait_seconds: Maximum time a request may wait for a slot
+        """
+        self.max_concurrency: int = max_concurrency
+        self.max_queue: int = max_queue
+        self.max_wait_seconds: float = max_wait_seconds
+        self.provider_limits: Dict[str, int] = {}
+        self._lanes: Dict[str, _Lane] = {}
+        self._sequence: Iterator[int] = itertools.count()
+        self._lock: threading.Lock = threading.Lock()
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """
+        Apply settings from the llm.scheduler section of config.yaml.
+
+        Args:
+            config: Scheduler configuration dict
+        """
+        with self._lock:
+            self.max_concurrency = int(config.get('max_concurrency', self.max_concurrency))
+            self.max_queue = int(config.get('max_queue', self.max_queue))
+            self.max_wait_seconds = float(config.get('max_wait_seconds', self.max_wait_seconds))
+            self.provider_limits = {k: int(v) for k, v in (config.get('providers') or {}).items()}
+            for name, lane in self._lanes.items():
+                lane.limit = self.provider_limits.get(name, self.max_concurrency)
+
+    @contextmanager
+    def slot(self, provider: str, priority: Priority = Priority.INTERACTIVE) -> Iterator[None]:
+        """
+        Hold a concurrency slot for the duration of an LLM call.
+
+        Args:
+            provider: Provider name (e.g. "openai", "ollama")
+            priority: Request priority
+
+        Raises:
+            LLMQueueFullError: If the request cannot be admitted
+        """
+        self.acquire(provider, priority)
+        try:
+            yield
+        finally:
+            self.release(provider)
+
+    @asynccontextmanager
+    async def aslot(self, provider: str, priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[None]:
+        """
+        Async variant of slot(): waits for a slot without blocking the event loop.
+
+        Args:
+            provider: Provider name (e.g. "openai", "ollama")
+            priority: Request priority
+
+        Raises:
+            LLMQueueFullError: If the request cannot be admitted
+        """
+        await self.aacquire(provider, priority)
+        try:
+            yield
+        finally:
+            self.release(provider)
+
+    def acquire(self, provider: str, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Wait for a free slot (see slot())."""
+        started: float = time.perf_counter()
+        waiter: Optional[_Waiter] = self._enqueue(provider, priority, None)
+        if waiter is None:
+            return
+        waiter.event.wait(timeout=self.max_wait_seconds)
+        self._settle(provider, priority, waiter, started)
+
+    async def aacquire(self, provider: str, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Wait for a free slot without blocking the event loop (see aslot())."""
+        started: float = time.perf_counter()
+        waiter: Optional[_Waiter] = self._enqueue(provider, priority, asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # Task cancelled while queued: give up the place (or the slot granted meanwhile)
+            with self._lock:
+                waiter.cancelled = True
+                granted: bool = waiter.granted
+                self._remove(self._lane(provider), waiter)
+                self._publish(provider, self._lane(provider))
+            if granted:
+                self.release(provider)
+            raise
+        self._settle(provider, priority, waiter, started)
+
+    def _enqueue(
+        self,
+        provider: str,
+        priority: Priority,
+        loop: Optional[asyncio.AbstractEventLoop]
+    ) -> Optional[_Waiter]:
+        """
+        Take a free slot or queue the request.
+
+        Returns:
+            None if a slot was taken immediately, otherwise the queued waiter
+
+        Raises:
+            LLMQueueFullError: If the queue is full
+        """
+        with self._lock:
+            lane: _Lane = self._lane(provider)
+            if lane.active < lane.limit and not lane.waiting:
+                lane.active += 1
+                self._publish(provider, lane)
+                metrics.histogram("llm_queue_wait_seconds").observe(0.0, provider=provider, priority=priority.name.lower())
+                return None
+
+            if len(lane.waiting) >= self.max_queue and not self._evict_lower(lane, priority):
+                metrics.counter("llm_rejected_total").inc(provider=provider, priority=priority.name.lower(), reason="queue_full")
+                raise LLMQueueFullError(provider, "queue full", retry_after=self.max_wait_seconds / 4)
+
+            waiter: _Waiter = _Waiter(priority, loop)
+            heapq.heappush(lane.waiting, (int(priority), next(self._sequence), waiter))
+            self._publish(provider, lane)
+            return waiter
+
+    def _settle(self, provider: str, priority: Priority, waiter: _Waiter, started: float) -> None:
+        """
+        Finish waiting: keep the granted slot or give up the place in the queue.
+
+        Raises:
+            LLMQueueFullError: If the waiter was evicted or timed out
+        """
+        max_wait: float = self.max_wait_seconds
+        with self._lock:
+            lane: _Lane = self._lane(provider)
+            if waiter.evicted:
+                metrics.counter("llm_rejected_total").inc(provider=provider, priority=priority.name.lower(), reason="evicted")
+                raise LLMQueueFullError(provider, "evicted by higher priority request", retry_after=max_wait / 4)
+            if not waiter.granted:
+                waiter.cancelled = True
+                self._remove(lane, waiter)
+                self._publish(provider, lane)
+                metrics.counter("llm_rejected_total").inc(provider=provider, priority=priority.name.lower(), reason="timeout")
+                raise LLMQueueFullError(provider, "wait timeout", retry_after=max_wait / 4)
+
+        metrics.histogram("llm_queue_wait_seconds").observe(
+            time.perf_counter() - started, provider=provider, priority=priority.name.lower()
+        )
+
+    def release(self, provider: str) -> None:
+        """Free a slot and hand it to the highest-priority waiter."""
+        with self._lock:
+            lane: _Lane = self._lane(provider)
+            lane.active = max(0, lane.active - 1)
+            while lane.waiting and lane.active < lane.limit:
+                _, _, waiter = heapq.heappop(lane.waiting)
+                if waiter.cancelled:
+                    continue
+                waiter.granted = True
+                lane.active += 1
+                waiter.wake()
+            self._publish(provider, lane)
+
+    def capacity(self, provider: str) -> int:
+        """Requests of a provider that can be running or waiting at the same time (limit + queue)."""
+        with self._lock:
+            return self.provider_limits.get(provider, self.max_concurrency) + self.max_queue
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Current active/waiting counts per provider."""
+        with self._lock:
+            return {
+                name: {"active": lane.active, "waiting": len(lane.waiting), "limit": lane.limit}
+                for name, lane in self._lanes.items()
+            }
+
+    def _evict_lower(self, lane: _Lane, priority: Priority) -> bool:
+        """
+        Make room for a request by rejecting the lowest-priority waiter,
+        if that waiter has a lower priority than the new request (caller holds the lock).
+
+        Returns:
+            True if a waiter was evicted
+        """
+        worst: Tuple[int, int, _Waiter] = max(lane.waiting, key=lambda entry: (entry[0], entry[1]))
+        if worst[0] <= int(priority):
+            return False
+        worst[2].evicted = True
+        worst[2].cancelled = True
+        self._remove(lane, worst[2])
+        worst[2].wake()
+        return True
+
+    @staticmethod
+    def _remove(lane: _Lane, waiter: _Waiter) -> None:
+        """Remove a waiter from the lane's queue (caller holds the lock)."""
+        lane.waiting = [entry for entry in lane.waiting if entry[2] is not waiter]
+        heapq.heapify(lane.waiting)
+
+    def _lane(self, provider: str) -> _Lane:
+        """Get or create the lane for a provider (caller holds the lock)."""
+        if provider not in self._lanes:
+            self._lanes[provider] = _Lane(self.provider_limits.get(provider, self.max_concurrency))
+        return self._lanes[provider]
+
+    @staticmethod
+    def _publish(provider: str, lane: _Lane) -> None:
+        """Export queue depth and active requests as gauges."""
+        metrics.gauge("llm_queue_depth").set(len(lane.waiting), provider=provider)
+        metrics.gauge("llm_active_requests").set(lane.active, provider=provider)
+
+
+# Process-wide scheduler (configured by LLMFactory from config.yaml)
+scheduler: LLMScheduler = LLMScheduler()
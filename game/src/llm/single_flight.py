@@ -0,0 +1,304 @@
+"""
+Request coalescing (single-flight) for identical concurrent LLM calls.
+When several sessions send the same request at the same moment (welcome
+turns, the first command after start, editor jobs on the same text), only
+the first one goes to the model; the others wait for its result.
+"""
+from __future__ import annotations
+import asyncio
+import dataclasses
+import hashlib
+import json
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from cancellation import CancellationToken, OperationCancelledError
+from metrics import metrics
+
+if TYPE_CHECKING:
+    from .base_provider import BaseLLMProvider, LLMFunction, LLMMessage, LLMResponse
+
+# Errors of a leader that only concern its own caller (waiting callers retry)
+_CANCELLED: Tuple[type, ...] = (OperationCancelledError, asyncio.CancelledError)
+
+
+class _Flight:
+    """An in-flight call and the callers waiting for it."""
+
+    def __init__(self) -> None:
+        self.done: bool = False
+        self.response: Optional[LLMResponse] = None
+        self.error: Optional[BaseException] = None
+        self.deltas: List[str] = []
+        self.listeners: List[Callable[[str], None]] = []
+        self.wakers: List[Callable[[], None]] = []
+        self.lock: threading.Lock = threading.Lock()
+
+    def publish(self, delta: str) -> None:
+        """Forward a stream delta of the leader to the waiting callers."""
+        with self.lock:
+            self.deltas.append(delta)
+            for listener in list(self.listeners):
+                try:
+                    listener(delta)
+                except Exception:
+                    # A caller that went away (e.g. cancelled) must not break the leader
+                    self.listeners.remove(listener)
+
+    def join(self, on_delta: Optional[Callable[[str], None]], wake: Callable[[], None]) -> bool:
+        """
+        Wait for the flight: replay the deltas so far and follow the rest.
+
+        Returns:
+            False if the flight has already finished (result is available)
+        """
+        with self.lock:
+            if self.done:
+                return False
+            if on_delta is not None:
+                for delta in self.deltas:
+                    on_delta(delta)
+                self.listeners.append(on_delta)
+            self.wakers.append(wake)
+            return True
+
+    def leave(self, on_delta: Optional[Callable[[str], None]]) -> None:
+        """Stop following the flight (the waiting caller was cancelled)."""
+        with self.lock:
+            if on_delta in self.listeners:
+                self.listeners.remove(on_delta)
+
+    def finish(self, response: Optional[LLMResponse], error: Optional[BaseException]) -> None:
+        """Store the result and wake all waiting callers."""
+        with self.lock:
+            self.response = response
+            self.error = error
+            self.done = True
+            self.listeners.clear()
+            wakers: List[Callable[[], None]] = self.wakers
+            self.wakers = []
+        for wake in wakers:
+            wake()
+
+
+class SingleFlight:
+    """
+    Shares one in-flight LLM call among identical concurrent callers.
+
+    The key covers everything that determines the answer: provider, model,
+    sampling parameters, the fully built messages and the functions (see
+    key()). Only deterministic calls (temperature <= max_temperature) are
+    coalesced, unless sampling is allowed globally (allow_sampling) or for
+    a provider instance (BaseLLMProvider.coalesce). Waiting callers receive
+    the leader's stream deltas and a copy of its response without usage
+    (they spent no tokens). If the leader is cancelled, waiting callers
+    send their own request; other errors are shared.
+    """
+
+    def __init__(self, enabled: bool = True, max_temperature: float = 0.0, allow_sampling: bool = False) -> None:
+        """
+        Args:
+            enabled: Coalesce identical concurrent calls
+            max_temperature: Highest temperature considered deterministic
+            allow_sampling: Coalesce calls at any temperature
+        """
+        self.enabled: bool = enabled
+        self.max_temperature: float = max_temperature
+        self.allow_sampling: bool = allow_sampling
+        self._flights: Dict[str, _Flight] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """
+        Apply settings from the llm.single_flight section of config.yaml.
+
+        Args:
+            config: Single-flight configuration dict
+        """
+        self.enabled = bool(config.get('enabled', self.enabled))
+        self.max_temperature = float(config.get('max_temperature', self.max_temperature))
+        self.allow_sampling = bool(config.get('allow_sampling', self.allow_sampling))
+
+    def key(
+        self,
+        provider: BaseLLMProvider,
+        messages: List[LLMMessage],
+        functions: Optional[List[LLMFunction]]
+    ) -> Optional[str]:
+        """
+        Coalescing key of a call.
+
+        Args:
+            provider: Provider making the call
+            messages: Complete messages (including system prompt)
+            functions: Functions of the call (None for plain chat)
+
+        Returns:
+            Hex digest, or None if the call must not be coalesced
+        """
+        if not self.enabled:
+            return None
+        allowed: Optional[bool] = provider.coalesce
+        if allowed is False or (allowed is None and not self.allow_sampling and provider.temperature > self.max_temperature):
+            return None
+        payload: str = json.dumps(
+            {
+                "provider": provider.provider_name,
+                "model": provider.model,
+                "temperature": provider.temperature,
+                "max_tokens": provider.max_tokens,
+                "format": provider._response_format(functions) if functions else None,
+                "messages": [[m.role, m.content] for m in messages],
+                "functions": [[f.name, f.description, f.parameters] for f in functions or []]
+            },
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def run(
+        self,
+        key: str,
+        provider: str,
+        call: Callable[[Optional[Callable[[str], None]]], LLMResponse],
+        on_delta: Optional[Callable[[str], None]],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """
+        Make the call, or wait for the identical call already in flight.
+
+        Args:
+            key: Coalescing key (see key())
+            provider: Provider name (metrics label)
+            call: Makes the actual call with the given delta callback
+            on_delta: Delta callback of this caller
+            cancel_token: Cancels waiting for the flight
+
+        Returns:
+            The response
+
+        Raises:
+            OperationCancelledError: If cancel_token was cancelled while waiting
+        """
+        flight, leader = self._enter(key, provider)
+        if leader:
+            return self._lead(key, flight, call, on_delta)
+
+        woken: threading.Event = threading.Event()
+        remove: Optional[Callable[[], None]] = cancel_token.add_callback(woken.set) if cancel_token else None
+        try:
+            if flight.join(on_delta, woken.set):
+                woken.wait()
+                if not flight.done:
+                    flight.leave(on_delta)
+                    cancel_token.raise_if_cancelled()
+        finally:
+            if remove is not None:
+                remove()
+        return self._follow(flight, provider, lambda: call(on_delta))
+
+    async def arun(
+        self,
+        key: str,
+        provider: str,
+        call: Callable[[Optional[Callable[[str], None]]], Awaitable[LLMResponse]],
+        on_delta: Optional[Callable[[str], None]],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> LLMResponse:
+        """Async variant of run() (waits without blocking the event loop)."""
+        flight, leader = self._enter(key, provider)
+        if leader:
+            try:
+                response: LLMResponse = await call(self._forward(flight, on_delta))
+            except BaseException as e:
+                self._land(key, flight, None, e)
+                raise
+            self._land(key, flight, response, None)
+            return response
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        woken: asyncio.Future = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: woken.done() or woken.set_result(None))
+
+        remove: Optional[Callable[[], None]] = cancel_token.add_callback(wake) if cancel_token else None
+        try:
+            if flight.join(on_delta, wake):
+                try:
+                    await woken
+                except asyncio.CancelledError:
+                    flight.leave(on_delta)
+                    raise
+                if not flight.done:
+                    flight.leave(on_delta)
+                    cancel_token.raise_if_cancelled()
+        finally:
+            if remove is not None:
+                remove()
+        if isinstance(flight.error, _CANCELLED):
+            metrics.counter("llm_single_flight_total").inc(provider=provider, result="leader_cancelled")
+            return await call(on_delta)
+        return self._follow(flight, provider, None)
+
+    def _enter(self, key: str, provider: str) -> Tuple[_Flight, bool]:
+        """Join the flight of key, or start it. Returns (flight, leader)."""
+        with self._lock:
+            flight: Optional[_Flight] = self._flights.get(key)
+            leader: bool = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+        metrics.counter("llm_single_flight_total").inc(provider=provider, result="leader" if leader else "coalesced")
+        leaders: float = metrics.counter("llm_single_flight_total").value(provider=provider, result="leader")
+        coalesced: float = metrics.counter("llm_single_flight_total").value(provider=provider, result="coalesced")
+        metrics.gauge("llm_single_flight_dedup_rate").set(coalesced / (leaders + coalesced), provider=provider)
+        return flight, leader
+
+    def _lead(
+        self,
+        key: str,
+        flight: _Flight,
+        call: Callable[[Optional[Callable[[str], None]]], LLMResponse],
+        on_delta: Optional[Callable[[str], None]]
+    ) -> LLMResponse:
+        """Make the call for everyone waiting on the flight."""
+        try:
+            response: LLMResponse = call(self._forward(flight, on_delta))
+        except BaseException as e:
+            self._land(key, flight, None, e)
+            raise
+        self._land(key, flight, response, None)
+        return response
+
+    @staticmethod
+    def _forward(flight: _Flight, on_delta: Optional[Callable[[str], None]]) -> Optional[Callable[[str], None]]:
+        """Delta callback of the leader (streams only if the leader streams)."""
+        if on_delta is None:
+            return None
+
+        def forward(delta: str) -> None:
+            on_delta(delta)
+            flight.publish(delta)
+        return forward
+
+    def _land(self, key: str, flight: _Flight, response: Optional[LLMResponse], error: Optional[BaseException]) -> None:
+        """End the flight: later identical calls start a new one."""
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.finish(response, error)
+
+    @staticmethod
+    def _follow(flight: _Flight, provider: str, retry: Optional[Callable[[], LLMResponse]]) -> LLMResponse:
+        """Result of a finished flight for a waiting caller."""
+        if isinstance(flight.error, _CANCELLED) and retry is not None:
+            # The leader's client went away - this caller still wants an answer
+            metrics.counter("llm_single_flight_total").inc(provider=provider, result="leader_cancelled")
+            return retry()
+        if flight.error is not None:
+            raise flight.error
+        return dataclasses.replace(flight.response, usage=None)
+
+
+# Process-wide request coalescing (configured by LLMFactory from config.yaml)
+single_flight: SingleFlight = SingleFlight()
@@ -0,0 +1,246 @@
+"""
+Streaming helpers for LLM providers.
+Turns raw token deltas into narrative text while the model is still generating.
+"""
+from __future__ import annotations
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from .base_provider import LLMFunctionCall, LLMResponse
+
+
+class NarrativeStreamExtractor:
+    """
+    Incrementally extracts the value of the "response" field from a
+    streamed JSON answer (JSON-prompted providers) or from streamed
+    tool call arguments (native function calling).
+
+    Every decoded piece of narrative is passed to on_narrative as soon
+    as it arrives. Text outside the "response" string is ignored.
+    """
+
+    _KEY_PATTERN = re.compile(r'"response"\s*:\s*"')
+    _ESCAPES: Dict[str, str] = {
+        '"': '"', '\\': '\\', '/': '/', 'b': '\b',
+        'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'
+    }
+
+    def __init__(self, on_narrative: Callable[[str], None]) -> None:
+        """
+        Args:
+            on_narrative: Callback receiving decoded narrative fragments
+        """
+        self.on_narrative: Callable[[str], None] = on_narrative
+        self._buffer: str = ""
+        self._in_value: bool = False
+        self._done: bool = False
+        self._pending_escape: str = ""
+        self.narrative: str = ""
+
+    def feed(self, delta: str) -> None:
+        """Feed a raw delta from the model stream."""
+        if self._done or not delta:
+            return
+
+        if not self._in_value:
+            self._buffer += delta
+            match = self._KEY_PATTERN.search(self._buffer)
+            if not match:
+                # Keep only a short tail so a key split across deltas is still found
+                self._buffer = self._buffer[-32:]
+                return
+            self._in_value = True
+            delta = self._buffer[match.end():]
+            self._buffer = ""
+
+        decoded: str = self._decode(delta)
+        if decoded:
+            self.narrative += decoded
+            self.on_narrative(decoded)
+
+    def _decode(self, text: str) -> str:
+        """Decode JSON string characters until the closing quote."""
+        out: List[str] = []
+        text = self._pending_escape + text
+        self._pending_escape = ""
+        i: int = 0
+        while i < len(text):
+            char: str = text[i]
+            if char == '\\':
+                if i + 1 >= len(text):
+                    self._pending_escape = text[i:]
+                    break
+                code: str = text[i + 1]
+                if code == 'u':
+                    if i + 6 > len(text):
+                        self._pending_escape = text[i:]
+                        break
+                    try:
+                        out.append(chr(int(text[i + 2:i + 6], 16)))
+                    except ValueError:
+                        pass
+                    i += 6
+                    continue
+                out.append(self._ESCAPES.get(code, code))
+                i += 2
+                continue
+            if char == '"':
+                self._done = True
+                break
+            out.append(char)
+            i += 1
+        return "".join(out)
+
+
+def openai_usage(usage: Any) -> Optional[Dict[str, int]]:
+    """
+    Token usage of an OpenAI-compatible response as a dict.
+
+    Besides prompt/completion/total tokens, the prompt tokens served from
+    the provider's prefix cache are reported as "cached_tokens" (OpenAI and
+    Gemini: prompt_tokens_details.cached_tokens, DeepSeek:
+    prompt_cache_hit_tokens) when the provider reports them.
+
+    Args:
+        usage: response.usage (or the usage of the last stream chunk)
+
+    Returns:
+        Usage dict, or None if the response carries no usage
+    """
+    if not usage:
+        return None
+    result: Dict[str, int] = {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens
+    }
+    details: Any = getattr(usage, 'prompt_tokens_details', None)
+    cached: Optional[int] = getattr(details, 'cached_tokens', None) if details else None
+    if cached is None:
+        cached = getattr(usage, 'prompt_cache_hit_tokens', None)
+    if cached is not None:
+        result["cached_tokens"] = cached
+    return result
+
+
+class _StreamAssembler:
+    """Assembles an LLMResponse from OpenAI-compatible stream chunks."""
+
+    def __init__(self, on_delta: Callable[[str], None], fallback_model: str) -> None:
+        self.on_delta: Callable[[str], None] = on_delta
+        self.content_parts: List[str] = []
+        self.tool_name: Optional[str] = None
+        self.tool_args: List[str] = []
+        self.model: str = fallback_model
+        self.finish_reason: Optional[str] = None
+        self.usage: Optional[Dict[str, int]] = None
+
+    def add(self, chunk: Any) -> None:
+        """Process one chunk and forward its text deltas."""
+        if getattr(chunk, 'model', None):
+            self.model = chunk.model
+        if getattr(chunk, 'usage', None):
+            self.usage = openai_usage(chunk.usage)
+        if not chunk.choices:
+            return
+
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+
+        delta = choice.delta
+        if delta is None:
+            return
+
+        if delta.content:
+            self.content_parts.append(delta.content)
+            self.on_delta(delta.content)
+
+        for tool_call in getattr(delta, 'tool_calls', None) or []:
+            # Only the first tool call is used (same as non-streaming providers)
+            if (tool_call.index or 0) != 0 or not tool_call.function:
+                continue
+            if tool_call.function.name:
+                self.tool_name = tool_call.function.name
+            if tool_call.function.arguments:
+                self.tool_args.append(tool_call.function.arguments)
+                self.on_delta(tool_call.function.arguments)
+
+    def response(self) -> LLMResponse:
+        """The complete response (function_call set if the model used a tool)."""
+        function_call: Optional[LLMFunctionCall] = None
+        if self.tool_name:
+            try:
+                arguments: Dict[str, Any] = json.loads("".join(self.tool_args) or "{}")
+            except json.JSONDecodeError:
+                arguments = {}
+            function_call = LLMFunctionCall(name=self.tool_name, arguments=arguments)
+
+        return LLMResponse(
+            content="".join(self.content_parts),
+            model=self.model,
+            function_call=function_call,
+            usage=self.usage,
+            finish_reason=self.finish_reason
+        )
+
+
+def consume_openai_stream(
+    stream: Any,
+    on_delta: Callable[[str], None],
+    fallback_model: str
+) -> LLMResponse:
+    """
+    Consume an OpenAI-compatible chat completion stream.
+
+    Content deltas and the arguments of the first tool call are forwarded
+    to on_delta; the complete response is assembled and returned. If
+    on_delta raises (e.g. OperationCancelledError) the stream is closed
+    and the exception propagates.
+
+    Args:
+        stream: Iterator returned by client.chat.completions.create(stream=True)
+        on_delta: Callback receiving raw text deltas
+        fallback_model: Model name to report if the stream does not carry one
+
+    Returns:
+        Assembled LLMResponse (function_call set if the model used a tool)
+    """
+    assembler: _StreamAssembler = _StreamAssembler(on_delta, fallback_model)
+    try:
+        for chunk in stream:
+            assembler.add(chunk)
+    finally:
+        # Release the HTTP connection early if on_delta aborted the stream (cancellation)
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+    return assembler.response()
+
+
+async def aconsume_openai_stream(
+    stream: Any,
+    on_delta: Callable[[str], None],
+    fallback_model: str
+) -> LLMResponse:
+    """
+    Async variant of consume_openai_stream for AsyncOpenAI streams.
+
+    Args:
+        stream: Async iterator returned by AsyncOpenAI().chat.completions.create(stream=True)
+        on_delta: Callback receiving raw text deltas
+        fallback_model: Model name to report if the stream does not carry one
+
+    Returns:
+        Assembled LLMResponse (function_call set if the model used a tool)
+    """
+    assembler: _StreamAssembler = _StreamAssembler(on_delta, fallback_model)
+    try:
+        async for chunk in stream:
+            assembler.add(chunk)
+    finally:
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            await close()
+    return assembler.response()
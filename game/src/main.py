@@ -7,6 +7,7 @@ from session import GameSession
 from config_loader import load_config
 from audio import PyAudioSink
 from sound import LocalJukebox
+from usage import usage_tracker
 
 # Base directory for game
 GAME_DIR: Path = Path(__file__).parent.parent
@@ -82,6 +83,7 @@ def main():
                 print("- inventory: Inventar anzeigen")
                 print("- vars: Alle Lua-Variablen anzeigen (Debug)")
                 print("- actions: Verfügbare Actions anzeigen")
+                print("- usage: Token-Verbrauch (Session, Spiel, Provider)")
                 print("- help: Diese Hilfe anzeigen")
                 print()
                 continue
@@ -125,6 +127,29 @@ def main():
                 print()
                 continue
             
+            if user_input.lower() == 'usage':
+                snapshot = usage_tracker.snapshot()
+                session_usage = usage_tracker.session(session.session_id) or {}
+                print("\n" + "=" * 50)
+                print("TOKEN-VERBRAUCH")
+                print("=" * 50)
+                print(f"  Session: {session_usage.get('calls', 0)} Aufrufe, "
+                      f"{session_usage.get('prompt_tokens', 0)} Prompt / "
+                      f"{session_usage.get('completion_tokens', 0)} Completion / "
+                      f"{session_usage.get('cached_tokens', 0)} cached")
+                for title, key in (("Provider", "providers"), ("Spiel", "games"), ("Art", "kinds")):
+                    for name, stats in snapshot[key].items():
+                        print(f"  {title} {name}: {stats['calls']} Aufrufe, "
+                              f"Ø {stats['prompt_tokens_per_call']:.0f} Prompt / "
+                              f"{stats['completion_tokens_per_call']:.0f} Completion, "
+                              f"Ø {stats['latency_seconds_per_call']:.2f}s")
+                for name, stats in snapshot["games"].items():
+                    trend = ", ".join(f"{turns}: {tokens:.0f}" for turns, tokens in stats["prompt_tokens_by_history"].items())
+                    if trend:
+                        print(f"  Prompt-Tokens nach Zug ({name}): {trend}")
+                print("=" * 50 + "\n")
+                continue
+            
             # Process input through game engine
             print()
             response = session.game_engine.process_input(user_input)
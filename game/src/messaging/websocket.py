@@ -1,37 +1,130 @@
 """
 WebSocket message queue implementation.
 """
-from typing import Dict, Any
+from __future__ import annotations
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Union
+
+from metrics import metrics
 from .base import MessageQueue
 
 
 class WebSocketMessageQueue(MessageQueue):
     """
     Message queue for WebSocket connections.
-    Sends messages immediately using background task.
+
+    All outbound frames go through one bounded queue per connection that is
+    drained by a single writer task, so the socket is never written from two
+    places at once. send()/send_bytes() are safe to call from any thread
+    (TTS workers, audio playback). Adjacent audio chunks are coalesced into
+    larger frames; when the queue is full the overflow policy decides what
+    happens:
+
+        drop_audio   - drop the oldest queued audio frame (default, messages are kept)
+        drop_newest  - drop the incoming frame
+        block        - block the producing thread until there is room
+                       (falls back to dropping on the event loop thread)
     """
-    
-    def __init__(self, websocket, loop=None):
+
+    OVERFLOW_POLICIES = ("drop_audio", "drop_newest", "block")
+
+    def __init__(
+        self,
+        websocket,
+        loop=None,
+        max_queue: int = 256,
+        coalesce_bytes: int = 16384,
+        overflow: str = "drop_audio",
+        block_timeout: float = 2.0
+    ):
         """
         Initialize with WebSocket connection.
-        
+
         Args:
             websocket: WebSocket connection object
             loop: Event loop (optional, will get current loop if not provided)
+            max_queue: Maximum number of queued frames
+            coalesce_bytes: Maximum size of a coalesced audio frame (0 disables coalescing)
+            overflow: Overflow policy (see OVERFLOW_POLICIES)
+            block_timeout: Maximum time a producer blocks with the "block" policy
         """
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}' (expected one of {self.OVERFLOW_POLICIES})")
+
         self.websocket = websocket
-        self.loop = loop
-    
+        self.loop = loop or asyncio.get_event_loop()
+        self.max_queue: int = max_queue
+        self.coalesce_bytes: int = coalesce_bytes
+        self.overflow: str = overflow
+        self.block_timeout: float = block_timeout
+
+        # Frames are dicts (JSON messages) or bytearrays (audio)
+        self._frames: Deque[Union[Dict[str, Any], bytearray]] = deque()
+        self._condition: threading.Condition = threading.Condition()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._idle: bool = True
+        self._closed: bool = False
+
+        # Audio encoder negotiated at connect time (None = raw PCM)
+        self.audio_encoder = None
+
+    @classmethod
+    def from_config(cls, websocket, config: Dict[str, Any], loop=None) -> WebSocketMessageQueue:
+        """
+        Create a queue from the websocket section of config.yaml.
+
+        Args:
+            websocket: WebSocket connection object
+            config: Full game configuration
+            loop: Event loop
+
+        Returns:
+            Configured WebSocketMessageQueue
+        """
+        ws_config: Dict[str, Any] = config.get('websocket', {}) or {}
+        return cls(
+            websocket,
+            loop=loop,
+            max_queue=int(ws_config.get('max_queue', 256)),
+            coalesce_bytes=int(ws_config.get('coalesce_bytes', 16384)),
+            overflow=ws_config.get('overflow', 'drop_audio'),
+            block_timeout=float(ws_config.get('block_timeout', 2.0))
+        )
+
+    def start(self) -> None:
+        """Start the writer task (must be called on the event loop)."""
+        if self._writer_task is None:
+            self._wakeup = asyncio.Event()
+            self._writer_task = self.loop.create_task(self._write_loop())
+
+    async def close(self) -> None:
+        """Stop the writer task and drop any frames still queued."""
+        with self._condition:
+            self._closed = True
+            dropped: int = len(self._frames)
+            self._frames.clear()
+            self._condition.notify_all()
+        metrics.gauge("ws_queue_depth").dec(dropped)
+
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+
     def send(self, message, data: Dict[str, Any] = None):
         """
-        Send message over WebSocket immediately via background task.
+        Queue a message for sending over WebSocket.
 
         Args:
             message: Message object or legacy string type
             data: Message data (only used with legacy string type)
         """
-        import asyncio
-
         # Handle Message objects
         if hasattr(message, 'to_dict'):
             message_dict = message.to_dict()
@@ -41,58 +134,154 @@ class WebSocketMessageQueue(MessageQueue):
                 "type": message,
                 "data": data or {}
             }
+        self._put(message_dict)
 
-        # Get event loop
-        try:
-            loop = self.loop or asyncio.get_event_loop()
-            # Schedule coroutine as task
-            asyncio.ensure_future(self._send_async(message_dict), loop=loop)
-        except Exception as e:
-            print(f"[ERROR] Failed to schedule WebSocket send: {e}")
+    def send_json(self, message_dict: Dict[str, Any]) -> None:
+        """
+        Queue a raw JSON message (e.g. connection handshake).
+
+        Args:
+            message_dict: JSON-serializable message
+        """
+        self._put(message_dict)
 
     def send_bytes(self, data: bytes):
         """
-        Send binary data over WebSocket (for audio streaming).
+        Queue binary data for sending over WebSocket (for audio streaming).
 
         Args:
             data: Binary data to send
         """
-        import asyncio
+        if data:
+            self._put(bytearray(data))
 
-        try:
-            loop = self.loop or asyncio.get_event_loop()
-            asyncio.ensure_future(self._send_bytes_async(data), loop=loop)
-        except Exception as e:
-            print(f"[ERROR] Failed to schedule WebSocket binary send: {e}")
-    
-    async def _send_async(self, message: Dict[str, Any]):
+    async def flush(self):
         """
-        Actually send message over WebSocket.
-
-        Args:
-            message: Message to send
+        Flush any pending messages.
+        Frames are sent by the writer task as soon as they are queued,
+        so there is nothing to wait for here.
         """
-        try:
-            await self.websocket.send_json(message)
-            print(f"[WEBSOCKET] Sent: {message['type']}")
-        except Exception as e:
-            print(f"[ERROR] Failed to send WebSocket message: {e}")
+        pass
 
-    async def _send_bytes_async(self, data: bytes):
+    def drop_audio(self) -> int:
         """
-        Actually send binary data over WebSocket.
+        Drop all queued audio frames (speech was interrupted). Messages are kept.
 
-        Args:
-            data: Binary data to send
+        Returns:
+            Number of dropped frames
         """
-        try:
-            await self.websocket.send_bytes(data)
-        except Exception as e:
-            print(f"[ERROR] Failed to send WebSocket binary data: {e}")
-    
-    async def flush(self):
+        with self._condition:
+            kept = deque(frame for frame in self._frames if not isinstance(frame, bytearray))
+            dropped: int = len(self._frames) - len(kept)
+            self._frames = kept
+            self._condition.notify_all()
+        if dropped:
+            metrics.gauge("ws_queue_depth").dec(dropped)
+            metrics.counter("ws_frames_dropped_total").inc(dropped, kind="audio", policy="interrupt")
+        return dropped
+
+    @property
+    def depth(self) -> int:
+        """Number of frames currently queued."""
+        return len(self._frames)
+
+    def _put(self, frame: Union[Dict[str, Any], bytearray]) -> None:
+        """Queue a frame (thread-safe) and wake the writer if it is idle."""
+        is_audio: bool = isinstance(frame, bytearray)
+        kind: str = "audio" if is_audio else "message"
+
+        with self._condition:
+            if self._closed:
+                return
+
+            # Coalesce adjacent audio chunks into one frame
+            if is_audio and self.coalesce_bytes and self._frames:
+                last = self._frames[-1]
+                if isinstance(last, bytearray) and len(last) + len(frame) <= self.coalesce_bytes:
+                    last.extend(frame)
+                    metrics.counter("ws_frames_coalesced_total").inc()
+                    return
+
+            if len(self._frames) >= self.max_queue and not self._make_room(kind):
+                metrics.counter("ws_frames_dropped_total").inc(kind=kind, policy=self.overflow)
+                return
+
+            self._frames.append(frame)
+            metrics.gauge("ws_queue_depth").inc()
+            wake: bool = self._idle
+            self._idle = False
+
+        if wake:
+            try:
+                self.loop.call_soon_threadsafe(self._wake_writer)
+            except RuntimeError as e:
+                # Event loop already closed (server shutting down)
+                print(f"[ERROR] Failed to schedule WebSocket send: {e}")
+
+    def _make_room(self, kind: str) -> bool:
         """
-        Flush any pending messages.
-        For WebSocket, this is a no-op since messages are sent immediately.
+        Apply the overflow policy to a full queue (caller holds the condition).
+
+        Returns:
+            True if the incoming frame can be queued
         """
-        pass
\ No newline at end of file
+        if self.overflow == "drop_audio":
+            for i, queued in enumerate(self._frames):
+                if isinstance(queued, bytearray):
+                    del self._frames[i]
+                    metrics.gauge("ws_queue_depth").dec()
+                    metrics.counter("ws_frames_dropped_total").inc(kind="audio", policy=self.overflow)
+                    return True
+            # Only messages queued: keep them, drop incoming audio but never messages
+            return kind == "message"
+
+        if self.overflow == "block" and not self._on_loop_thread():
+            return self._condition.wait_for(
+                lambda: self._closed or len(self._frames) < self.max_queue,
+                timeout=self.block_timeout
+            ) and not self._closed
+
+        return False
+
+    def _on_loop_thread(self) -> bool:
+        """Check whether the caller runs on the event loop thread."""
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _wake_writer(self) -> None:
+        """Wake the writer task (runs on the event loop)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _next_frame(self) -> Optional[Union[Dict[str, Any], bytearray]]:
+        """Pop the next frame, or mark the writer idle if the queue is empty."""
+        with self._condition:
+            if not self._frames:
+                self._idle = True
+                return None
+            frame = self._frames.popleft()
+            self._condition.notify_all()
+        metrics.gauge("ws_queue_depth").dec()
+        return frame
+
+    async def _write_loop(self) -> None:
+        """Single writer: send queued frames in order."""
+        while not self._closed:
+            frame = self._next_frame()
+            if frame is None:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            try:
+                if isinstance(frame, bytearray):
+                    await self.websocket.send_bytes(bytes(frame))
+                    metrics.counter("ws_frames_sent_total").inc(kind="audio")
+                else:
+                    await self.websocket.send_json(frame)
+                    metrics.counter("ws_frames_sent_total").inc(kind="message")
+                    print(f"[WEBSOCKET] Sent: {frame.get('type')}")
+            except Exception as e:
+                print(f"[ERROR] Failed to send WebSocket frame: {e}")
@@ -0,0 +1,195 @@
+"""
+Process-wide runtime metrics.
+Lightweight in-memory counters, gauges and histograms exposed via /metrics.
+"""
+from __future__ import annotations
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    """Convert label kwargs into a hashable, order-independent key."""
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_name(key: LabelKey) -> str:
+    """Render a label key as 'k=v,k2=v2' (empty string for no labels)."""
+    return ",".join(f"{k}={v}" for k, v in key)
+
+
+class Counter:
+    """Monotonically increasing counter (optionally labelled)."""
+
+    def __init__(self, name: str, description: str = "") -> None:
+        self.name: str = name
+        self.description: str = description
+        self._values: Dict[LabelKey, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Increase the counter by amount."""
+        key: LabelKey = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Get the current value for the given labels."""
+        return self._values.get(_label_key(labels), 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {_label_name(k): v for k, v in self._values.items()}
+
+
+class Gauge:
+    """Value that can go up and down (queue depth, active workers, ...)."""
+
+    def __init__(self, name: str, description: str = "") -> None:
+        self.name: str = name
+        self.description: str = description
+        self._values: Dict[LabelKey, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key: LabelKey = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {_label_name(k): v for k, v in self._values.items()}
+
+
+class Histogram:
+    """
+    Distribution of observed values.
+    Keeps count/sum over the process lifetime and a sliding window
+    of recent samples for percentile estimates.
+    """
+
+    def __init__(self, name: str, description: str = "", window: int = 1000) -> None:
+        self.name: str = name
+        self.description: str = description
+        self.window: int = window
+        self._samples: Dict[LabelKey, Deque[float]] = {}
+        self._count: Dict[LabelKey, int] = {}
+        self._sum: Dict[LabelKey, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record a single observation."""
+        key: LabelKey = _label_key(labels)
+        with self._lock:
+            if key not in self._samples:
+                self._samples[key] = deque(maxlen=self.window)
+                self._count[key] = 0
+                self._sum[key] = 0.0
+            self._samples[key].append(value)
+            self._count[key] += 1
+            self._sum[key] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Context manager that observes the elapsed wall time in seconds."""
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def percentile(self, q: float, **labels: Any) -> Optional[float]:
+        """Get the q-th percentile (0-100) of the recent window, or None if empty."""
+        with self._lock:
+            samples = sorted(self._samples.get(_label_key(labels), ()))
+        if not samples:
+            return None
+        index: int = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        result: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            items = [(k, sorted(v), self._count[k], self._sum[k]) for k, v in self._samples.items()]
+        for key, samples, count, total in items:
+            def pick(q: float) -> float:
+                return samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))]
+            result[_label_name(key)] = {
+                "count": count,
+                "sum": round(total, 6),
+                "avg": round(total / count, 6) if count else 0.0,
+                "p50": round(pick(0.50), 6),
+                "p95": round(pick(0.95), 6),
+                "p99": round(pick(0.99), 6),
+                "max": round(samples[-1], 6),
+            }
+        return result
+
+
+class MetricsRegistry:
+    """
+    Registry of named metrics.
+    Metrics are created on first access, so modules can simply call
+    metrics.counter("name").inc() without prior registration.
+    """
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, Counter] = {}
+        self._gauges: Dict[str, Gauge] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter(name, description)
+            return self._counters[name]
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        with self._lock:
+            if name not in self._gauges:
+                self._gauges[name] = Gauge(name, description)
+            return self._gauges[name]
+
+    def histogram(self, name: str, description: str = "") -> Histogram:
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(name, description)
+            return self._histograms[name]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a JSON-serializable snapshot of all metrics."""
+        with self._lock:
+            counters = list(self._counters.values())
+            gauges = list(self._gauges.values())
+            histograms = list(self._histograms.values())
+        return {
+            "counters": {c.name: c.snapshot() for c in counters},
+            "gauges": {g.name: g.snapshot() for g in gauges},
+            "histograms": {h.name: h.snapshot() for h in histograms},
+        }
+
+    def reset(self) -> None:
+        """Drop all metrics (used by the developer server on full reset)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# Process-wide registry
+metrics: MetricsRegistry = MetricsRegistry()
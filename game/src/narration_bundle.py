@@ -0,0 +1,230 @@
+"""
+Pre-generated narration of a map (see pregenerate.py).
+The bundle lives next to model.json and holds LLM narration variants for the
+deterministic moments of a game plus the synthesized speech for them.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import random
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from metrics import metrics
+from voice import TTSAudioCache
+
+# Bump when the layout of bundle.json changes (older bundles are ignored)
+BUNDLE_VERSION: int = 1
+
+# Bundle directory inside the map directory (next to model.json)
+BUNDLE_DIRNAME: str = "narration"
+
+
+class NarrationBundle:
+    """
+    Narration variants per moment of a map.
+
+    Moments are addressed by key: "welcome" (initial state), "state:<name>"
+    (room description) and "action:<name>" (outcome of a transition). A
+    bundle is only valid for the game definition it was generated from:
+    source_hash is compared on load, so an edited map falls back to the LLM
+    until the bundle is regenerated. Speech for every variant is stored in
+    a TTSAudioCache below the bundle directory.
+    """
+
+    def __init__(self, directory: Path, source_hash: str) -> None:
+        """
+        Args:
+            directory: Bundle directory (<map>/narration)
+            source_hash: Hash of the game definition (see source_hash_of)
+        """
+        self.directory: Path = Path(directory)
+        self.source_hash: str = source_hash
+        self.model: str = ""
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._audio_cache: Optional[TTSAudioCache] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def source_hash_of(game_data: Dict[str, Any]) -> str:
+        """
+        Hash of a game definition (engine format).
+
+        Args:
+            game_data: Game definition as produced by GameEngine
+
+        Returns:
+            Hex digest
+        """
+        payload: str = json.dumps(game_data, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def load(cls, game_dir: Path, game_data: Dict[str, Any]) -> Optional[NarrationBundle]:
+        """
+        Load the bundle of a map.
+
+        Args:
+            game_dir: Map directory (contains model.json)
+            game_data: Current game definition (engine format)
+
+        Returns:
+            NarrationBundle, or None if there is none or it is stale
+        """
+        directory: Path = Path(game_dir) / BUNDLE_DIRNAME
+        path: Path = directory / "bundle.json"
+        try:
+            data: Dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Narration bundle unreadable ({path}): {e}")
+            return None
+
+        source_hash: str = cls.source_hash_of(game_data)
+        if data.get("version") != BUNDLE_VERSION:
+            print(f"[WARNING] Narration bundle {path} has version {data.get('version')}, expected {BUNDLE_VERSION} - ignored")
+            return None
+        if data.get("source_hash") != source_hash:
+            print(f"[WARNING] Narration bundle {path} was generated for another version of the map - ignored")
+            return None
+
+        bundle: NarrationBundle = cls(directory, source_hash)
+        bundle.model = data.get("model", "")
+        bundle.entries = data.get("entries", {})
+        return bundle
+
+    @classmethod
+    def open_for_update(cls, game_dir: Path, game_data: Dict[str, Any]) -> NarrationBundle:
+        """
+        Open the bundle for (resumed) generation.
+        Entries of a stale bundle are discarded.
+
+        Args:
+            game_dir: Map directory (contains model.json)
+            game_data: Current game definition (engine format)
+
+        Returns:
+            NarrationBundle (possibly empty)
+        """
+        bundle: Optional[NarrationBundle] = cls.load(game_dir, game_data)
+        if bundle is None:
+            bundle = cls(Path(game_dir) / BUNDLE_DIRNAME, cls.source_hash_of(game_data))
+        return bundle
+
+    @property
+    def audio_cache(self) -> Optional[TTSAudioCache]:
+        """Speech of the bundle (None if no audio was generated)."""
+        if self._audio_cache is None:
+            audio_dir: Path = self.directory / "audio"
+            if audio_dir.is_dir():
+                # Never evicts: the bundle is sized by the map, not by a budget
+                self._audio_cache = TTSAudioCache(audio_dir, max_bytes=1 << 40)
+        return self._audio_cache
+
+    def create_audio_cache(self) -> TTSAudioCache:
+        """Get the audio cache of the bundle, creating its directory (generation only)."""
+        (self.directory / "audio").mkdir(parents=True, exist_ok=True)
+        return self.audio_cache
+
+    def variants(self, key: str) -> List[Dict[str, Any]]:
+        """
+        Variants of a moment.
+
+        Args:
+            key: Moment key ("welcome", "state:<name>", "action:<name>")
+
+        Returns:
+            List of {"text", "audio"} dicts
+        """
+        with self._lock:
+            return list(self.entries.get(key, []))
+
+    def pick(self, key: str) -> Optional[str]:
+        """
+        Pick a random narration variant.
+
+        Args:
+            key: Moment key
+
+        Returns:
+            Narration text, or None if the bundle has none for this moment
+        """
+        variants: List[Dict[str, Any]] = self.variants(key)
+        if not variants:
+            metrics.counter("narration_bundle_requests_total").inc(result="miss")
+            return None
+        metrics.counter("narration_bundle_requests_total").inc(result="hit")
+        return random.choice(variants)["text"]
+
+    def add_variant(self, key: str, text: str) -> None:
+        """
+        Add a narration variant (duplicates are ignored).
+
+        Args:
+            key: Moment key
+            text: Narration text
+        """
+        if not text:
+            return
+        with self._lock:
+            variants: List[Dict[str, Any]] = self.entries.setdefault(key, [])
+            if all(variant["text"] != text for variant in variants):
+                variants.append({"text": text, "audio": False})
+
+    def mark_audio(self, key: str, text: str) -> None:
+        """
+        Record that the speech of a variant is in the audio cache.
+
+        Args:
+            key: Moment key
+            text: Narration text
+        """
+        with self._lock:
+            for variant in self.entries.get(key, []):
+                if variant["text"] == text:
+                    variant["audio"] = True
+
+    def save(self) -> None:
+        """Write bundle.json atomically (called after every finished job, so generation can resume)."""
+        with self._lock:
+            data: Dict[str, Any] = {
+                "version": BUNDLE_VERSION,
+                "source_hash": self.source_hash,
+                "model": self.model,
+                "entries": self.entries,
+            }
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path: Path = self.directory / "bundle.json"
+            tmp_path: Path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            os.replace(tmp_path, path)
+
+
+# Loaded bundles per map directory and game definition (shared by all sessions)
+_bundles: Dict[tuple, Optional[NarrationBundle]] = {}
+_bundles_lock: threading.Lock = threading.Lock()
+
+
+def get_narration_bundle(game_dir: Optional[Path], game_data: Dict[str, Any]) -> Optional[NarrationBundle]:
+    """
+    Get the shared bundle of a map.
+
+    Args:
+        game_dir: Map directory (None for in-memory maps)
+        game_data: Current game definition (engine format)
+
+    Returns:
+        NarrationBundle, or None if the map has no valid bundle
+    """
+    if game_dir is None:
+        return None
+    key: tuple = (str(game_dir), NarrationBundle.source_hash_of(game_data))
+    with _bundles_lock:
+        if key not in _bundles:
+            _bundles[key] = NarrationBundle.load(game_dir, game_data)
+            if _bundles[key] is not None:
+                print(f"[NARRATION] Loaded bundle for {game_dir.name} ({len(_bundles[key].entries)} moments)")
+        return _bundles[key]
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Offline narration pre-generation for the configured map.
+
+Walks the states and actions of the map (config.yaml: maps_directory +
+game_name) and asks the configured LLM for narration variants of every
+deterministic moment:
+
+    - welcome           the initial state with the map's welcome prompt
+    - state:<name>      the room description of every state
+    - action:<name>     the outcome of every transition with an after_fire text
+
+With a TTS provider that can synthesize (Google, OpenAI) the speech of every
+variant is synthesized as well, sentence by sentence like SpeechPipeline
+does, so playback hits the bundle's audio. Results go to <map>/narration/
+(bundle.json + audio/). The bundle is saved after every finished job, so an
+interrupted run resumes where it stopped; an edited map invalidates it.
+
+Run with: python src/pregenerate.py [--variants 3] [--workers 4] [--rate 1.0] [--no-audio]
+"""
+from __future__ import annotations
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+
+from config_loader import load_config
+from llm import LLMMessage, Priority
+from narration_bundle import NarrationBundle
+from session import GameSession
+from state_engine import Transition
+from voice import SentenceSplitter, TTSAudioCache
+
+STATE_PROMPT: str = "Beschreibe dem Spieler in wenigen Sätzen, wo er sich gerade befindet."
+ACTION_PROMPT: str = (
+    "Der Spieler hat gerade diese Aktion ausgeführt: {description}.\n"
+    "Berücksichtige dabei: {after_fire}\n"
+    "Erzähle dem Spieler in wenigen Sätzen, was passiert."
+)
+
+
+class RateLimiter:
+    """Spaces out requests to at most `rate` per second (shared by all worker threads)."""
+
+    def __init__(self, rate: float) -> None:
+        """
+        Args:
+            rate: Requests per second (0 = unlimited)
+        """
+        self.interval: float = 1.0 / rate if rate > 0 else 0.0
+        self._next: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the next request may be sent."""
+        if not self.interval:
+            return
+        with self._lock:
+            now: float = time.monotonic()
+            start: float = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def build_jobs(session: GameSession) -> List[Tuple[str, str, str]]:
+    """
+    Build the prompts of all moments of the map.
+
+    Args:
+        session: Headless game session of the map
+
+    Returns:
+        List of (key, system prompt, user prompt)
+    """
+    engine = session.game_engine
+    state_engine = engine.state_engine
+    controller = engine.controller
+    initial_state: str = state_engine.current_state
+    jobs: List[Tuple[str, str, str]] = []
+
+    try:
+        jobs.append(("welcome", controller._build_base_prompt(),
+                     engine.game_data.get('welcome_prompt') or 'Das Spiel beginnt!'))
+
+        for state_name in state_engine.states:
+            state_engine.current_state = state_name
+            jobs.append((f"state:{state_name}", controller._build_base_prompt(), STATE_PROMPT))
+
+        for action in state_engine.actions:
+            if not isinstance(action, Transition) or not action.after_fire:
+                continue
+            state_engine.current_state = action.state_before
+            user_prompt: str = ACTION_PROMPT.format(description=action.description, after_fire=action.after_fire)
+            jobs.append((f"action:{action.name}", controller._build_base_prompt(), user_prompt))
+    finally:
+        state_engine.current_state = initial_state
+
+    return jobs
+
+
+def generate_text(session: GameSession, bundle: NarrationBundle, job: Tuple[str, str, str],
+                  variants: int, limiter: RateLimiter) -> int:
+    """
+    Generate the missing narration variants of one moment.
+
+    Returns:
+        Number of new variants
+    """
+    key, system_prompt, user_prompt = job
+    provider = session.game_engine.controller.llm_provider
+    messages: List[LLMMessage] = [
+        LLMMessage(role="system", content=system_prompt),
+        LLMMessage(role="user", content=user_prompt)
+    ]
+
+    added: int = 0
+    # Duplicates are dropped, so allow a few extra attempts for low temperatures
+    for _ in range(variants * 2):
+        if len(bundle.variants(key)) >= variants:
+            break
+        limiter.acquire()
+        text: str = provider.chat(messages, priority=Priority.BACKGROUND).content.strip()
+        before: int = len(bundle.variants(key))
+        bundle.add_variant(key, text)
+        added += len(bundle.variants(key)) - before
+    return added
+
+
+def synthesize_audio(session: GameSession, bundle: NarrationBundle, key: str,
+                     audio_cache: TTSAudioCache, limiter: RateLimiter) -> int:
+    """
+    Synthesize the speech of all variants of one moment that have no audio yet.
+
+    Returns:
+        Number of synthesized sentences
+    """
+    voice = session.game_engine.controller.voice_provider
+    synthesized: int = 0
+    for variant in bundle.variants(key):
+        if variant.get("audio"):
+            continue
+        # Same sentence split as SpeechPipeline, so playback finds every sentence
+        splitter: SentenceSplitter = SentenceSplitter()
+        for sentence in splitter.feed(variant["text"]) + splitter.flush():
+            cache_key: str = TTSAudioCache.make_key(voice.__class__.__name__, voice.cache_params(), sentence)
+            if audio_cache.get(cache_key) is not None:
+                continue
+            limiter.acquire()
+            audio_cache.put(cache_key, voice.synthesize(sentence))
+            synthesized += 1
+        bundle.mark_audio(key, variant["text"])
+    return synthesized
+
+
+def run_job(session: GameSession, bundle: NarrationBundle, job: Tuple[str, str, str], variants: int,
+            llm_limiter: RateLimiter, audio_cache: Optional[TTSAudioCache], tts_limiter: RateLimiter) -> str:
+    """Generate text and speech of one moment and save the bundle (progress for resuming)."""
+    key: str = job[0]
+    added: int = generate_text(session, bundle, job, variants, llm_limiter)
+    sentences: int = 0
+    if audio_cache is not None:
+        sentences = synthesize_audio(session, bundle, key, audio_cache, tts_limiter)
+    bundle.save()
+    return f"{key}: {added} new variant(s), {sentences} sentence(s) synthesized"
+
+
+def main() -> int:
+    """Pre-generate the narration bundle of the configured map."""
+    parser = argparse.ArgumentParser(description="Pre-generate narration and speech for the configured map")
+    parser.add_argument("--variants", type=int, default=3, help="narration variants per moment (default: 3)")
+    parser.add_argument("--workers", type=int, default=4, help="parallel jobs (default: 4)")
+    parser.add_argument("--rate", type=float, default=1.0, help="LLM requests per second, 0 = unlimited (default: 1)")
+    parser.add_argument("--tts-rate", type=float, default=2.0, help="TTS requests per second, 0 = unlimited (default: 2)")
+    parser.add_argument("--temperature", type=float, default=0.9, help="LLM temperature for varied narration (default: 0.9)")
+    parser.add_argument("--no-audio", action="store_true", help="only generate text")
+    args = parser.parse_args()
+
+    # Headless session: loads the map, the LLM and the TTS provider like the game does
+    session: GameSession = GameSession(session_id="pregenerate", config=load_config())
+    engine = session.game_engine
+    controller = engine.controller
+    controller.llm_provider.temperature = args.temperature
+
+    bundle: NarrationBundle = NarrationBundle.open_for_update(engine.game_dir, engine.game_data)
+    bundle.model = controller.llm_provider.model
+
+    audio_cache: Optional[TTSAudioCache] = None
+    if not args.no_audio:
+        if controller.voice_provider.SUPPORTS_SYNTHESIS:
+            audio_cache = bundle.create_audio_cache()
+        else:
+            print(f"[NARRATION] {controller.voice_provider.__class__.__name__} cannot synthesize - text only")
+
+    jobs: List[Tuple[str, str, str]] = build_jobs(session)
+    pending: List[Tuple[str, str, str]] = [
+        job for job in jobs
+        if len(bundle.variants(job[0])) < args.variants
+        or (audio_cache is not None and not all(v.get("audio") for v in bundle.variants(job[0])))
+    ]
+    print(f"[NARRATION] {engine.game_dir.name}: {len(jobs)} moments, {len(jobs) - len(pending)} already done")
+
+    llm_limiter: RateLimiter = RateLimiter(args.rate)
+    tts_limiter: RateLimiter = RateLimiter(args.tts_rate)
+    failed: int = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(run_job, session, bundle, job, args.variants, llm_limiter, audio_cache, tts_limiter): job[0]
+            for job in pending
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                print(f"[NARRATION] ({done}/{len(pending)}) {future.result()}")
+            except Exception as e:
+                failed += 1
+                print(f"[ERROR] {futures[future]}: {e}")
+
+    bundle.save()
+    print(f"[NARRATION] Bundle written to {bundle.directory}" + (f" ({failed} failed, run again to resume)" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Cache for LLM answers to repeated player input.
+Players type the same things over and over ("schau dich um", "hilfe") in the
+same room; the answer (narrative + chosen action) is served from memory instead
+of a full LLM round trip.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, TYPE_CHECKING
+
+from metrics import metrics
+
+if TYPE_CHECKING:
+    from state_engine import StateEngine
+
+# Lua/Jinja identifiers (candidates for inventory variable names)
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_input(text: str) -> str:
+    """
+    Normalize player input for cache lookups (case, punctuation, whitespace).
+
+    Args:
+        text: Raw player input
+
+    Returns:
+        Normalized text
+    """
+    text = _PUNCTUATION.sub(" ", text.casefold())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def relevant_variables(state_engine: StateEngine, inventory: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Inventory variables that can change the answer in the current state:
+    variables used in the room description and in the conditions and scripts
+    of the state's actions.
+
+    Args:
+        state_engine: State engine (current state and actions)
+        inventory: Current inventory
+
+    Returns:
+        Subset of the inventory
+    """
+    state_name: str = state_engine.current_state
+    sources: List[str] = [state_engine.get_current_state().get_raw_description()]
+    for action in state_engine.actions:
+        if getattr(action, 'state', None) == state_name or getattr(action, 'state_before', None) == state_name:
+            sources.extend(action.conditions)
+            sources.extend(action.scripts)
+
+    names: Set[str] = set()
+    for source in sources:
+        names.update(_IDENTIFIER.findall(source or ""))
+    return {name: inventory[name] for name in sorted(names) if name in inventory}
+
+
+class ResponseCache:
+    """
+    LRU cache of LLM answers per (game, state, relevant inventory, input).
+
+    Each key holds up to `variants` answers. While a key has fewer, a share
+    of the lookups (`explore`) still goes to the LLM so repeated input gets
+    varied answers; hits pick one of the stored answers at random. Answers
+    expire after ttl_seconds. Maps opt in with "response_cache": true in
+    their config.json.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600.0,
+                 variants: int = 3, explore: float = 0.25) -> None:
+        """
+        Args:
+            max_entries: Maximum number of keys (least recently used are evicted)
+            ttl_seconds: Lifetime of an answer (0 = unlimited)
+            variants: Answers kept per key
+            explore: Probability of asking the LLM anyway while a key has fewer than `variants` answers
+        """
+        self.max_entries: int = max_entries
+        self.ttl_seconds: float = ttl_seconds
+        self.variants: int = variants
+        self.explore: float = explore
+        self.enabled: bool = True
+        self._entries: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """
+        Apply settings from the llm.response_cache section of config.yaml.
+
+        Args:
+            config: Response cache configuration dict
+        """
+        self.enabled = bool(config.get('enabled', True))
+        self.max_entries = int(config.get('max_entries', self.max_entries))
+        self.ttl_seconds = float(config.get('ttl_seconds', self.ttl_seconds))
+        self.variants = int(config.get('variants', self.variants))
+        self.explore = float(config.get('explore', self.explore))
+
+    @staticmethod
+    def make_key(game_hash: str, state: str, variables: Dict[str, Any], user_input: str) -> str:
+        """
+        Build the cache key of a turn.
+
+        Args:
+            game_hash: Hash of the game definition
+            state: Current state name
+            variables: Relevant inventory variables (see relevant_variables)
+            user_input: Player input (normalized here)
+
+        Returns:
+            Hex digest
+        """
+        payload: str = json.dumps(
+            {"game": game_hash, "state": state, "variables": variables, "input": normalize_input(user_input)},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an answer.
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            {"response", "function"} dict, or None on a miss (or an exploring lookup)
+        """
+        now: float = time.monotonic()
+        with self._lock:
+            answers: Optional[List[Dict[str, Any]]] = self._entries.get(key)
+            if answers is not None:
+                if self.ttl_seconds:
+                    answers[:] = [a for a in answers if now - a["created"] < self.ttl_seconds]
+                if not answers:
+                    del self._entries[key]
+                    answers = None
+                else:
+                    self._entries.move_to_end(key)
+            self._publish()
+
+            if not answers:
+                metrics.counter("response_cache_requests_total").inc(result="miss")
+                return None
+            if len(answers) < self.variants and random.random() < self.explore:
+                metrics.counter("response_cache_requests_total").inc(result="explore")
+                return None
+            answer: Dict[str, Any] = random.choice(answers)
+
+        metrics.counter("response_cache_requests_total").inc(result="hit")
+        return {"response": answer["response"], "function": answer["function"]}
+
+    def put(self, key: str, response: str, function: Optional[str]) -> None:
+        """
+        Store an answer (ignored if the key already holds enough variants).
+
+        Args:
+            key: Cache key
+            response: Narrative answer
+            function: Chosen function name (None or "keine_aktion" for no action)
+        """
+        if not response:
+            return
+        with self._lock:
+            answers: List[Dict[str, Any]] = self._entries.setdefault(key, [])
+            self._entries.move_to_end(key)
+            if len(answers) < self.variants and all(a["response"] != response for a in answers):
+                answers.append({"response": response, "function": function, "created": time.monotonic()})
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.counter("response_cache_evictions_total").inc()
+            self._publish()
+
+    def invalidate(self, key: str) -> None:
+        """
+        Drop all answers of a key (e.g. the cached action could not be executed).
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._publish()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and hit rate."""
+        requests = metrics.counter("response_cache_requests_total")
+        hits: float = requests.value(result="hit")
+        total: float = hits + requests.value(result="miss") + requests.value(result="explore")
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+            }
+
+    def _publish(self) -> None:
+        """Update the entry gauge (caller holds the lock)."""
+        metrics.gauge("response_cache_entries").set(len(self._entries))
+
+
+# Process-wide response cache (configured by GameController from config.yaml)
+response_cache: ResponseCache = ResponseCache()
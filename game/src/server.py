@@ -6,10 +6,12 @@ Run with: python server.py
 Or: uvicorn server:app --host 0.0.0.0 --port 9000
 """
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from uuid import uuid4
+import asyncio
 import secrets
 import os
+import threading
 
 from fastapi import FastAPI, HTTPException, Request, Response, status, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse
@@ -23,9 +25,12 @@ load_dotenv()
 
 from session import GameSession
 from config_loader import load_config
-from audio import WebSocketSink
+from audio import PacedAudioSink, WebSocketSink, create_encoder, negotiate_codec
 from sound import WebJukebox
 from messaging import WebSocketMessageQueue
+from metrics import metrics
+from usage import usage_tracker
+from llm import LLMFactory, LLMQueueFullError
 
 # Base directory for game
 GAME_DIR: Path = Path(__file__).parent.parent
@@ -78,10 +83,20 @@ def create_session(session_id: str) -> GameSession:
     """Create a new game session.
     Game definition is loaded from config.yaml (maps_directory + game_name).
     """
+    # Speech is paced to playback speed so a stop cuts it off within the lookahead window
+    audio_config = CONFIG.get('audio', {})
+    audio_sink = WebSocketSink()
+    if audio_config.get('pacing', True):
+        audio_sink = PacedAudioSink(
+            audio_sink,
+            sample_rate=audio_config.get('sample_rate', 24000),
+            lookahead_seconds=audio_config.get('lookahead_seconds', 0.5),
+            playback_rate=1.05  # Browser playback rate (speechHandler.js)
+        )
     return GameSession(
         session_id=session_id,
         config=CONFIG,
-        audio_sink=WebSocketSink(),
+        audio_sink=audio_sink,
         jukebox=WebJukebox()
     )
 
@@ -159,6 +174,26 @@ async def websocket_connect(request: Request):
     return response
 
 
+async def run_turn(session: GameSession, turn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a game turn in a worker thread, one turn per session at a time.
+    Scheduler waits, retries and LLM/TTS calls block; the event loop keeps
+    serving the other sessions (and the WebSocket writers) meanwhile.
+
+    Args:
+        session: Session of the turn
+        turn: controller.process_input or controller.start_game
+        *args: Its arguments
+
+    Returns:
+        Result of the turn
+    """
+    def run() -> Any:
+        with session.turn_lock:
+            return turn(*args)
+    return await asyncio.to_thread(run)
+
+
 @app.post("/api/chat", name="chat")
 async def chat(request: Request, data: ChatMessage):
     """Process chat message."""
@@ -173,14 +208,23 @@ async def chat(request: Request, data: ChatMessage):
         # Restart game - preserve WebSocket state
         old_ws_token = session.ws_token
         old_message_queue = session.message_queue
+        session.cancel("restart")
         session = create_session(session_id)
         session_store[session_id] = session
         session.ws_token = old_ws_token
         session.message_queue = old_message_queue
-        response_text = session.game_engine.controller.start_game()
+        response_text = await run_turn(session, session.game_engine.controller.start_game)
     else:
         session.update_activity()
-        response_text = session.game_engine.controller.process_input(text)
+        try:
+            response_text = await run_turn(session, session.game_engine.controller.process_input, text)
+        except LLMQueueFullError as e:
+            # Admission control rejected the LLM call - tell the client to retry
+            return JSONResponse(
+                {"error": "Der Erzähler ist gerade überlastet. Bitte versuche es gleich noch einmal."},
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(max(1, int(e.retry_after)))}
+            )
     
     # Flush WebSocket messages if connected
     if hasattr(session.message_queue, 'flush'):
@@ -219,20 +263,31 @@ async def websocket_endpoint(websocket: WebSocket, token: str):
         return
     
     # Set up WebSocket message queue with event loop
-    # This allows other threads (like audio playback) to send messages
+    # This allows other threads (like audio playback) to send messages.
+    # All outbound frames go through the queue's single writer task.
     old_queue = session.message_queue
     loop = asyncio.get_event_loop()
-    session.message_queue = WebSocketMessageQueue(websocket, loop=loop)
+    message_queue = WebSocketMessageQueue.from_config(websocket, CONFIG, loop=loop)
+    message_queue.start()
+    session.renew_cancel_token()
+
+    # Negotiate the speech audio codec (clients list what they can decode)
+    client_codecs = [c for c in websocket.query_params.get("codecs", "").split(",") if c]
+    audio_codec = negotiate_codec(client_codecs, CONFIG.get('websocket', {}).get('audio_codecs'))
+    if audio_codec != "pcm":
+        message_queue.audio_encoder = create_encoder(audio_codec)
+    session.message_queue = message_queue
     
-    print(f"[WEBSOCKET] Client connected for session {session_id}")
+    print(f"[WEBSOCKET] Client connected for session {session_id} (audio codec: {audio_codec})")
     
     try:
         # Send initial state
-        await websocket.send_json({
+        message_queue.send_json({
             "type": "connected",
             "data": {
                 "state": session.game_engine.state_engine.get_current_state().name,
-                "inventory": session.game_engine.inventory.to_dict()
+                "inventory": session.game_engine.inventory.to_dict(),
+                "audio_codec": audio_codec
             }
         })
         
@@ -240,26 +295,53 @@ async def websocket_endpoint(websocket: WebSocket, token: str):
         while True:
             message = await websocket.receive_json()
             if message.get("type") == "ping":
-                await websocket.send_json({"type": "pong"})
+                message_queue.send_json({"type": "pong"})
                 
     except WebSocketDisconnect:
         print(f"[WEBSOCKET] Client disconnected for session {session_id}")
     except Exception as e:
         print(f"[WEBSOCKET ERROR] {e}")
     finally:
-        # Restore old message queue
+        # Restore old message queue and stop the writer
         session.message_queue = old_queue
+        await message_queue.close()
+        # Abort LLM/TTS work nobody will hear (stopping speech may block, keep it off the loop)
+        await asyncio.to_thread(session.cancel, "disconnect")
         # Clean up token mapping
         if token in token_to_session:
             del token_to_session[token]
 
 
+@app.on_event("startup")
+async def warmup_llm():
+    """Load the configured LLM backend before the first player arrives (e.g. a local Ollama model)."""
+    def run() -> None:
+        try:
+            LLMFactory().create_provider().warmup()
+        except Exception as e:
+            print(f"[WARNING] LLM warmup failed: {e}")
+
+    threading.Thread(target=run, daemon=True).start()
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint."""
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Runtime metrics (latencies, queues, caches) as JSON."""
+    return metrics.snapshot()
+
+
+@app.get("/usage")
+async def get_usage():
+    """Token usage and latency per provider, game, kind of call and session as JSON."""
+    return usage_tracker.snapshot()
+
+
 if __name__ == "__main__":
     import uvicorn
     print(f"Starting server on http://0.0.0.0:{PORT}{BASE_URI}")
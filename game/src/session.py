@@ -3,9 +3,11 @@ Game Session Management
 Holds user-specific game state and data.
 """
 from __future__ import annotations
+import threading
 from datetime import datetime
 from typing import Any, Dict, Optional, TYPE_CHECKING
 
+from cancellation import CancellationToken
 from messaging import MessageQueue
 from game_engine import GameEngine
 from config_loader import load_config
@@ -52,6 +54,12 @@ class GameSession:
         
         # WebSocket token for web interface
         self.ws_token: Optional[str] = None
+
+        # Cancelled when the client goes away (in-flight LLM/TTS work is aborted)
+        self.cancel_token: CancellationToken = CancellationToken()
+
+        # Held while a turn runs (the web server runs turns in worker threads)
+        self.turn_lock: threading.Lock = threading.Lock()
         
         # GameEngine creates and manages all game components
         # Reads game definition from config.yaml (maps_directory + game_name)
@@ -60,6 +68,27 @@ class GameSession:
     def update_activity(self) -> None:
         """Update last activity timestamp."""
         self.last_activity = datetime.now()
+
+    def cancel(self, reason: str) -> None:
+        """
+        Cancel all in-flight work of this session (LLM call, TTS, playback).
+
+        Args:
+            reason: Why the work is cancelled (e.g. "disconnect")
+        """
+        print(f"[SESSION] Cancelling in-flight work for {self.session_id} ({reason})")
+        self.cancel_token.cancel(reason)
+
+    def renew_cancel_token(self) -> CancellationToken:
+        """
+        Start a fresh cancellation scope (a client (re)connected).
+
+        Returns:
+            The new token
+        """
+        if self.cancel_token.cancelled:
+            self.cancel_token = CancellationToken()
+        return self.cancel_token
     
     def to_dict(self) -> Dict[str, Any]:
         """
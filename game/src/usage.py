@@ -0,0 +1,198 @@
+"""
+Token usage accounting per session, game and provider.
+Aggregates the usage the LLM providers report (prompt, completion and
+prefix-cached tokens) and the call latency in memory, for capacity sizing
+and to spot prompt growth (long histories, changed maps).
+"""
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from metrics import metrics
+
+# Upper bounds of the history length buckets (turn number) of the prompt size trend
+HISTORY_BUCKETS: Tuple[int, ...] = (5, 10, 20, 40, 80)
+
+
+def history_bucket(turn_number: int) -> str:
+    """
+    Bucket label of a turn number ("1-5", "6-10", ..., "81+").
+
+    Args:
+        turn_number: Turn of the game (1 = first turn)
+
+    Returns:
+        Bucket label
+    """
+    lower: int = 1
+    for upper in HISTORY_BUCKETS:
+        if turn_number <= upper:
+            return f"{lower}-{upper}"
+        lower = upper + 1
+    return f"{lower}+"
+
+
+@dataclass
+class UsageStats:
+    """Token and latency totals of a group of LLM calls."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_seconds: float = 0.0
+
+    def add(self, usage: Dict[str, int], latency: float) -> None:
+        """Add one call."""
+        self.calls += 1
+        self.prompt_tokens += usage.get("prompt_tokens", 0) or 0
+        self.completion_tokens += usage.get("completion_tokens", 0) or 0
+        self.cached_tokens += usage.get("cached_tokens", 0) or 0
+        self.latency_seconds += latency
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Totals plus per-call averages, generation speed and cache hit ratio."""
+        calls: int = max(1, self.calls)
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "prompt_tokens_per_call": round(self.prompt_tokens / calls, 1),
+            "completion_tokens_per_call": round(self.completion_tokens / calls, 1),
+            "latency_seconds_per_call": round(self.latency_seconds / calls, 3),
+            "completion_tokens_per_second": (
+                round(self.completion_tokens / self.latency_seconds, 1) if self.latency_seconds > 0 else None
+            ),
+            "cache_hit_ratio": round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else None
+        }
+
+
+class UsageTracker:
+    """
+    In-memory usage accounting.
+
+    Every LLM call is added to its session, its game (map name plus a short
+    hash of the game definition, so an edited map shows up as a new row)
+    and its provider (provider:model). Per game, the prompt size is also
+    kept by history length (see history_bucket) to show how the prompt grows
+    over a game. Per provider, the token throughput of the last
+    window_seconds is reported.
+    """
+
+    def __init__(self, max_sessions: int = 1000, window_seconds: float = 60.0) -> None:
+        """
+        Args:
+            max_sessions: Sessions kept (least recently active are dropped)
+            window_seconds: Time window of the throughput (tokens per second)
+        """
+        self.max_sessions: int = max_sessions
+        self.window_seconds: float = window_seconds
+        self.started_at: float = time.time()
+        self._sessions: "OrderedDict[str, UsageStats]" = OrderedDict()
+        self._games: Dict[str, UsageStats] = {}
+        self._providers: Dict[str, UsageStats] = {}
+        self._kinds: Dict[str, UsageStats] = {}
+        self._trend: Dict[str, Dict[str, UsageStats]] = {}
+        self._recent: Dict[str, Deque[Tuple[float, int]]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """
+        Apply settings from the llm.usage section of config.yaml.
+
+        Args:
+            config: Usage configuration dict
+        """
+        self.max_sessions = int(config.get('max_sessions', self.max_sessions))
+        self.window_seconds = float(config.get('window_seconds', self.window_seconds))
+
+    def record(
+        self,
+        session_id: str,
+        game: str,
+        provider: str,
+        usage: Optional[Dict[str, int]],
+        latency: float,
+        turn_number: int = 0,
+        kind: str = "turn"
+    ) -> None:
+        """
+        Account one LLM call.
+
+        Args:
+            session_id: Session that made the call
+            game: Game label (see UsageTracker)
+            provider: Provider label (provider:model)
+            usage: Usage reported by the provider (None if it reports none)
+            latency: Duration of the call in seconds
+            turn_number: Turn of the game (0 = not a player turn, no trend entry)
+            kind: "turn", "welcome" or "summary"
+        """
+        usage = usage or {}
+        now: float = time.monotonic()
+        tokens: int = (usage.get("prompt_tokens", 0) or 0) + (usage.get("completion_tokens", 0) or 0)
+        with self._lock:
+            self._sessions.setdefault(session_id, UsageStats()).add(usage, latency)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            self._games.setdefault(game, UsageStats()).add(usage, latency)
+            self._providers.setdefault(provider, UsageStats()).add(usage, latency)
+            self._kinds.setdefault(kind, UsageStats()).add(usage, latency)
+            if turn_number > 0:
+                self._trend.setdefault(game, {}).setdefault(history_bucket(turn_number), UsageStats()).add(usage, latency)
+            recent: Deque[Tuple[float, int]] = self._recent.setdefault(provider, deque())
+            recent.append((now, tokens))
+            self._expire(recent, now)
+
+        metrics.counter("llm_usage_tokens_total").inc(usage.get("prompt_tokens", 0) or 0, provider=provider, type="prompt")
+        metrics.counter("llm_usage_tokens_total").inc(usage.get("completion_tokens", 0) or 0, provider=provider, type="completion")
+
+    def session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Usage of one session, or None if it made no LLM call (or was dropped)."""
+        with self._lock:
+            stats: Optional[UsageStats] = self._sessions.get(session_id)
+            return stats.to_dict() if stats else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All aggregates as a JSON-serializable dict."""
+        now: float = time.monotonic()
+        with self._lock:
+            throughput: Dict[str, float] = {}
+            for provider, recent in self._recent.items():
+                self._expire(recent, now)
+                throughput[provider] = round(sum(tokens for _, tokens in recent) / self.window_seconds, 1)
+            return {
+                "since": self.started_at,
+                "window_seconds": self.window_seconds,
+                "providers": {
+                    name: {**stats.to_dict(), "tokens_per_second": throughput.get(name, 0.0)}
+                    for name, stats in self._providers.items()
+                },
+                "games": {
+                    name: {
+                        **stats.to_dict(),
+                        "prompt_tokens_by_history": {
+                            bucket: bucket_stats.to_dict()["prompt_tokens_per_call"]
+                            for bucket, bucket_stats in sorted(
+                                self._trend.get(name, {}).items(), key=lambda item: int(item[0].split("-")[0].rstrip("+"))
+                            )
+                        }
+                    }
+                    for name, stats in self._games.items()
+                },
+                "kinds": {name: stats.to_dict() for name, stats in self._kinds.items()},
+                "sessions": {name: stats.to_dict() for name, stats in self._sessions.items()}
+            }
+
+    def _expire(self, recent: Deque[Tuple[float, int]], now: float) -> None:
+        """Drop throughput samples older than the window (caller holds the lock)."""
+        while recent and now - recent[0][0] > self.window_seconds:
+            recent.popleft()
+
+
+# Process-wide usage accounting (configured by GameController from config.yaml)
+usage_tracker: UsageTracker = UsageTracker()
@@ -5,6 +5,10 @@ Provides text-to-speech functionality with multiple provider implementations.
 from .base_provider import BaseTTSProvider
 from .console_provider import ConsoleTTSProvider
 from .voice_factory import VoiceFactory
+from .sentence_splitter import SentenceSplitter
+from .speech_pipeline import SpeechPipeline
+from .audio_cache import TTSAudioCache
+from .synthesis_pool import SynthesisPool, synthesis_pool
 
 # Optional providers (imported on demand)
 try:
@@ -26,6 +30,11 @@ __all__ = [
     'BaseTTSProvider',
     'ConsoleTTSProvider',
     'VoiceFactory',
+    'SentenceSplitter',
+    'SpeechPipeline',
+    'TTSAudioCache',
+    'SynthesisPool',
+    'synthesis_pool',
     'GoogleTTSProvider',
     'OpenAITTSProvider',
     'XTTSProvider',
@@ -0,0 +1,207 @@
+"""
+Content-addressed on-disk cache for synthesized speech.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from metrics import metrics
+
+# Default cache location: game/cache/tts
+DEFAULT_CACHE_DIR: Path = Path(__file__).parent.parent.parent / "cache" / "tts"
+
+
+class TTSAudioCache:
+    """
+    Stores synthesized PCM segments on local disk.
+
+    Entries are keyed by a hash over everything that affects the audio
+    (provider, voice, model, pitch, rate, sample rate and text), so the same
+    sentence is synthesized only once per voice. The cache is bounded by
+    size and evicts the least recently used entries. Hits are returned as a
+    memoryview over a read-only mmap of the file: writing slices of it into
+    an audio sink neither decodes nor copies the PCM.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Maximum total size of cached audio
+        """
+        self.directory: Path = Path(directory)
+        self.max_bytes: int = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # key -> size in bytes, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._load_index()
+
+    @staticmethod
+    def make_key(provider: str, params: Dict[str, Any], text: str) -> str:
+        """
+        Build the content address of a synthesized segment.
+
+        Args:
+            provider: Provider name
+            params: Everything else that changes the audio (voice, model, pitch, rate, sample rate)
+            text: Text that is spoken
+
+        Returns:
+            Hex digest used as cache key
+        """
+        payload: str = json.dumps({"provider": provider, "params": params, "text": text},
+                                  sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[memoryview]:
+        """
+        Look up a segment.
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            Read-only memoryview over the mmapped PCM, or None on a miss.
+            The mapping is released when the last view is dropped.
+        """
+        with self._lock:
+            size: Optional[int] = self._entries.get(key)
+            if size is not None:
+                self._entries.move_to_end(key)
+
+        if not size:
+            metrics.counter("tts_cache_requests_total").inc(result="miss")
+            return None
+
+        path: Path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                mapped: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            os.utime(path)  # Persist recency for the next process
+        except (OSError, ValueError):
+            # File vanished or is empty - treat as a miss
+            with self._lock:
+                self._forget(key)
+            metrics.counter("tts_cache_requests_total").inc(result="miss")
+            return None
+
+        metrics.counter("tts_cache_requests_total").inc(result="hit")
+        metrics.counter("tts_cache_bytes_saved_total").inc(size)
+        return memoryview(mapped)
+
+    def put(self, key: str, audio: bytes) -> None:
+        """
+        Store a segment (atomically) and evict old entries if the cache is full.
+
+        Args:
+            key: Cache key (see make_key)
+            audio: PCM bytes
+        """
+        if not audio or len(audio) > self.max_bytes:
+            return
+
+        path: Path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARNING] TTS cache write failed: {e}")
+            return
+
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(audio)
+            self._total_bytes += len(audio)
+            self._evict()
+            metrics.gauge("tts_cache_bytes").set(self._total_bytes)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, size and hit rate."""
+        requests = metrics.counter("tts_cache_requests_total")
+        hits: float = requests.value(result="hit")
+        total: float = hits + requests.value(result="miss")
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+            }
+
+    def _path(self, key: str) -> Path:
+        """File path of an entry (sharded by the first two hex digits)."""
+        return self.directory / key[:2] / f"{key}.pcm"
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from the files on disk (oldest mtime first)."""
+        files = []
+        for path in self.directory.glob("*/*.pcm"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+        metrics.gauge("tts_cache_bytes").set(self._total_bytes)
+
+    def _forget(self, key: str) -> None:
+        """Drop an entry from the index (caller holds the lock)."""
+        size: Optional[int] = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits (caller holds the lock)."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+            metrics.counter("tts_cache_evictions_total").inc()
+
+
+# One cache instance per directory (shared by all sessions of the process)
+_caches: Dict[str, TTSAudioCache] = {}
+_caches_lock: threading.Lock = threading.Lock()
+
+
+def get_audio_cache(config: Optional[Dict[str, Any]]) -> Optional[TTSAudioCache]:
+    """
+    Get the shared cache configured in the voice.cache section of config.yaml.
+
+    Args:
+        config: Cache configuration ({enabled, directory, max_mb})
+
+    Returns:
+        TTSAudioCache, or None if caching is disabled
+    """
+    config = config or {}
+    if not config.get('enabled', True):
+        return None
+
+    directory: Path = Path(config.get('directory') or DEFAULT_CACHE_DIR).expanduser()
+    max_bytes: int = int(config.get('max_mb', 256)) * 1024 * 1024
+    with _caches_lock:
+        cache: Optional[TTSAudioCache] = _caches.get(str(directory))
+        if cache is None:
+            cache = TTSAudioCache(directory, max_bytes)
+            _caches[str(directory)] = cache
+        return cache
@@ -2,8 +2,12 @@
 Abstract base class for TTS (Text-to-Speech) providers.
 """
 from __future__ import annotations
+import threading
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+
+from metrics import metrics
+from .audio_cache import TTSAudioCache
 
 if TYPE_CHECKING:
     from session import GameSession
@@ -14,8 +18,17 @@ class BaseTTSProvider(ABC):
     """
     Base class for all TTS providers.
     Each provider generates audio from text and sends it to an audio sink.
+
+    Every utterance gets a generation ID (begin_utterance). Stopping speech
+    only starts a new generation and returns at once; writers of an older
+    generation drop their remaining audio (write_audio) and their threads
+    wind down on their own, so stop() never waits for a synthesis or a
+    blocking sink write.
     """
 
+    # Providers that can synthesize a sentence into a PCM buffer (see synthesize)
+    SUPPORTS_SYNTHESIS: bool = False
+
     def __init__(self, audio_sink: Optional[BaseAudioSink]) -> None:
         """
         Initialize TTS provider with an audio sink.
@@ -24,6 +37,13 @@ class BaseTTSProvider(ABC):
             audio_sink: Audio sink for outputting generated audio
         """
         self.audio_sink: Optional[BaseAudioSink] = audio_sink
+        # Shared on-disk cache of synthesized sentences (set by VoiceFactory)
+        self.audio_cache: Optional[TTSAudioCache] = None
+        # Read-only pre-generated speech of the map (set by GameController)
+        self.bundle_audio_cache: Optional[TTSAudioCache] = None
+        # Generation of the current utterance (see begin_utterance)
+        self._generation: int = 0
+        self._generation_lock: threading.Lock = threading.Lock()
 
     @abstractmethod
     def speak(self, session: GameSession, text: str) -> None:
@@ -45,3 +65,91 @@ class BaseTTSProvider(ABC):
             session: Game session
         """
         pass
+
+    def begin_utterance(self) -> int:
+        """
+        Start a new utterance; audio of all earlier ones becomes stale.
+
+        Returns:
+            Generation ID of the new utterance
+        """
+        with self._generation_lock:
+            self._generation += 1
+            return self._generation
+
+    def cancel_utterance(self) -> None:
+        """Make the current utterance stale without waiting for its writer (non-blocking stop)."""
+        self.begin_utterance()
+
+    def is_current(self, generation: int) -> bool:
+        """True if generation is the utterance that may still be played."""
+        return generation == self._generation
+
+    def write_audio(self, session: GameSession, chunk: Union[bytes, memoryview], generation: int) -> bool:
+        """
+        Write a chunk of an utterance to the audio sink, unless the utterance is stale.
+
+        Args:
+            session: Game session
+            chunk: PCM audio
+            generation: Generation ID of the utterance the chunk belongs to
+
+        Returns:
+            False if the chunk was dropped (the writer should stop)
+        """
+        if not self.is_current(generation):
+            metrics.counter("tts_stale_chunks_dropped_total").inc()
+            return False
+        self.audio_sink.write(session, chunk)
+        return True
+
+    def synthesize(self, text: str) -> bytes:
+        """
+        Synthesize text into raw PCM audio (int16 mono) without playing it.
+        Used by SpeechPipeline to speak a reply sentence by sentence.
+        Only available if SUPPORTS_SYNTHESIS is True.
+
+        Args:
+            text: Text to synthesize
+
+        Returns:
+            PCM audio bytes
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support synthesize()")
+
+    def cache_params(self) -> Dict[str, Any]:
+        """
+        Synthesis settings that change the audio (voice, model, pitch, rate, sample rate).
+        Part of the audio cache key; providers with settings must override this.
+
+        Returns:
+            JSON-serializable settings
+        """
+        return {}
+
+    def synthesize_cached(self, text: str) -> Union[bytes, memoryview]:
+        """
+        synthesize() with the on-disk audio caches in front of it
+        (pre-generated speech of the map first, then the shared cache).
+
+        Args:
+            text: Text to synthesize
+
+        Returns:
+            PCM audio (a memoryview over the mmapped cache file on a hit)
+        """
+        caches = [cache for cache in (self.bundle_audio_cache, self.audio_cache) if cache is not None]
+        if not caches:
+            return self.synthesize(text)
+
+        key: str = TTSAudioCache.make_key(self.__class__.__name__, self.cache_params(), text)
+        for cache in caches:
+            cached: Optional[memoryview] = cache.get(key)
+            if cached is not None:
+                return cached
+        if self.audio_cache is None:
+            return self.synthesize(text)
+
+        audio: bytes = self.synthesize(text)
+        self.audio_cache.put(key, audio)
+        return audio
@@ -4,8 +4,7 @@ Google Cloud Text-to-Speech provider.
 import numpy as np
 import threading
 import re
-from typing import Tuple, Optional
-from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, Tuple, Optional
 
 try:
     import google.cloud.texttospeech as tts
@@ -14,7 +13,35 @@ try:
 except ImportError:
     GOOGLE_TTS_AVAILABLE = False
 
+from metrics import metrics
 from .base_provider import BaseTTSProvider
+from .synthesis_pool import synthesis_pool
+
+# One gRPC client (channel) per API key, shared by all sessions of the process
+_clients: Dict[Optional[str], Any] = {}
+_clients_lock: threading.Lock = threading.Lock()
+
+
+def get_client(api_key: Optional[str] = None) -> Any:
+    """
+    Get the shared TextToSpeechClient for an API key.
+
+    Args:
+        api_key: API key (None = Application Default Credentials)
+
+    Returns:
+        tts.TextToSpeechClient
+    """
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            if api_key:
+                client = tts.TextToSpeechClient(client_options=client_options_lib.ClientOptions(api_key=api_key))
+            else:
+                client = tts.TextToSpeechClient()
+            _clients[api_key] = client
+            metrics.gauge("tts_clients").set(len(_clients), provider="google")
+        return client
 
 
 class GoogleTTSProvider(BaseTTSProvider):
@@ -24,6 +51,8 @@ class GoogleTTSProvider(BaseTTSProvider):
     Supports both API key and Application Default Credentials (ADC).
     """
 
+    SUPPORTS_SYNTHESIS = True
+
     def __init__(self, audio_sink, language_code: str = "de-DE", voice_name: str = "de-DE-Journey-D",
                  sample_rate: int = 24000, api_key: Optional[str] = None,
                  model_name: Optional[str] = None, voice_prompt: Optional[str] = None,
@@ -53,16 +82,10 @@ class GoogleTTSProvider(BaseTTSProvider):
         self.voice_prompt = voice_prompt
         self.pitch = pitch
         self.speaking_rate = speaking_rate
-        self.stop_event = threading.Event()
         self.audio_thread = None
 
-        # Initialize client with API key or ADC
-        if api_key:
-            client_options = client_options_lib.ClientOptions(api_key=api_key)
-            self.client = tts.TextToSpeechClient(client_options=client_options)
-        else:
-            # Use Application Default Credentials
-            self.client = tts.TextToSpeechClient()
+        # Shared client with API key or ADC (thread-safe, one channel per process)
+        self.client = get_client(api_key)
 
     def speak(self, session, text: str) -> None:
         """
@@ -78,52 +101,75 @@ class GoogleTTSProvider(BaseTTSProvider):
 
         # Clean text
         text = text.replace("\n", " ")
-        self.stop_event.clear()
+        generation = self.begin_utterance()
 
         # Split text into first sentence and rest for faster initial response
         first_part, second_part = self._split_text(text)
 
-        # Synthesize in parallel
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            future_first = executor.submit(self._synthesize_text, first_part)
-            future_second = executor.submit(self._synthesize_text, second_part) if second_part else None
-
-            wait([future_first, future_second] if future_second else [future_first], return_when=FIRST_COMPLETED)
-            audio_data_first = self._apply_fade_in(future_first.result())
-
-            def play_audio():
-                try:
-                    # Play first part
-                    self._stream_audio(session, audio_data_first)
-
-                    # Play second part if available
-                    if future_second and not self.stop_event.is_set():
-                        audio_data_second = self._apply_fade_in(future_second.result())
-                        self._stream_audio(session, audio_data_second)
-                except Exception as e:
-                    print(f"[ERROR] Google TTS playback error: {e}")
-                finally:
-                    self.stop(session)
+        # Synthesize in parallel on the shared pool (through the audio cache, with fade-in)
+        owner: str = getattr(session, 'session_id', None) or str(id(self))
+        future_first = synthesis_pool.submit(owner, self.synthesize_cached, first_part)
+        future_second = synthesis_pool.submit(owner, self.synthesize_cached, second_part) if second_part else None
+        audio_data_first = np.frombuffer(future_first.result(), dtype=np.int16)
+        if not self.is_current(generation):
+            # Stopped while the first part was synthesized
+            if future_second:
+                future_second.cancel()
+            return
 
-            # Text output is handled by game controller, not here
-            self.audio_thread = threading.Thread(target=play_audio, daemon=True)
-            self.audio_thread.start()
+        def play_audio():
+            try:
+                # Play first part
+                self._stream_audio(session, audio_data_first, generation)
+
+                # Play second part if available
+                if future_second and self.is_current(generation):
+                    audio_data_second = np.frombuffer(future_second.result(), dtype=np.int16)
+                    self._stream_audio(session, audio_data_second, generation)
+            except Exception as e:
+                print(f"[ERROR] Google TTS playback error: {e}")
+            finally:
+                if future_second:
+                    future_second.cancel()
+
+        # Text output is handled by game controller, not here
+        self.audio_thread = threading.Thread(target=play_audio, daemon=True)
+        self.audio_thread.start()
 
     def stop(self, session) -> None:
         """
-        Stop current speech.
+        Stop current speech without waiting for the playback thread
+        (it drops its remaining audio and ends on its own).
 
         Args:
             session: Game session
         """
-        self.stop_event.set()
+        self.cancel_utterance()
+        self.audio_thread = None
+
+    def synthesize(self, text: str) -> bytes:
+        """
+        Synthesize a single sentence to PCM bytes (with fade-in).
 
-        try:
-            if (self.audio_thread is not None and self.audio_thread.is_alive() and threading.current_thread() != self.audio_thread):
-                self.audio_thread.join()
-            self.audio_thread = None
-        except Exception as e:
-            print(f"[ERROR] Google TTS stop error: {e}")
+        Args:
+            text: Text to synthesize
+
+        Returns:
+            int16 PCM audio bytes
+        """
+        return self._apply_fade_in(self._synthesize_text(text.replace("\n", " "))).tobytes()
+
+    def cache_params(self) -> Dict[str, Any]:
+        """Settings that change the synthesized audio (audio cache key)."""
+        return {
+            "language_code": self.language_code,
+            "voice_name": self.voice_name,
+            "model_name": self.model_name,
+            "voice_prompt": self.voice_prompt,
+            "pitch": self.pitch,
+            "speaking_rate": self.speaking_rate,
+            "sample_rate": self.sample_rate,
+        }
 
     def _synthesize_text(self, text: str) -> np.ndarray:
         """
@@ -175,20 +221,23 @@ class GoogleTTSProvider(BaseTTSProvider):
         audio_data = np.frombuffer(response.audio_content, dtype=np.int16)
         return audio_data
 
-    def _stream_audio(self, session, audio_data: np.ndarray, chunk_size: int = 1024) -> None:
+    def _stream_audio(self, session, audio_data: np.ndarray, generation: int, chunk_size: int = 1024) -> None:
         """
         Stream audio data in chunks to audio sink.
 
         Args:
             session: Game session
             audio_data: Audio data to stream
+            generation: Utterance the audio belongs to (stale audio is dropped)
             chunk_size: Chunk size in samples
         """
         for i in range(0, len(audio_data), chunk_size):
-            if self.stop_event.is_set():
-                break
             chunk = audio_data[i:i + chunk_size].tobytes()
-            self.audio_sink.write(session, chunk)
+            if not self.write_audio(session, chunk, generation):
+                metrics.counter("cancelled_audio_seconds_saved_total").inc(
+                    (len(audio_data) - i) / self.sample_rate, stage="playback", reason="stopped"
+                )
+                break
 
     def _apply_fade_in(self, audio_data: np.ndarray, duration_ms: int = 10) -> np.ndarray:
         """
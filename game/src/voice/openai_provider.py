@@ -3,16 +3,43 @@ OpenAI Text-to-Speech provider.
 """
 import threading
 import time
+from typing import Dict, Optional
 from openai import OpenAI
 
+from metrics import metrics
 from .base_provider import BaseTTSProvider
 
+# One HTTP client (connection pool) per API key, shared by all sessions of the process
+_clients: Dict[Optional[str], OpenAI] = {}
+_clients_lock: threading.Lock = threading.Lock()
+
+
+def get_client(api_key: Optional[str] = None) -> OpenAI:
+    """
+    Get the shared OpenAI client for an API key.
+
+    Args:
+        api_key: API key (None = OPENAI_API_KEY env var)
+
+    Returns:
+        OpenAI client
+    """
+    with _clients_lock:
+        client: Optional[OpenAI] = _clients.get(api_key)
+        if client is None:
+            client = OpenAI(api_key=api_key) if api_key else OpenAI()
+            _clients[api_key] = client
+            metrics.gauge("tts_clients").set(len(_clients), provider="openai")
+        return client
+
 
 class OpenAITTSProvider(BaseTTSProvider):
     """
     OpenAI TTS provider with streaming support.
     """
 
+    SUPPORTS_SYNTHESIS = True
+
     def __init__(self, audio_sink, api_key: str = None, voice: str = "onyx", speed: float = 1.2, model: str = "tts-1"):
         """
         Initialize OpenAI TTS provider.
@@ -25,11 +52,10 @@ class OpenAITTSProvider(BaseTTSProvider):
             model: Model to use (tts-1 or tts-1-hd)
         """
         super().__init__(audio_sink)
-        self.client = OpenAI(api_key=api_key) if api_key else OpenAI()
+        self.client = get_client(api_key)
         self.voice = voice
         self.speed = speed
         self.model = model
-        self.stop_event = threading.Event()
         self.audio_thread = None
         self.max_retries = 3
 
@@ -41,15 +67,26 @@ class OpenAITTSProvider(BaseTTSProvider):
             session: Game session
             text: Text to speak
         """
-        # Stop any ongoing playback
-        self.stop(session)
-        self.stop_event.clear()
+        # Older playback (if any) drops its remaining audio
+        generation = self.begin_utterance()
 
         def play_audio():
             try:
+                # Cache hit: stream the mmapped PCM without a TTS round trip
+                cache_key = None
+                if self.audio_cache is not None:
+                    cache_key = self.audio_cache.make_key(self.__class__.__name__, self.cache_params(), text)
+                    cached = self.audio_cache.get(cache_key)
+                    if cached is not None:
+                        for i in range(0, len(cached), 8192):
+                            if not self.write_audio(session, cached[i:i + 8192], generation):
+                                break
+                        return
+
                 retries = 0
                 while retries < self.max_retries:
                     try:
+                        received = []
                         with self.client.audio.speech.with_streaming_response.create(
                             input=text,
                             speed=self.speed,
@@ -59,9 +96,13 @@ class OpenAITTSProvider(BaseTTSProvider):
                         ) as response:
                             # Text output is handled by game controller, not here
                             for chunk in response.iter_bytes(chunk_size=8192):
-                                if self.stop_event.is_set():
+                                if not self.write_audio(session, chunk, generation):
                                     break
-                                self.audio_sink.write(session, chunk)
+                                received.append(chunk)
+                            else:
+                                # Only complete utterances go into the cache
+                                if cache_key is not None:
+                                    self.audio_cache.put(cache_key, b"".join(received))
                         break  # Success
                     except (ConnectionError, TimeoutError) as e:
                         retries += 1
@@ -76,18 +117,36 @@ class OpenAITTSProvider(BaseTTSProvider):
         self.audio_thread = threading.Thread(target=play_audio, daemon=True)
         self.audio_thread.start()
 
+    def synthesize(self, text: str) -> bytes:
+        """
+        Synthesize a single sentence to PCM bytes (24 kHz, int16 mono).
+
+        Args:
+            text: Text to synthesize
+
+        Returns:
+            PCM audio bytes
+        """
+        with self.client.audio.speech.with_streaming_response.create(
+            input=text,
+            speed=self.speed,
+            response_format="pcm",
+            voice=self.voice,
+            model=self.model
+        ) as response:
+            return response.read()
+
+    def cache_params(self) -> dict:
+        """Settings that change the synthesized audio (audio cache key)."""
+        return {"voice": self.voice, "model": self.model, "speed": self.speed, "sample_rate": 24000}
+
     def stop(self, session) -> None:
         """
-        Stop current speech.
+        Stop current speech without waiting for the playback thread
+        (it drops its remaining audio, closes the stream and ends on its own).
 
         Args:
             session: Game session
         """
-        try:
-            self.stop_event.set()
-
-            if self.audio_thread is not None and self.audio_thread.is_alive():
-                self.audio_thread.join()
-            self.audio_thread = None
-        except Exception as e:
-            print(f"[ERROR] OpenAI TTS stop error: {e}")
+        self.cancel_utterance()
+        self.audio_thread = None
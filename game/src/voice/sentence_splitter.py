@@ -0,0 +1,71 @@
+"""
+Incremental sentence splitter for streamed narrative text.
+"""
+from __future__ import annotations
+import re
+from typing import List
+
+# Common German abbreviations that end with a dot but do not end a sentence
+ABBREVIATIONS = {
+    "z.b.", "d.h.", "u.a.", "usw.", "bzw.", "ca.", "dr.", "nr.", "evtl.",
+    "ggf.", "inkl.", "etc.", "vgl.", "s.", "st.", "hr.", "fr.", "prof."
+}
+
+
+class SentenceSplitter:
+    """
+    Splits a stream of text fragments into complete sentences.
+
+    Fragments are fed as they arrive from the LLM; every time a sentence
+    boundary is seen the completed sentence is returned. Very short
+    sentences are merged with the next one so the TTS provider is not
+    called for single words like "Ha!".
+    """
+
+    _BOUNDARY = re.compile(r'[.!?…]+["»«\')]*\s+')
+
+    def __init__(self, min_chars: int = 20) -> None:
+        """
+        Args:
+            min_chars: Minimum length of an emitted sentence
+        """
+        self.min_chars: int = min_chars
+        self._buffer: str = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add a text fragment.
+
+        Args:
+            text: Narrative fragment
+
+        Returns:
+            List of completed sentences (may be empty)
+        """
+        self._buffer += text
+        sentences: List[str] = []
+        start: int = 0
+
+        for match in self._BOUNDARY.finditer(self._buffer):
+            candidate: str = self._buffer[start:match.end()].strip()
+            if len(candidate) < self.min_chars or self._ends_with_abbreviation(candidate):
+                continue
+            sentences.append(candidate.replace("\n", " "))
+            start = match.end()
+
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """
+        Return whatever is left in the buffer as the final sentence.
+        """
+        rest: str = self._buffer.strip()
+        self._buffer = ""
+        return [rest.replace("\n", " ")] if rest else []
+
+    @staticmethod
+    def _ends_with_abbreviation(sentence: str) -> bool:
+        """Check whether the sentence candidate ends with a known abbreviation."""
+        last_word: str = sentence.rsplit(None, 1)[-1].lower()
+        return last_word in ABBREVIATIONS
@@ -0,0 +1,191 @@
+"""
+Sentence-pipelined speech output.
+Synthesizes narrative sentence by sentence while the LLM is still generating.
+"""
+from __future__ import annotations
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from metrics import metrics
+from .sentence_splitter import SentenceSplitter
+from .synthesis_pool import synthesis_pool
+
+if TYPE_CHECKING:
+    from session import GameSession
+    from .base_provider import BaseTTSProvider
+
+
+class SpeechPipeline:
+    """
+    One pipeline per spoken reply.
+
+    Narrative fragments are fed as they stream in from the LLM. Completed
+    sentences are synthesized in parallel on the process-wide synthesis
+    pool (fair across sessions, see synthesis_pool.py), and a single writer
+    thread streams the audio into the provider's audio sink in sentence
+    order. Time-to-first-audio is recorded per reply.
+
+    stop() never waits: the writer drops the rest of the reply (also once
+    the provider starts another utterance, see BaseTTSProvider) and ends
+    on its own after the synthesis or sink write it is blocked in.
+    """
+
+    CHUNK_BYTES: int = 2048  # 1024 int16 samples
+    CHARS_PER_SECOND: float = 14.0  # Rough German speech rate (estimate for unsynthesized text)
+
+    def __init__(
+        self,
+        session: GameSession,
+        provider: BaseTTSProvider,
+        started_at: Optional[float] = None
+    ) -> None:
+        """
+        Args:
+            session: Game session (for session-aware audio routing)
+            provider: TTS provider with synthesis support
+            started_at: perf_counter() timestamp the turn started (for latency metrics)
+        """
+        self.session: GameSession = session
+        self.provider: BaseTTSProvider = provider
+        self.started_at: float = started_at if started_at is not None else time.perf_counter()
+        self.stop_event: threading.Event = threading.Event()
+        # Audio of this reply is dropped once the provider starts another utterance
+        self.generation: int = provider.begin_utterance()
+
+        self._splitter: SentenceSplitter = SentenceSplitter()
+        self._futures: "queue.Queue[Optional[Tuple[Future, str]]]" = queue.Queue()
+        self._text: str = ""
+        self._streamed: bool = False
+        self._finished: bool = False
+        self._reason: str = "interrupted"
+        self._first_sentence_at: Optional[float] = None
+        self._first_audio_at: Optional[float] = None
+
+        self._writer: threading.Thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    @property
+    def mode(self) -> str:
+        """'streamed' if text arrived while the LLM was generating, else 'buffered'."""
+        return "streamed" if self._streamed else "buffered"
+
+    def feed(self, fragment: str) -> None:
+        """
+        Feed a narrative fragment while the LLM is still generating.
+
+        Args:
+            fragment: Decoded narrative text
+        """
+        if self._finished or self.stop_event.is_set():
+            return
+        self._streamed = True
+        self._append(fragment)
+
+    def finish(self, final_text: str) -> None:
+        """
+        Mark the reply as complete.
+        Speaks the full text if nothing was streamed, otherwise only the part
+        of final_text that extends the streamed narrative.
+
+        Args:
+            final_text: Final narrative text as returned to the player
+        """
+        if self._finished:
+            return
+        if not self._text:
+            self._append(final_text)
+        elif final_text.startswith(self._text):
+            self._append(final_text[len(self._text):])
+
+        for sentence in self._splitter.flush():
+            self._submit(sentence)
+
+        self._finished = True
+        self._futures.put(None)
+
+    def stop(self, reason: str = "interrupted") -> None:
+        """
+        Cancel the reply: pending syntheses are dropped and playback stops.
+
+        Args:
+            reason: Why speech was stopped (metrics label, e.g. "interrupted", "disconnect")
+        """
+        if self.stop_event.is_set():
+            return
+        self.stop_event.set()
+        self._reason = reason
+        self._finished = True
+
+        # Sentences whose synthesis never started are work saved
+        cancelled_chars: int = 0
+        while True:
+            try:
+                item = self._futures.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[0].cancel():
+                cancelled_chars += len(item[1])
+                metrics.counter("cancelled_work_total").inc(kind="tts", reason=reason)
+        if cancelled_chars:
+            metrics.counter("cancelled_audio_seconds_saved_total").inc(
+                cancelled_chars / self.CHARS_PER_SECOND, stage="synthesis", reason=reason
+            )
+
+        self._futures.put(None)
+
+    def _append(self, text: str) -> None:
+        """Add text and submit completed sentences."""
+        if not text:
+            return
+        self._text += text
+        for sentence in self._splitter.feed(text):
+            self._submit(sentence)
+
+    def _submit(self, sentence: str) -> None:
+        """Schedule synthesis for one sentence (order is kept by the futures queue)."""
+        if self.stop_event.is_set():
+            return
+        if self._first_sentence_at is None:
+            self._first_sentence_at = time.perf_counter()
+            metrics.histogram("speech_time_to_first_sentence_seconds").observe(
+                self._first_sentence_at - self.started_at, mode=self.mode
+            )
+        metrics.counter("speech_sentences_total").inc(mode=self.mode)
+        future: Future = synthesis_pool.submit(self.session.session_id, self.provider.synthesize_cached, sentence)
+        self._futures.put((future, sentence))
+
+    def _write_loop(self) -> None:
+        """Write synthesized audio to the sink in sentence order."""
+        sink = self.provider.audio_sink
+        while True:
+            item: Optional[Tuple[Future, str]] = self._futures.get()
+            if item is None or self.stop_event.is_set():
+                if item is None and not self.stop_event.is_set() and self.provider.is_current(self.generation):
+                    sink.flush(self.session)
+                break
+            try:
+                audio = item[0].result()  # bytes, or a zero-copy memoryview on a cache hit
+            except CancelledError:
+                break
+            except Exception as e:
+                print(f"[ERROR] Speech synthesis failed: {e}")
+                continue
+
+            for i in range(0, len(audio), self.CHUNK_BYTES):
+                if self.stop_event.is_set():
+                    # Synthesized audio that is never sent
+                    metrics.counter("cancelled_audio_seconds_saved_total").inc(
+                        (len(audio) - i) / 2 / getattr(self.provider, 'sample_rate', 24000),
+                        stage="playback", reason=self._reason
+                    )
+                    return
+                if self._first_audio_at is None:
+                    self._first_audio_at = time.perf_counter()
+                    metrics.histogram("speech_time_to_first_audio_seconds").observe(
+                        self._first_audio_at - self.started_at, mode=self.mode
+                    )
+                if not self.provider.write_audio(self.session, audio[i:i + self.CHUNK_BYTES], self.generation):
+                    return
@@ -0,0 +1,157 @@
+"""
+Process-wide worker pool for speech synthesis.
+Bounds the synthesis threads of all sessions and serves sessions in turn.
+"""
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from metrics import metrics
+
+
+class _Job:
+    """A queued synthesis call."""
+
+    def __init__(self, owner: str, fn: Callable[..., Any], args: tuple) -> None:
+        self.owner: str = owner
+        self.fn: Callable[..., Any] = fn
+        self.args: tuple = args
+        self.future: Future = Future()
+        self.queued_at: float = time.perf_counter()
+
+
+class SynthesisPool:
+    """
+    Fixed number of synthesis workers shared by all sessions.
+
+    Every session (owner) has its own FIFO queue; idle workers take the
+    next job round-robin over the sessions, and a session never runs more
+    than max_per_session jobs at once. A long reply of one session thus
+    cannot starve the first sentence of another. Jobs are futures:
+    cancelling one that has not started removes it (SpeechPipeline.stop).
+    Threads are started on demand up to workers and then kept.
+    """
+
+    def __init__(self, workers: int = 8, max_per_session: int = 2) -> None:
+        """
+        Args:
+            workers: Maximum number of synthesis threads
+            max_per_session: Maximum concurrent jobs of one session
+        """
+        self.workers: int = workers
+        self.max_per_session: int = max_per_session
+        self._queues: "OrderedDict[str, Deque[_Job]]" = OrderedDict()
+        self._running: Dict[str, int] = {}
+        self._threads: List[threading.Thread] = []
+        self._idle: int = 0
+        self._busy: int = 0
+        self._queued: int = 0
+        self._condition: threading.Condition = threading.Condition()
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """
+        Apply settings from the voice.pool section of config.yaml.
+
+        Args:
+            config: Pool configuration dict
+        """
+        with self._condition:
+            self.workers = max(1, int(config.get('workers', self.workers)))
+            self.max_per_session = max(1, int(config.get('max_per_session', self.max_per_session)))
+            # Surplus workers exit once idle
+            self._condition.notify_all()
+
+    def submit(self, owner: str, fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        Queue a synthesis call.
+
+        Args:
+            owner: Session the job belongs to (fairness key)
+            fn: Function to run (e.g. provider.synthesize_cached)
+            *args: Its arguments
+
+        Returns:
+            Future of the result
+        """
+        job: _Job = _Job(owner, fn, args)
+        with self._condition:
+            self._queues.setdefault(owner, deque()).append(job)
+            self._queued += 1
+            if self._idle == 0 and len(self._threads) < self.workers:
+                thread: threading.Thread = threading.Thread(target=self._work, name="tts-synthesis", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify()
+            self._update_gauges()
+        return job.future
+
+    def _next(self) -> Optional[_Job]:
+        """Next job round-robin over the sessions (caller holds the lock)."""
+        for owner in list(self._queues):
+            queue: Deque[_Job] = self._queues[owner]
+            while queue and queue[0].future.cancelled():
+                queue.popleft()
+                self._queued -= 1
+            if not queue:
+                del self._queues[owner]
+                continue
+            if self._running.get(owner, 0) >= self.max_per_session:
+                continue
+            job: _Job = queue.popleft()
+            self._queued -= 1
+            # This session goes to the back of the rotation
+            self._queues.move_to_end(owner)
+            if not queue:
+                del self._queues[owner]
+            return job
+        return None
+
+    def _work(self) -> None:
+        """Worker loop."""
+        while True:
+            with self._condition:
+                job: Optional[_Job] = None
+                while job is None:
+                    if len(self._threads) > self.workers:
+                        self._threads.remove(threading.current_thread())
+                        self._update_gauges()
+                        return
+                    job = self._next()
+                    if job is None:
+                        self._idle += 1
+                        self._condition.wait()
+                        self._idle -= 1
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                self._running[job.owner] = self._running.get(job.owner, 0) + 1
+                self._busy += 1
+                self._update_gauges()
+
+            metrics.histogram("tts_pool_queue_seconds").observe(time.perf_counter() - job.queued_at)
+            try:
+                job.future.set_result(job.fn(*job.args))
+            except BaseException as e:
+                job.future.set_exception(e)
+
+            with self._condition:
+                self._running[job.owner] -= 1
+                if not self._running[job.owner]:
+                    del self._running[job.owner]
+                self._busy -= 1
+                self._update_gauges()
+                # A job of this session may have waited for the per-session limit
+                self._condition.notify()
+
+    def _update_gauges(self) -> None:
+        """Export pool utilization (caller holds the lock)."""
+        metrics.gauge("tts_pool_threads").set(len(self._threads))
+        metrics.gauge("tts_pool_busy").set(self._busy)
+        metrics.gauge("tts_pool_queued").set(self._queued)
+        metrics.gauge("tts_pool_utilization").set(self._busy / self.workers)
+
+
+# Process-wide synthesis pool (configured by VoiceFactory from config.yaml)
+synthesis_pool: SynthesisPool = SynthesisPool()
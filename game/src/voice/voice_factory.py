@@ -9,6 +9,8 @@ from typing import Any, Dict, Optional, TYPE_CHECKING
 
 from .base_provider import BaseTTSProvider
 from .console_provider import ConsoleTTSProvider
+from .audio_cache import get_audio_cache
+from .synthesis_pool import synthesis_pool
 
 if TYPE_CHECKING:
     from audio.base_sink import BaseAudioSink
@@ -19,19 +21,26 @@ class VoiceFactory:
     Factory for creating TTS providers based on configuration.
     """
 
-    def __init__(self, config_path: Optional[str] = None) -> None:
+    def __init__(self, config_path: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> None:
         """
         Initialize factory with configuration.
 
         Args:
             config_path: Path to config.yaml. If None, looks for config.yaml in game/
+            config: Already loaded configuration (e.g. GameSession.config); its
+                    voice section is used instead of reading config_path
         """
         if config_path is None:
             # Default to dungeon/config.yaml (project root)
             config_path = Path(__file__).parent.parent.parent.parent / "config.yaml"
 
         self.config_path: Path = Path(config_path)
-        self.config: Dict[str, Any] = self._load_config()
+        if config is not None:
+            self.config: Dict[str, Any] = config.get('voice', {})
+        else:
+            self.config: Dict[str, Any] = self._load_config()
+        # Synthesis threads shared by all sessions (voice.pool in config.yaml)
+        synthesis_pool.configure(self.config.get('pool', {}))
 
     def _load_config(self) -> Dict[str, Any]:
         """
@@ -61,6 +70,14 @@ class VoiceFactory:
         Returns:
             TTS provider instance
         """
+        provider: BaseTTSProvider = self._create_provider(audio_sink)
+        if provider.SUPPORTS_SYNTHESIS:
+            # Shared on-disk cache of synthesized sentences (voice.cache in config.yaml)
+            provider.audio_cache = get_audio_cache(self.config.get('cache'))
+        return provider
+
+    def _create_provider(self, audio_sink: Optional[BaseAudioSink]) -> BaseTTSProvider:
+        """Instantiate the configured provider (see create_provider)."""
         if not self.config.get('enabled', False):
             return ConsoleTTSProvider(audio_sink)
 
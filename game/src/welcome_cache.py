@@ -0,0 +1,183 @@
+"""
+Cache for the LLM-generated welcome turn.
+Every new session of the same game starts from the same prompt, so the
+welcome text is generated ahead of time and served from a small pool.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import random
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from metrics import metrics
+
+# Default cache location: game/cache/welcome
+DEFAULT_CACHE_DIR: Path = Path(__file__).parent.parent / "cache" / "welcome"
+
+
+class WelcomeCache:
+    """
+    Pool of welcome texts per game start situation.
+
+    Entries are keyed by a hash over the game definition, the initial
+    inventory, the prompts and the model. Each key holds up to pool_size
+    varied generations; an entry is served at most max_uses times and then
+    replaced. Refills run in a background thread at background priority.
+    Pools are persisted as JSON so a restarted server starts instantly.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, pool_size: int = 3, max_uses: int = 20) -> None:
+        """
+        Args:
+            directory: Directory for persisted pools
+            pool_size: Number of varied generations kept per key
+            max_uses: How often one generation is served before it is replaced (0 = unlimited)
+        """
+        self.directory: Path = Path(directory)
+        self.pool_size: int = pool_size
+        self.max_uses: int = max_uses
+        self.enabled: bool = True
+        self.presynthesize: bool = True
+        self._pools: Dict[str, List[Dict[str, Any]]] = {}
+        self._refilling: Set[str] = set()
+        self._lock: threading.Lock = threading.Lock()
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """
+        Apply settings from the llm.welcome_cache section of config.yaml.
+
+        Args:
+            config: Welcome cache configuration dict
+        """
+        self.enabled = bool(config.get('enabled', True))
+        self.pool_size = int(config.get('pool_size', self.pool_size))
+        self.max_uses = int(config.get('max_uses', self.max_uses))
+        self.presynthesize = bool(config.get('presynthesize', True))
+        if config.get('directory'):
+            self.directory = Path(config['directory']).expanduser()
+
+    @staticmethod
+    def make_key(game_data: Dict[str, Any], inventory: Dict[str, Any], base_prompt: str,
+                 welcome_prompt: str, model: str) -> str:
+        """
+        Build the cache key of a game start situation.
+
+        Args:
+            game_data: Game definition
+            inventory: Initial inventory
+            base_prompt: System prompt of the welcome turn
+            welcome_prompt: User prompt of the welcome turn
+            model: LLM model name
+
+        Returns:
+            Hex digest
+        """
+        payload: str = json.dumps(
+            {"game": game_data, "inventory": inventory, "base_prompt": base_prompt,
+             "welcome_prompt": welcome_prompt, "model": model},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def take(self, key: str) -> Optional[str]:
+        """
+        Serve a welcome text from the pool.
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            Welcome text, or None if the pool is empty
+        """
+        with self._lock:
+            pool: List[Dict[str, Any]] = self._pool(key)
+            if not pool:
+                metrics.counter("welcome_cache_requests_total").inc(result="miss")
+                return None
+
+            # Prefer the least used entries so players see some variety
+            fewest: int = min(entry["uses"] for entry in pool)
+            entry: Dict[str, Any] = random.choice([e for e in pool if e["uses"] == fewest])
+            entry["uses"] += 1
+            if self.max_uses and entry["uses"] >= self.max_uses:
+                pool.remove(entry)
+            self._save(key)
+
+        metrics.counter("welcome_cache_requests_total").inc(result="hit")
+        return entry["text"]
+
+    def add(self, key: str, text: str) -> None:
+        """
+        Add a generation to the pool (ignored if the pool is full).
+
+        Args:
+            key: Cache key
+            text: Welcome text
+        """
+        if not text:
+            return
+        with self._lock:
+            pool: List[Dict[str, Any]] = self._pool(key)
+            if len(pool) < self.pool_size and all(entry["text"] != text for entry in pool):
+                pool.append({"text": text, "uses": 0})
+                self._save(key)
+
+    def refill(self, key: str, generate: Callable[[], Optional[str]]) -> None:
+        """
+        Top the pool up to pool_size in a background thread (no-op if full or already running).
+
+        Args:
+            key: Cache key
+            generate: Produces one welcome text (None on failure)
+        """
+        with self._lock:
+            if key in self._refilling or len(self._pool(key)) >= self.pool_size:
+                return
+            self._refilling.add(key)
+
+        def run() -> None:
+            try:
+                for _ in range(self.pool_size):
+                    with self._lock:
+                        if len(self._pool(key)) >= self.pool_size:
+                            break
+                    text: Optional[str] = generate()
+                    if not text:
+                        break
+                    self.add(key, text)
+                    metrics.counter("welcome_cache_refills_total").inc()
+            except Exception as e:
+                print(f"[WARNING] Welcome cache refill failed: {e}")
+            finally:
+                with self._lock:
+                    self._refilling.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _pool(self, key: str) -> List[Dict[str, Any]]:
+        """Get the pool for a key, loading it from disk on first access (caller holds the lock)."""
+        if key not in self._pools:
+            path: Path = self.directory / f"{key}.json"
+            try:
+                self._pools[key] = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._pools[key] = []
+        return self._pools[key]
+
+    def _save(self, key: str) -> None:
+        """Persist a pool atomically (caller holds the lock)."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path: Path = self.directory / f"{key}.json"
+            tmp_path: Path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self._pools[key], ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARNING] Welcome cache write failed: {e}")
+
+
+# Process-wide welcome cache (configured by GameController from config.yaml)
+welcome_cache: WelcomeCache = WelcomeCache()
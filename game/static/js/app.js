@@ -36,7 +36,10 @@ class GameApp {
      */
     registerHandlers() {
         // State/Inventory handlers
-        this.messageHandler.register('connected', (data) => this.stateHandler.handleConnected(data));
+        this.messageHandler.register('connected', (data) => {
+            this.speechHandler.setCodec(data.audio_codec);
+            this.stateHandler.handleConnected(data);
+        });
         this.messageHandler.register('inventory_update', (data) => this.stateHandler.handleInventoryUpdate(data));
         this.messageHandler.register('state_change', (data) => this.stateHandler.handleStateChange(data));
         
@@ -69,7 +72,8 @@ class GameApp {
             console.log('[WS] Got token, connecting...');
 
             const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-            const wsUrl = `${wsProtocol}//${window.location.host}${this.baseUri}/websocket/${this.token}`;
+            const codecs = AudioCodecs.supported().join(',');
+            const wsUrl = `${wsProtocol}//${window.location.host}${this.baseUri}/websocket/${this.token}?codecs=${codecs}`;
 
             console.log('[WS] Connecting to:', wsUrl);
 
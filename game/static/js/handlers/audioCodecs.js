@@ -0,0 +1,194 @@
+/**
+ * AudioCodecs - Decoders for the compressed TTS audio stream
+ * Mirrors the encoders in src/audio/codecs.py. All decoders deliver
+ * 24 kHz mono Int16Array samples to the onSamples callback.
+ */
+class AudioCodecs {
+    /**
+     * Codecs this browser can decode (sent to the server on connect)
+     * @returns {string[]}
+     */
+    static supported() {
+        const codecs = ['ima_adpcm', 'mulaw', 'pcm'];
+        if (typeof AudioDecoder !== 'undefined' && typeof EncodedAudioChunk !== 'undefined') {
+            codecs.unshift('opus');
+        }
+        return codecs;
+    }
+
+    /**
+     * Create a decoder for the negotiated codec
+     * @param {string} name - Codec name
+     * @param {function} onSamples - Callback(Int16Array)
+     * @returns {{decode: function(ArrayBuffer), reset: function()}}
+     */
+    static createDecoder(name, onSamples) {
+        switch (name) {
+            case 'mulaw':
+                return new MuLawDecoder(onSamples);
+            case 'ima_adpcm':
+                return new ImaAdpcmDecoder(onSamples);
+            case 'opus':
+                return new OpusStreamDecoder(onSamples);
+            default:
+                return new PcmDecoder(onSamples);
+        }
+    }
+}
+
+/**
+ * Raw int16 PCM (no compression)
+ */
+class PcmDecoder {
+    constructor(onSamples) {
+        this.onSamples = onSamples;
+    }
+
+    decode(arrayBuffer) {
+        this.onSamples(new Int16Array(arrayBuffer));
+    }
+
+    reset() {}
+}
+
+/**
+ * G.711 µ-law, one byte per sample
+ */
+class MuLawDecoder {
+    constructor(onSamples) {
+        this.onSamples = onSamples;
+        this.table = new Int16Array(256);
+        for (let code = 0; code < 256; code++) {
+            const inverted = ~code & 0xFF;
+            const exponent = (inverted >> 4) & 0x07;
+            const mantissa = inverted & 0x0F;
+            const magnitude = ((mantissa << 3) + 0x84) << exponent;
+            this.table[code] = (inverted & 0x80) ? 0x84 - magnitude : magnitude - 0x84;
+        }
+    }
+
+    decode(arrayBuffer) {
+        const codes = new Uint8Array(arrayBuffer);
+        const samples = new Int16Array(codes.length);
+        for (let i = 0; i < codes.length; i++) {
+            samples[i] = this.table[codes[i]];
+        }
+        this.onSamples(samples);
+    }
+
+    reset() {}
+}
+
+/**
+ * IMA-ADPCM in self-contained blocks
+ * Block: int16 predictor, uint8 step index, uint8 reserved, uint16 sample count, 4 bit codes
+ */
+class ImaAdpcmDecoder {
+    constructor(onSamples) {
+        this.onSamples = onSamples;
+    }
+
+    decode(arrayBuffer) {
+        const view = new DataView(arrayBuffer);
+        const bytes = new Uint8Array(arrayBuffer);
+        let offset = 0;
+        while (offset + 6 <= bytes.length) {
+            let predictor = view.getInt16(offset, true);
+            let index = view.getUint8(offset + 2);
+            const count = view.getUint16(offset + 4, true);
+            offset += 6;
+
+            const samples = new Int16Array(count);
+            samples[0] = predictor;
+            for (let i = 0; i < count - 1; i++) {
+                const byte = bytes[offset + (i >> 1)];
+                const code = (i & 1) ? (byte >> 4) : (byte & 0x0F);
+                const step = ADPCM_STEP_TABLE[index];
+                let delta = step >> 3;
+                if (code & 4) delta += step;
+                if (code & 2) delta += step >> 1;
+                if (code & 1) delta += step >> 2;
+                predictor = (code & 8) ? Math.max(-32768, predictor - delta) : Math.min(32767, predictor + delta);
+                index = Math.min(88, Math.max(0, index + ADPCM_INDEX_TABLE[code]));
+                samples[i + 1] = predictor;
+            }
+            offset += count >> 1;
+            this.onSamples(samples);
+        }
+    }
+
+    reset() {}
+}
+
+const ADPCM_INDEX_TABLE = [-1, -1, -1, -1, 2, 4, 6, 8, -1, -1, -1, -1, 2, 4, 6, 8];
+
+const ADPCM_STEP_TABLE = [
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767
+];
+
+/**
+ * Opus packets (uint16 length prefix each), decoded with WebCodecs
+ */
+class OpusStreamDecoder {
+    constructor(onSamples) {
+        this.onSamples = onSamples;
+        this.decoder = null;
+        this.timestamp = 0;
+    }
+
+    ensureDecoder() {
+        if (this.decoder && this.decoder.state !== 'closed') {
+            return;
+        }
+        this.decoder = new AudioDecoder({
+            output: (audioData) => {
+                const floats = new Float32Array(audioData.numberOfFrames);
+                audioData.copyTo(floats, { planeIndex: 0, format: 'f32-planar' });
+                audioData.close();
+                const samples = new Int16Array(floats.length);
+                for (let i = 0; i < floats.length; i++) {
+                    samples[i] = Math.max(-32768, Math.min(32767, Math.round(floats[i] * 32768)));
+                }
+                this.onSamples(samples);
+            },
+            error: (e) => console.error('[SPEECH] Opus decode error:', e)
+        });
+        this.decoder.configure({ codec: 'opus', sampleRate: 24000, numberOfChannels: 1 });
+    }
+
+    decode(arrayBuffer) {
+        this.ensureDecoder();
+        const view = new DataView(arrayBuffer);
+        let offset = 0;
+        while (offset + 2 <= arrayBuffer.byteLength) {
+            const length = view.getUint16(offset, true);
+            offset += 2;
+            this.decoder.decode(new EncodedAudioChunk({
+                type: 'key',
+                timestamp: this.timestamp,
+                data: new Uint8Array(arrayBuffer, offset, length)
+            }));
+            this.timestamp += 20000;  // 20 ms packets (microseconds)
+            offset += length;
+        }
+    }
+
+    reset() {
+        if (this.decoder && this.decoder.state !== 'closed') {
+            this.decoder.close();
+        }
+        this.decoder = null;
+        this.timestamp = 0;
+    }
+}
+
+// Export for module usage
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = AudioCodecs;
+}
@@ -8,6 +8,17 @@ class SpeechHandler {
         this.currentSource = null;
         this.accumulatedChunks = [];
         this.isPlaying = false;
+        this.decoder = AudioCodecs.createDecoder('pcm', (samples) => this.enqueueSamples(samples));
+    }
+
+    /**
+     * Set the audio codec negotiated with the server
+     * @param {string} codec - Codec name (pcm, mulaw, ima_adpcm, opus)
+     */
+    setCodec(codec) {
+        console.log('[SPEECH] Audio codec:', codec || 'pcm');
+        this.decoder.reset();
+        this.decoder = AudioCodecs.createDecoder(codec || 'pcm', (samples) => this.enqueueSamples(samples));
     }
 
     /**
@@ -20,12 +31,20 @@ class SpeechHandler {
     }
 
     /**
-     * Handle binary audio data (PCM from TTS via WebSocket)
-     * @param {ArrayBuffer} arrayBuffer - Raw PCM audio data
+     * Handle binary audio data (encoded TTS audio via WebSocket)
+     * @param {ArrayBuffer} arrayBuffer - Audio data in the negotiated codec
      */
     handleBinaryAudio(arrayBuffer) {
         this.initAudioContext();
-        this.accumulatedChunks.push(new Int16Array(arrayBuffer));
+        this.decoder.decode(arrayBuffer);
+    }
+
+    /**
+     * Queue decoded samples for playback
+     * @param {Int16Array} samples - 24 kHz mono PCM samples
+     */
+    enqueueSamples(samples) {
+        this.accumulatedChunks.push(samples);
         if (!this.isPlaying) {
             this.playNextInQueue();
         }
@@ -38,6 +57,7 @@ class SpeechHandler {
         console.log('[SPEECH] Stop');
         this.accumulatedChunks = [];
         this.isPlaying = false;
+        this.decoder.reset();
         if (this.currentSource) {
             this.currentSource.onended = null;
             try {
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Regression test: the token-budgeted history stays bounded when summaries lag.
+
+Turns that fell out of the token budget are kept until the rolling
+summary has picked them up. With a summarizer that always fails, or
+one that never runs, the history must still be trimmed (to max_length
+after a failed summary, never beyond 2 * max_length), and the turns
+sent to the LLM must stay within the budget.
+
+Run with: python test_game_history.py
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from game_history import GameHistory, estimate_tokens
+from metrics import metrics
+
+MAX_LENGTH = 5
+MAX_TOKENS = 60
+TURNS = 50
+
+
+def check(name, condition):
+    print(f"{'✓' if condition else '✗'} {name}")
+    if not condition:
+        raise AssertionError(name)
+
+
+def add_turn(history, turn):
+    history.add_entry(
+        user_input=f"Eingabe {turn}: gehe weiter",
+        base_prompt="",
+        available_functions=[],
+        llm_response=f"Antwort {turn}: Du gehst weiter in den dunklen Gang hinein.",
+        chosen_function="keine_aktion"
+    )
+
+
+def failing_summarizer(previous, entries):
+    raise Exception("LLM unavailable")
+
+
+def wait_for_summaries(result, count, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while metrics.counter("history_summaries_total").value(result=result) < count:
+        if time.perf_counter() > deadline:
+            raise AssertionError("summary did not finish")
+        time.sleep(0.005)
+
+
+def test_failing_summarizer():
+    """A summarizer that always fails falls back to plain trimming."""
+    history = GameHistory(max_length=MAX_LENGTH, max_tokens=MAX_TOKENS)
+    largest = 0
+    for turn in range(TURNS):
+        add_turn(history, turn)
+        largest = max(largest, len(history))
+        failed = metrics.counter("history_summaries_total").value(result="failed")
+        if history.summarize_async(failing_summarizer):
+            wait_for_summaries("failed", failed + 1)
+        check_window(history)
+
+    check(f"history trimmed to max_length after failed summaries ({len(history)})", len(history) <= MAX_LENGTH)
+    check(f"history never above 2 * max_length ({largest})", largest <= 2 * MAX_LENGTH)
+    check("newest turn kept", history.get_last_entry().turn_number == TURNS)
+
+
+def test_no_summarizer():
+    """Without summaries (never started) the history stops growing at 2 * max_length."""
+    history = GameHistory(max_length=MAX_LENGTH, max_tokens=MAX_TOKENS)
+    largest = 0
+    for turn in range(TURNS):
+        add_turn(history, turn)
+        largest = max(largest, len(history))
+        check_window(history)
+
+    check(f"history never above 2 * max_length ({largest})", largest <= 2 * MAX_LENGTH)
+    check("newest turn kept", history.get_last_entry().turn_number == TURNS)
+
+
+def check_window(history):
+    messages = history.to_llm_messages("SYSTEM")
+    tokens = sum(estimate_tokens(message.content) for message in messages[1:])
+    if tokens > MAX_TOKENS and len(messages) > 3:
+        raise AssertionError(f"turns sent to the LLM exceed the budget ({tokens} > {MAX_TOKENS})")
+
+
+if __name__ == "__main__":
+    test_failing_summarizer()
+    test_no_summarizer()
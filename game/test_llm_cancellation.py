@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Regression tests: cancelling a call must surface as a cancellation, not as an LLM failure.
+
+The session's token is cancelled (client disconnect) while the provider
+is streaming the answer. The cancellation checkpoint in the stream
+callback must reach GameController.process_input as
+OperationCancelledError, so the turn ends with {'cancelled': True}
+instead of the LLM-failure fallback, and the aborted call is counted in
+cancelled_work_total.
+
+With hedging, the backend that loses the race is stopped the same way
+(at its next delta); that must not count against its circuit breaker.
+A backend that never answers gets the time left until the deadline as
+its request timeout, so its worker thread is free again by then.
+
+Failures during an attempt are retried on the backend that did not
+fail, unless narrative text was already streamed (another answer can't
+continue it).
+
+The session is built from a config dict for the DramaLlama map (no
+config.yaml needed); the LLMs are OpenAIProviders with fake streaming
+clients.
+
+Run with: python test_llm_cancellation.py
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from llm import LLMMessage, OpenAIProvider
+from llm.resilient_provider import LLMUnavailableError, ResilientProvider
+from metrics import metrics
+from session import GameSession
+
+DELTA_SECONDS = 0.05
+
+CONFIG = {
+    "maps_directory": "maps",
+    "game_name": "DramaLlama",
+    "sound": {"soundfx_dir": "maps/DramaLlama/soundfx"},
+    "llm": {"provider": "openai", "model": "gpt-4o-mini", "api_key": "sk-test"},
+    "voice": {"enabled": False}
+}
+
+
+class FakeStream:
+    """Chat completion stream that yields one word per chunk (slowly)."""
+
+    def __init__(self, words, first_delay=0.0):
+        self.words = words
+        self.first_delay = first_delay
+        self.closed = False
+
+    def __iter__(self):
+        time.sleep(self.first_delay)
+        for word in self.words:
+            time.sleep(DELTA_SECONDS)
+            delta = SimpleNamespace(content=word, tool_calls=None)
+            yield SimpleNamespace(model="fake", usage=None, choices=[SimpleNamespace(finish_reason=None, delta=delta)])
+
+    def close(self):
+        self.closed = True
+
+
+class FakeOpenAIClient:
+    """client.chat.completions.create(stream=True) of the OpenAI SDK."""
+
+    def __init__(self, first_delay=0.0, words=None):
+        self.chat = self
+        self.completions = self
+        self.first_delay = first_delay
+        self.words = words or ['{"function": "keine_aktion", "arguments": {"response": "'] + ["Wort "] * 40 + ['"}}']
+        self.streams = []
+
+    def create(self, stream=False, **kwargs):
+        self.streams.append(FakeStream(self.words, self.first_delay))
+        return self.streams[-1]
+
+
+class FailingStream(FakeStream):
+    """Stream that breaks off after its words."""
+
+    def __iter__(self):
+        yield from super().__iter__()
+        raise ConnectionError("connection reset")
+
+
+class FailingClient(FakeOpenAIClient):
+    """Streams `words` and then fails (fails right away without words)."""
+
+    def __init__(self, words=(), fail_times=None):
+        super().__init__(words=list(words) or None)
+        self.fail_words = list(words)
+        self.fail_times = fail_times
+
+    def create(self, stream=False, **kwargs):
+        if self.fail_times is not None and len(self.streams) >= self.fail_times:
+            return super().create(stream=stream, **kwargs)
+        if not self.fail_words:
+            self.streams.append(None)
+            raise ConnectionError("connection refused")
+        self.streams.append(FailingStream(self.fail_words))
+        return self.streams[-1]
+
+
+class StalledClient(FakeOpenAIClient):
+    """Backend that never answers; the request gives up at its timeout (like the SDK)."""
+
+    def __init__(self):
+        super().__init__()
+        self.timeouts = []
+        self.returned = threading.Event()
+
+    def create(self, stream=False, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        try:
+            time.sleep(timeout if timeout is not None else 60)
+            raise TimeoutError("Request timed out.")
+        finally:
+            self.returned.set()
+
+
+def check(name, condition):
+    print(f"{'✓' if condition else '✗'} {name}")
+    if not condition:
+        raise AssertionError(name)
+
+
+def test_disconnect_mid_stream():
+    """process_input returns {'cancelled': True} when the token fires during the stream."""
+    session = GameSession("cancel-test", config=CONFIG)
+    controller = session.game_engine.controller
+    provider = OpenAIProvider(api_key="sk-test", model="gpt-4o-mini")
+    provider.client = FakeOpenAIClient()
+    controller.llm_provider = provider
+    controller.two_stage = False
+
+    before = metrics.counter("cancelled_work_total").value(kind="llm", provider="openai")
+    threading.Timer(DELTA_SECONDS * 5, session.cancel, args=("disconnect",)).start()
+    result = controller.process_input("Erzähl mir eine lange Geschichte")
+
+    check(f"turn ends as cancelled ({result!r:.60})", isinstance(result, dict) and result.get('cancelled') is True)
+    check("stream was closed early", provider.client.streams and provider.client.streams[-1].closed)
+    after = metrics.counter("cancelled_work_total").value(kind="llm", provider="openai")
+    check(f"cancelled LLM call counted ({after - before})", after > before)
+    check("no history entry for the cancelled turn", not controller.history.entries)
+
+
+def test_lost_hedge_is_no_failure():
+    """The slow primary loses the hedge race to the backup without opening its circuit."""
+    primary = OpenAIProvider(api_key="sk-test", model="primary-model")
+    primary.client = FakeOpenAIClient(first_delay=DELTA_SECONDS * 6)
+    backup = OpenAIProvider(api_key="sk-test", model="backup-model")
+    backup.client = FakeOpenAIClient(words=["Der ", "Backup ", "erzählt ", "weiter. "] * 5)
+    provider = ResilientProvider(primary, backup, {
+        "retries": 0,
+        "circuit_breaker": {"failures": 1},
+        "hedge": {"enabled": True, "initial_delay_seconds": DELTA_SECONDS}
+    })
+
+    spoken = []
+    provider.chat([LLMMessage(role="user", content="Hallo")], on_narrative=spoken.append)
+
+    check(f"backup wins the race ({''.join(spoken)[:20]!r})", "".join(spoken).startswith("Der Backup"))
+    check("primary was stopped at its first delta", primary.client.streams and primary.client.streams[-1].closed)
+    check(f"primary circuit stays closed ({provider.breakers[id(primary)].state})",
+          provider.breakers[id(primary)].state == "closed")
+
+
+def test_stalled_backend_times_out():
+    """The request of a stalled backend times out at the turn deadline."""
+    deadline = DELTA_SECONDS * 4
+    stalled = OpenAIProvider(api_key="sk-test", model="stalled-model")
+    stalled.client = StalledClient()
+    provider = ResilientProvider(stalled, None, {"retries": 0, "deadline_seconds": deadline})
+
+    try:
+        provider.chat([LLMMessage(role="user", content="Hallo")], on_narrative=lambda delta: None)
+        check("stalled backend reported as unavailable", False)
+    except LLMUnavailableError:
+        pass
+    timeout = stalled.client.timeouts[0] if stalled.client.timeouts else None
+    check(f"request timeout derived from the deadline ({timeout})", timeout is not None and 0 < timeout <= deadline)
+    check("worker thread freed right after the deadline", stalled.client.returned.wait(DELTA_SECONDS * 4))
+
+
+def test_narrating_backend_fails():
+    """The primary breaks off mid-narration: no hedge or retry is appended to the spoken text."""
+    primary = OpenAIProvider(api_key="sk-test", model="primary-model")
+    primary.client = FailingClient(words=["Die ", "Tür ", "knarrt "])
+    backup = OpenAIProvider(api_key="sk-test", model="backup-model")
+    backup.client = FakeOpenAIClient(first_delay=DELTA_SECONDS * 20, words=["Der ", "Backup "] * 5)
+    provider = ResilientProvider(primary, backup, {
+        "retries": 2,
+        "backoff_seconds": 0.01,
+        "hedge": {"enabled": True, "initial_delay_seconds": DELTA_SECONDS}
+    })
+
+    spoken = []
+    started = time.monotonic()
+    try:
+        provider.chat([LLMMessage(role="user", content="Hallo")], on_narrative=spoken.append)
+        check("narration failure reported", False)
+    except LLMUnavailableError:
+        pass
+    check(f"only the primary's partial text was spoken ({''.join(spoken)!r})", "".join(spoken) == "Die Tür knarrt ")
+    check("no retry after the narration started", len(primary.client.streams) == 1 and len(backup.client.streams) <= 1)
+    check("gave up as soon as the primary failed", time.monotonic() - started < DELTA_SECONDS * 10)
+
+
+def test_failed_attempt_is_retried():
+    """The primary fails before streaming and the hedge is refused: the attempt is retried."""
+    primary = OpenAIProvider(api_key="sk-test", model="retry-primary")
+    primary.client = FailingClient(fail_times=1)
+    backup = OpenAIProvider(api_key="sk-test", model="retry-backup")
+    backup.client = FakeOpenAIClient()
+    provider = ResilientProvider(primary, backup, {
+        "retries": 1,
+        "backoff_seconds": 0.01,
+        "hedge": {"enabled": True, "initial_delay_seconds": DELTA_SECONDS}
+    })
+    # The backup's (half-open) trial slot is taken by another turn when the hedge fires
+    refusals = [False]
+    provider.breakers[id(backup)].allow = lambda: refusals.pop() if refusals else True
+
+    retries = metrics.counter("llm_retries_total")
+    before = retries.value(backend=provider.backend_name(primary))
+    response = provider.chat([LLMMessage(role="user", content="Hallo")], on_narrative=lambda delta: None)
+
+    check(f"retry answered by the backup ({response.content[:20]!r})", response.content.startswith('{"function"'))
+    check("retry counted for the primary", retries.value(backend=provider.backend_name(primary)) == before + 1)
+
+
+def test_retry_blames_failing_hedge():
+    """When the hedge is the call that failed last, the retry is counted for the hedge backend."""
+    primary = OpenAIProvider(api_key="sk-test", model="blame-primary")
+    primary.client = FailingClient()
+    backup = OpenAIProvider(api_key="sk-test", model="blame-backup")
+    backup.client = FailingClient()
+    provider = ResilientProvider(primary, backup, {
+        "retries": 0,
+        "hedge": {"enabled": True, "initial_delay_seconds": DELTA_SECONDS}
+    })
+
+    retries = metrics.counter("llm_retries_total")
+    try:
+        provider.chat([LLMMessage(role="user", content="Hallo")], on_narrative=lambda delta: None)
+        check("failure reported", False)
+    except LLMUnavailableError:
+        pass
+    check("hedge was sent", len(backup.client.streams) == 1)
+    check("retry counted for the failing hedge", retries.value(backend=provider.backend_name(backup)) == 1)
+    check("not for the primary", retries.value(backend=provider.backend_name(primary)) == 0)
+
+
+if __name__ == "__main__":
+    test_disconnect_mid_stream()
+    test_lost_hedge_is_no_failure()
+    test_stalled_backend_times_out()
+    test_narrating_backend_fails()
+    test_failed_attempt_is_retried()
+    test_retry_blames_failing_hedge()
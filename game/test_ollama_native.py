@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test of the native Ollama client (sync and async) against a local stub server (no Ollama needed).
+
+The stub implements /api/chat (non-streaming, NDJSON streaming, tool calls
+and the empty-messages warmup request) and records every request payload.
+
+Run with: python test_ollama_native.py
+"""
+import asyncio
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from llm import GemmaProvider, LLMFunction, LLMMessage, OllamaProvider
+from llm.ollama_native import OllamaNativeClient
+from metrics import metrics
+
+TIMINGS = {
+    "total_duration": 900_000_000,
+    "load_duration": 2_500_000_000,
+    "prompt_eval_count": 120,
+    "prompt_eval_duration": 300_000_000,
+    "eval_count": 40,
+    "eval_duration": 500_000_000,
+}
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """Minimal /api/chat of Ollama."""
+
+    requests = []
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubOllama.requests.append((self.path, payload))
+        if self.path != "/api/chat":
+            self.send_error(404)
+            return
+
+        if not payload["messages"]:
+            # Warmup: load the model
+            self._json({"model": payload["model"], "done": True, "done_reason": "load", "load_duration": 3_000_000_000})
+            return
+
+        if payload.get("tools"):
+            message = {"role": "assistant", "content": "", "tool_calls": [
+                {"function": {"name": "gehe_nach_norden", "arguments": {"response": "Ab nach Norden!"}}}
+            ]}
+        else:
+            message = {"role": "assistant", "content": "Hallo Abenteurer!"}
+
+        if not payload.get("stream"):
+            self._json({"model": payload["model"], "message": message, "done": True, "done_reason": "stop", **TIMINGS})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        if message["content"]:
+            for word in ["Hallo ", "Abenteurer!"]:
+                self._line({"model": payload["model"], "message": {"role": "assistant", "content": word}, "done": False})
+        else:
+            self._line({"model": payload["model"], "message": message, "done": False})
+        self._line({"model": payload["model"], "message": {"role": "assistant", "content": ""},
+                    "done": True, "done_reason": "stop", **TIMINGS})
+
+    def _json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _line(self, data):
+        self.wfile.write(json.dumps(data).encode() + b"\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+def check(name, condition):
+    print(f"{'✓' if condition else '✗'} {name}")
+    if not condition:
+        raise AssertionError(name)
+
+
+def test_ollama_native():
+    """Warmup, chat, streaming, tool calls and num_ctx sizing against the stub."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    print("=" * 60)
+    print("NATIVE OLLAMA CLIENT TEST")
+    print("=" * 60)
+
+    client = OllamaNativeClient(base_url, keep_alive="30m", min_ctx=2048, max_ctx=8192)
+    check("OpenAI-compatible /v1 suffix stripped", client.base_url == base_url[:-3])
+
+    provider = OllamaProvider("ollama", "qwen2.5:7b", base_url=base_url, native=client)
+    check("warmup loads the model", provider.warmup())
+    path, payload = StubOllama.requests[-1]
+    check("warmup sends no messages and keep_alive", payload["messages"] == [] and payload["keep_alive"] == "30m")
+
+    messages = [LLMMessage(role="system", content="Du bist ein Erzähler."), LLMMessage(role="user", content="hallo")]
+    response = provider.call_chat(messages)
+    _, payload = StubOllama.requests[-1]
+    check("chat returns the content", response.content == "Hallo Abenteurer!")
+    check("usage from prompt_eval_count/eval_count", response.usage == {"prompt_tokens": 120, "completion_tokens": 40, "total_tokens": 160})
+    check("keep_alive and num_ctx sent", payload["keep_alive"] == "30m" and payload["options"]["num_ctx"] == 2048)
+    check("load duration recorded", metrics.histogram("ollama_load_seconds").percentile(100, model="qwen2.5:7b") >= 2.5)
+
+    deltas = []
+    response = provider.call_chat_stream(messages, None, deltas.append)
+    check("stream forwards deltas", deltas == ["Hallo ", "Abenteurer!"] and response.content == "Hallo Abenteurer!")
+
+    long_messages = [LLMMessage(role="user", content="x" * 12000)]
+    provider.call_chat(long_messages)
+    grown = StubOllama.requests[-1][1]["options"]["num_ctx"]
+    check(f"num_ctx grows with the prompt ({grown})", grown > 2048)
+    provider.call_chat(messages)
+    check("num_ctx never shrinks (no model reload)", StubOllama.requests[-1][1]["options"]["num_ctx"] == grown)
+
+    gemma = GemmaProvider("ollama", "gemma3:12b", base_url=base_url, native=client)
+    functions = [LLMFunction(name="gehe_nach_norden", description="Nach Norden gehen")]
+    response = gemma.call_chat(messages, functions)
+    check("native tool call parsed", response.function_call is not None
+          and response.function_call.name == "gehe_nach_norden"
+          and response.function_call.arguments == {"response": "Ab nach Norden!"})
+    deltas = []
+    response = gemma.call_chat_stream(messages, functions, deltas.append)
+    check("streamed tool call arguments forwarded", response.function_call is not None and "Ab nach Norden!" in "".join(deltas))
+
+    response = asyncio.run(gemma.acall_chat(messages, functions))
+    check("async tool call parsed", response.function_call is not None and response.function_call.name == "gehe_nach_norden")
+    deltas = []
+    response = asyncio.run(provider.acall_chat_stream(messages, None, deltas.append))
+    check("async stream forwards deltas", deltas == ["Hallo ", "Abenteurer!"] and response.usage["total_tokens"] == 160)
+
+    server.shutdown()
+    print()
+    print("All checks passed")
+
+
+if __name__ == "__main__":
+    test_ollama_native()
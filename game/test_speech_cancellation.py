@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Regression test: stopping speech must not delay the next turn.
+
+A long utterance is playing into a blocking sink (like PyAudioSink.write)
+while its synthesis is still running when the player sends the next
+input. The turn stops the old reply and starts the new one; the stop
+must return at once, the new reply's first audio must arrive as fast as
+without an utterance in progress, and the old reply must not write audio
+after the stop (at most the one chunk its writer was blocked in).
+
+Covers the provider-driven path (speak/stop, generation IDs; also with
+OpenAITTSProvider and a fake streaming client) and the sentence pipeline
+(SpeechPipeline).
+
+Run with: python test_speech_cancellation.py
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from voice import SpeechPipeline
+from voice.base_provider import BaseTTSProvider
+
+CHUNK_SECONDS = 0.2     # a blocking sink write takes this long
+SYNTHESIS_SECONDS = 0.1  # per sentence
+LONG_SYNTHESIS_SECONDS = 3.0  # sentence of the long utterance that is still being synthesized
+MAX_STOP_SECONDS = 0.05
+
+
+class BlockingSink:
+    """Sink whose write blocks like a sound card; records who wrote what and when."""
+
+    def __init__(self) -> None:
+        self.writes = []
+        self.lock = threading.Lock()
+
+    def write(self, session, chunk) -> None:
+        time.sleep(CHUNK_SECONDS)
+        with self.lock:
+            self.writes.append((time.perf_counter(), bytes(chunk[:4])))
+
+    def flush(self, session) -> None:
+        pass
+
+    def interrupt(self, session) -> None:
+        pass
+
+    def resume(self, session) -> None:
+        pass
+
+    def written_after(self, moment, tag):
+        with self.lock:
+            return [t for t, data in self.writes if t > moment and data == tag]
+
+    def first_write(self, after, tag):
+        with self.lock:
+            return next((t for t, data in self.writes if t > after and data == tag), None)
+
+
+class SlowProvider(BaseTTSProvider):
+    """Synthesizes slowly and plays like the cloud providers (playback thread, generation IDs)."""
+
+    SUPPORTS_SYNTHESIS = True
+
+    def speak(self, session, text: str) -> None:
+        generation = self.begin_utterance()
+        audio = self.synthesize(text)
+
+        def play() -> None:
+            for i in range(0, len(audio), 4):
+                if not self.write_audio(session, audio[i:i + 4], generation):
+                    break
+        threading.Thread(target=play, daemon=True).start()
+
+    def stop(self, session) -> None:
+        self.cancel_utterance()
+
+    def synthesize(self, text: str) -> bytes:
+        time.sleep(LONG_SYNTHESIS_SECONDS if text.startswith("LANG") else SYNTHESIS_SECONDS)
+        # Tag every 4-byte chunk with the first letters of the text
+        return (text[:4].encode() * 50)
+
+
+class FakeSpeechStream:
+    """Streaming response of the fake OpenAI client (slow chunks tagged with the text)."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def iter_bytes(self, chunk_size: int):
+        for _ in range(50):
+            time.sleep(SYNTHESIS_SECONDS / 10)
+            yield self.text[:4].encode()
+
+
+class FakeOpenAIClient:
+    """client.audio.speech.with_streaming_response.create(...) of the OpenAI SDK."""
+
+    def __init__(self) -> None:
+        self.audio = self
+        self.speech = self
+        self.with_streaming_response = self
+
+    def create(self, input: str, **kwargs):
+        return FakeSpeechStream(input)
+
+
+class Session:
+    session_id = "test"
+
+
+def check(name, condition):
+    print(f"{'✓' if condition else '✗'} {name}")
+    if not condition:
+        raise AssertionError(name)
+
+
+def wait_for_first(sink, after, tag, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        first = sink.first_write(after, tag)
+        if first is not None:
+            return first - after
+        time.sleep(0.005)
+    return None
+
+
+def test_provider_path():
+    """speak()/stop() of a provider with a playback thread."""
+    sink = BlockingSink()
+    provider = SlowProvider(sink)
+    session = Session()
+
+    started = time.perf_counter()
+    provider.speak(session, "KURZ")
+    baseline = wait_for_first(sink, started, b"KURZ")
+    provider.stop(session)
+
+    provider.speak(session, "ALTE Geschichte, sehr lang")
+    time.sleep(0.5)  # old utterance is playing, its writer is blocked in the sink
+
+    turn = time.perf_counter()
+    provider.stop(session)
+    stop_seconds = time.perf_counter() - turn
+    provider.speak(session, "NEUE Antwort")
+    latency = wait_for_first(sink, turn, b"NEUE")
+    time.sleep(1.0)
+
+    check(f"provider stop() returns at once ({stop_seconds * 1000:.1f} ms)", stop_seconds < MAX_STOP_SECONDS)
+    check(f"next reply starts as without an utterance in progress ({latency:.2f}s vs {baseline:.2f}s)",
+          latency is not None and latency < baseline + CHUNK_SECONDS + 0.1)
+    stale = sink.written_after(turn, b"ALTE")
+    check(f"old utterance writes at most its in-flight chunk after stop ({len(stale)})", len(stale) <= 1)
+
+
+def test_openai_provider_path():
+    """OpenAITTSProvider.stop() while its playback thread is blocked in the sink."""
+    from voice.openai_provider import OpenAITTSProvider
+
+    sink = BlockingSink()
+    provider = OpenAITTSProvider(sink, api_key="sk-test")
+    provider.client = FakeOpenAIClient()
+    session = Session()
+
+    started = time.perf_counter()
+    provider.speak(session, "KURZ")
+    baseline = wait_for_first(sink, started, b"KURZ")
+    provider.stop(session)
+
+    provider.speak(session, "ALTE Geschichte, sehr lang")
+    time.sleep(0.5)  # old utterance is streaming, its writer is blocked in the sink
+
+    turn = time.perf_counter()
+    provider.stop(session)
+    stop_seconds = time.perf_counter() - turn
+    provider.speak(session, "NEUE Antwort")
+    latency = wait_for_first(sink, turn, b"NEUE")
+    time.sleep(1.0)
+
+    check(f"OpenAI stop() returns at once ({stop_seconds * 1000:.1f} ms)", stop_seconds < MAX_STOP_SECONDS)
+    check(f"next reply starts as without an utterance in progress ({latency:.2f}s vs {baseline:.2f}s)",
+          latency is not None and latency < baseline + CHUNK_SECONDS + 0.1)
+    stale = sink.written_after(turn, b"ALTE")
+    check(f"old utterance writes at most its in-flight chunk after stop ({len(stale)})", len(stale) <= 1)
+
+
+def test_pipeline_path():
+    """SpeechPipeline with a sentence still being synthesized."""
+    sink = BlockingSink()
+    provider = SlowProvider(sink)
+    session = Session()
+
+    started = time.perf_counter()
+    pipeline = SpeechPipeline(session, provider, started_at=started)
+    pipeline.finish("KURZ.")
+    baseline = wait_for_first(sink, started, b"KURZ")
+
+    pipeline = SpeechPipeline(session, provider)
+    pipeline.feed("ALTE Geschichte beginnt. ")
+    pipeline.feed("LANGE Beschreibung des Raums. ")
+    pipeline.finish("ALTE Geschichte beginnt. LANGE Beschreibung des Raums.")
+    time.sleep(0.3)  # first sentence is playing, the second is still being synthesized
+
+    turn = time.perf_counter()
+    pipeline.stop()
+    provider.stop(session)
+    stop_seconds = time.perf_counter() - turn
+    pipeline = SpeechPipeline(session, provider, started_at=turn)
+    pipeline.finish("NEUE Antwort.")
+    latency = wait_for_first(sink, turn, b"NEUE")
+    time.sleep(LONG_SYNTHESIS_SECONDS)
+
+    check(f"pipeline stop returns at once ({stop_seconds * 1000:.1f} ms)", stop_seconds < MAX_STOP_SECONDS)
+    check(f"next reply starts as without an utterance in progress ({latency:.2f}s vs {baseline:.2f}s)",
+          latency is not None and latency < baseline + CHUNK_SECONDS + 0.1)
+    check("long sentence synthesized after the stop is never played", not sink.written_after(turn, b"LANG"))
+    stale = sink.written_after(turn, b"ALTE")
+    check(f"old reply writes at most its in-flight chunk after stop ({len(stale)})", len(stale) <= 1)
+
+
+if __name__ == "__main__":
+    test_provider_path()
+    test_openai_provider_path()
+    test_pipeline_path()